@@ -123,6 +123,8 @@ class ArtiaX(Model):
 
         # Tomogram clipping
         self._clip_thickness = 300
+        self._cull_particles = False
+        """Hide particles outside the clipped slab of a tomogram."""
 
         # Mouse modes
         from .mouse import (
@@ -657,6 +659,30 @@ class ArtiaX(Model):
             if t.is_clipped:
                 t.update_clip()
 
+    @property
+    def cull_particles(self) -> bool:
+        return self._cull_particles
+
+    @cull_particles.setter
+    def cull_particles(self, value: bool):
+        self._cull_particles = value
+        self.update_particle_culling()
+
+    def update_particle_culling(self):
+        """Hide the particles outside the slab of the clipped tomogram, or show them all if nothing is clipped."""
+        tomo = None
+        if self._cull_particles:
+            for t in self.tomograms.child_models():
+                if t.is_clipped:
+                    tomo = t
+                    break
+
+        for pl in self.partlists.child_models():
+            if tomo is None:
+                pl.clear_slab_culling()
+            else:
+                pl.cull_to_slab(tomo.normal, tomo.slab_position, self.clip_thickness, tomo.scene_position)
+
     # ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
     # Save/Load
     # ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
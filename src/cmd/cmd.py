@@ -296,19 +296,51 @@ def artiax_flip(session, axis=None, angle=180):
         axis = np.asarray(axis.coords)
         axis = axis / np.linalg.norm(axis)
 
-    from ..geometricmodel.GeoModel import get_curr_selected_particles
-
-    particle_pos, particles = get_curr_selected_particles(session)
     from chimerax.geometry import rotation
 
-    for particle in particles:
-        external_axis = particle.rotation.transform_vector(axis)
-        particle.rotation = rotation(external_axis, angle) * particle.rotation
+    # Rotating by angle around the axis in the particle frame: rotation(R * axis, angle) * R == R * rotation(axis, angle)
+    flip = rotation(axis, angle).matrix[:, :3]
 
     for particle_list in session.ArtiaX.partlists.iter():
+        ids = particle_list.particle_ids[particle_list.selected_particles]
+
+        if len(ids) > 0:
+            rotations = particle_list.data.get_transform_matrices(ids)[:, :, :3]
+            particle_list.data.set_rotations(ids, rotations @ flip)
+
         particle_list.update_places()
 
 
+def artiax_select(session, models=None, expression=None):
+    # No ArtiaX
+    if not hasattr(session, "ArtiaX"):
+        session.logger.warning("ArtiaX is not currently running.")
+        return
+
+    # No Models
+    if models is None:
+        models = session.ArtiaX.partlists.child_models()
+
+    from ..util.filter import compile_filter
+
+    particle_filter = compile_filter(expression)
+
+    from ..particle import ParticleList
+
+    for model in models:
+        if not isinstance(model, ParticleList):
+            continue
+
+        mask = particle_filter.evaluate(model)
+        model.selected_particles = mask
+
+        session.logger.info(
+            "artiax select: {} of {} particles selected in #{}.".format(
+                int(np.count_nonzero(mask)), model.size, model.id_string
+            )
+        )
+
+
 def artiax_select_inside_surface(session):
     if not hasattr(session, "ArtiaX"):
         session.logger.warning(
@@ -336,10 +368,9 @@ def artiax_select_inside_surface(session):
 
     for pl in session.ArtiaX.partlists.iter():
         if pl.visible:
-            pl.selected_particles = False
-            atoms = pl.markers.atoms
-            select_particles = np.array(atoms.selecteds)
-            for i, p_id in enumerate(pl.particle_ids[pl.displayed_particles]):
+            select_particles = np.zeros((pl.size,), dtype=bool)
+            rows = np.nonzero(pl.displayed_particles)[0]
+            for i, p_id in zip(rows, pl.particle_ids[rows]):
                 pos = np.asarray(pl.get_particle(p_id).coord)
                 if not (
                     np.any(pos > bounds.xyz_max) or np.any(pos < bounds.xyz_min)
@@ -374,7 +405,7 @@ def artiax_select_inside_surface(session):
                         )
                     if intersepts % 2:
                         select_particles[i] = True
-            atoms.selecteds = select_particles
+            pl.selected_particles = select_particles
 
 
 def artiax_geomodel_color(session, model, color):
@@ -1152,6 +1183,11 @@ def artiax_particles(
     color=None,
     originScaleFactor=None,
     transScaleFactor=None,
+    show=None,
+    lod=None,
+    lodSizes=None,
+    impostorSize=None,
+    lazyMarkers=None,
 ):
     # No ArtiaX
     if not hasattr(session, "ArtiaX"):
@@ -1206,6 +1242,18 @@ def artiax_particles(
                 "artiax particles: transScaleFactor required to be a positive, non-zero number."
             )
 
+    particle_filter = None
+    if show is not None:
+        from ..util.filter import compile_filter
+
+        particle_filter = compile_filter(show)
+
+    if lodSizes is not None and any(s <= 0 for s in lodSizes):
+        raise errors.UserError("artiax particles: lodSizes required to be positive numbers.")
+
+    if impostorSize is not None and impostorSize < 0:
+        raise errors.UserError("artiax particles: impostorSize required to be >= 0.")
+
     # Filter models and work
     for model in models:
         # Is it a particle list?
@@ -1255,6 +1303,25 @@ def artiax_particles(
         if set_trans_scale:
             model.translation_pixelsize = transScaleFactor
 
+        if particle_filter is not None:
+            model.displayed_particles = particle_filter.evaluate(model)
+
+        if lod is not None:
+            if not lod:
+                model.lod_sizes = []
+                model.impostor_size = 0
+            elif lodSizes is None and not model.lod_sizes:
+                model.lod_sizes = ParticleList.LOD_SIZES
+
+        if lodSizes is not None:
+            model.lod_sizes = lodSizes
+
+        if impostorSize is not None:
+            model.impostor_size = impostorSize
+
+        if lazyMarkers is not None:
+            model.lazy_markers = lazyMarkers
+
 
 def artiax_tomo(
     session,
@@ -1456,6 +1523,8 @@ def artiax_label(session, model, attribute, height=None, offset=None):
     if offset is None:
         offset = [model.radius, model.radius, model.radius]
 
+    model.sync_marker_attributes()
+
     run(
         session,
         "label #{} atoms attribute {} height {} offset {},{},{}".format(
@@ -1544,6 +1613,7 @@ def artiax_clip(
     session: Session,
     thickness: Union[float, str],
     model: Optional[Model] = None,
+    cull: Optional[bool] = None,
     log: bool = True,
 ):
     """
@@ -1557,6 +1627,8 @@ def artiax_clip(
         Thickness of the visible slab in Angstrom. 'off' to turn off clipping.
     model : Optional[Model]
         Tomogram model to clip around.
+    cull : Optional[bool]
+        Hide particles outside the slab, so they are not drawn at all.
     log : bool
         Log the command to the history.
     """
@@ -1566,7 +1638,7 @@ def artiax_clip(
 
     from ..util.clip import clip
 
-    clip(session, thickness, model, log)
+    clip(session, thickness, model, cull, log)
 
 
 def artiax_cap(session: Session, status: bool):
@@ -1622,7 +1694,7 @@ def artiax_user_guide(session:Session):
     raise UserError(
         "To open artiax user guide, type 'help artiax user guide'.")
 
-def artiax_delete_duplicates(session:Session, models=None, radius=0):
+def artiax_delete_duplicates(session:Session, models=None, radius=0, keepAttribute=None, acrossLists=False):
 
     if not hasattr(session, "ArtiaX"):
         session.logger.warning("ArtiaX is not currently running.")
@@ -1655,13 +1727,127 @@ def artiax_delete_duplicates(session:Session, models=None, radius=0):
 
     from ..particle.ParticleList import delete_duplicates
 
-    delete_duplicates(session,ms, radius)
+    delete_duplicates(session, ms, radius, keep_attribute=keepAttribute, across_lists=acrossLists)
+
+
+def artiax_neighbors(session, models=None, k=1, maxDistance=None, prefix="nn"):
+    # No ArtiaX
+    if not hasattr(session, "ArtiaX"):
+        session.logger.warning("ArtiaX is not currently running.")
+        return
+
+    # No Models
+    if models is None:
+        models = session.ArtiaX.partlists.child_models()
+
+    if k < 1:
+        raise UserError("artiax neighbors: k needs to be at least 1.")
+
+    import time
+    from ..particle import ParticleList
+    from ..util.neighbors import neighbor_attributes
+
+    for model in models:
+        if not isinstance(model, ParticleList) or model.size == 0:
+            continue
+
+        t0 = time.time()
+        attributes = neighbor_attributes(model, k, maxDistance, prefix)
+        for name, values in attributes.items():
+            model.set_values_of_attribute(name, values)
+        t1 = time.time()
+
+        dist = attributes["{}1_dist".format(prefix)]
+        found = attributes["{}_count".format(prefix)] > 0
+        mean = dist[found].mean() if found.any() else 0
+
+        session.logger.info(
+            "artiax neighbors: #{}: {} particles, {} with neighbours, mean nearest neighbour distance {:.2f}. "
+            "Added attributes {}_count, {}1_dist ... {}{}_angle in {:.2f} s.".format(
+                model.id_string,
+                model.size,
+                int(np.count_nonzero(found)),
+                mean,
+                prefix,
+                prefix,
+                prefix,
+                k,
+                t1 - t0,
+            )
+        )
 
 
 
 
 
 
+def artiax_cluster(
+    session, models=None, radius=None, minSamples=5, maxAngle=None, attribute="cluster_id", fit=None
+):
+    # No ArtiaX
+    if not hasattr(session, "ArtiaX"):
+        session.logger.warning("ArtiaX is not currently running.")
+        return
+
+    # No Models
+    if models is None:
+        models = session.ArtiaX.partlists.child_models()
+
+    if radius is None or radius <= 0:
+        raise UserError("artiax cluster: radius needs to be larger than 0.")
+
+    import time
+    from ..particle import ParticleList
+    from ..util.cluster import cluster_particles
+
+    partlists = [m for m in models if isinstance(m, ParticleList) and m.size > 0]
+
+    for model in partlists:
+        t0 = time.time()
+        labels = cluster_particles(model, radius, minSamples, maxAngle)
+        model.set_values_of_attribute(attribute, labels)
+        t1 = time.time()
+
+        session.logger.info(
+            "artiax cluster: #{}: {} clusters, {} of {} particles are noise ({} == 0). Took {:.2f} s.".format(
+                model.id_string,
+                int(labels.max()),
+                int(np.count_nonzero(labels == 0)),
+                model.size,
+                attribute,
+                t1 - t0,
+            )
+        )
+
+    if fit is None:
+        return
+
+    from ..geometricmodel.GeoModel import fit_sphere, fit_curved_line, fit_surface, boundary
+
+    fit_function = {
+        "sphere": fit_sphere,
+        "line": fit_curved_line,
+        "surface": fit_surface,
+        "boundary": boundary,
+    }[fit]
+
+    # Fit one geomodel per cluster by selecting the particles of one cluster at a time
+    all_partlists = session.ArtiaX.partlists.child_models()
+    selection = [pl.selected_particles for pl in all_partlists]
+    for pl in all_partlists:
+        pl.selected_particles = None
+
+    for model in partlists:
+        labels = model.get_values_of_attribute(attribute).copy()
+        for label in range(1, labels.max() + 1):
+            model.selected_particles = labels == label
+            fit_function(session)
+        model.selected_particles = None
+
+    for pl, sel in zip(all_partlists, selection):
+        pl.selected_particles = sel
+
+
 def register_artiax(logger):
     """Register all commands with ChimeraX, and specify expected arguments."""
     from chimerax.core.commands import (
@@ -1833,6 +2019,14 @@ def register_artiax(logger):
         )
         register("artiax flip", desc, artiax_flip)
 
+    def register_artiax_select():
+        desc = CmdDesc(
+            required=[("models", Or(ModelsArg, EmptyArg)), ("expression", StringArg)],
+            synopsis="Select particles using a filter expression on their attributes.",
+            url="help:user/commands/artiax_select.html",
+        )
+        register("artiax select", desc, artiax_select)
+
     def register_select_inside_surface():
         desc = CmdDesc(
             synopsis="Selects all shown particles inside the selected surface.",
@@ -1988,6 +2182,11 @@ def register_artiax(logger):
                 ("color", ColorArg),
                 ("originScaleFactor", FloatArg),
                 ("transScaleFactor", FloatArg),
+                ("show", StringArg),
+                ("lod", BoolArg),
+                ("lodSizes", ListOf(FloatArg)),
+                ("impostorSize", FloatArg),
+                ("lazyMarkers", BoolArg),
             ],
             synopsis="Set particle list properties.",
             url="help:user/commands/artiax_particles.html",
@@ -2047,6 +2246,7 @@ def register_artiax(logger):
         desc = CmdDesc(
             required=[("thickness", Or(FloatArg, StringArg))],
             optional=[("model", ModelArg)],
+            keyword=[("cull", BoolArg)],
             synopsis="Turn on slab-dependent clipping planes for a tomogram.",
             url="help:user/commands/artiax_clip.html",
         )
@@ -2093,11 +2293,41 @@ def register_artiax(logger):
         desc = CmdDesc(
             required=[("models", Or(ModelsArg, EmptyArg))],
             optional=[("radius", FloatArg)],
+            keyword=[("keepAttribute", StringArg), ("acrossLists", BoolArg)],
             synopsis="Delete duplicates in particle list",
             url="help:user/artiax_index.html",
         )
         register("artiax delete duplicates", desc, artiax_delete_duplicates)
 
+    def register_artiax_neighbors():
+        desc = CmdDesc(
+            required=[("models", Or(ModelsArg, EmptyArg))],
+            keyword=[
+                ("k", IntArg),
+                ("maxDistance", FloatArg),
+                ("prefix", StringArg),
+            ],
+            synopsis="Compute nearest neighbour attributes of particles.",
+            url="help:user/commands/artiax_neighbors.html",
+        )
+        register("artiax neighbors", desc, artiax_neighbors)
+
+    def register_artiax_cluster():
+        desc = CmdDesc(
+            required=[("models", Or(ModelsArg, EmptyArg))],
+            keyword=[
+                ("radius", FloatArg),
+                ("minSamples", IntArg),
+                ("maxAngle", FloatArg),
+                ("attribute", StringArg),
+                ("fit", EnumOf(("sphere", "line", "surface", "boundary"))),
+            ],
+            required_arguments=["radius"],
+            synopsis="Cluster particles by density.",
+            url="help:user/commands/artiax_cluster.html",
+        )
+        register("artiax cluster", desc, artiax_cluster)
+
 
     register_artiax_start()
     register_artiax_open_tomo()
@@ -2118,6 +2348,7 @@ def register_artiax(logger):
     register_artiax_triangulate()
     register_artiax_boundary()
     register_artiax_mask()
+    register_artiax_select()
     register_select_inside_surface()
     register_artiax_remove_links()
     register_artiax_triangles_from_links()
@@ -2142,6 +2373,8 @@ def register_artiax(logger):
     register_artiax_save()
     register_artiax_user_guide()
     register_artiax_delete_duplicates()
+    register_artiax_neighbors()
+    register_artiax_cluster()
 
 
 # Possible styles
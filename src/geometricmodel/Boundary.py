@@ -13,6 +13,7 @@ from chimerax.core.models import Model
 
 # ArtiaX imports
 from .GeoModel import GeoModel
+from ..particle.SpatialIndex import SpatialIndex
 
 
 class Boundary(GeoModel):
@@ -97,13 +98,13 @@ class Boundary(GeoModel):
         if self.particles is not None:
             unaligned = [None] * len(particles)
             unaligned_index = 0
+            vert_tree = SpatialIndex(points=verts)
             for i, particle in enumerate(self.particles):
                 if particle in particles:
                     curr_normals = np.zeros((0,3))
-                    for j, vert in enumerate(verts):
-                        if np.isclose(particle.coord, vert).all():
-                            curr_normals = vertex_normals[j][:vertex_normal_indices[j]]
-                            break
+                    j = vert_tree.query_knn(particle.coord, k=1)[1][0, 0]
+                    if j >= 0 and np.isclose(particle.coord, verts[j]).all():
+                        curr_normals = vertex_normals[j][:vertex_normal_indices[j]]
                     if len(curr_normals) > 0:
                         # Rotate to average normal
                         normal = np.add.reduce(curr_normals)
@@ -286,6 +286,14 @@ def triangulate_selected(session, furthest_site):
         session.logger.warning("Select at least five points")
         return
 
+    if any(marker is None for marker in markers):
+        from chimerax.core.errors import UserError
+
+        raise UserError(
+            "Some selected particles have no marker to link, because their particle list only shows markers for part "
+            "of its particles. Select fewer particles or use 'artiax particles lazyMarkers false'."
+        )
+
     connections = Delaunay(particle_pos, furthest_site=furthest_site).simplices
     from .TriangulationSurface import make_links
     make_links(markers, connections)
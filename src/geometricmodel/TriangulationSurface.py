@@ -10,6 +10,7 @@ from chimerax.core.models import Model
 
 # ArtiaX imports
 from .GeoModel import GeoModel
+from ..particle.SpatialIndex import SpatialIndex
 
 
 class TriangulationSurface(GeoModel):
@@ -63,31 +64,27 @@ class TriangulationSurface(GeoModel):
         it works pretty well."""
         from chimerax.geometry import z_align
 
-        verts = np.zeros((0,3))
+        tris = np.asarray(self.tri, dtype=np.float64).reshape((-1, 3, 3))
+        corners = tris.reshape((-1, 3))
+        tri_normals = np.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0])
+        tri_normals = tri_normals / np.linalg.norm(tri_normals, axis=1)[:, np.newaxis]
+
+        # Merge corners that are (almost) at the same position, keeping the order of first appearance
+        tol = 1e-5 * np.abs(corners).max() + 1e-8
+        close = SpatialIndex(points=corners).query_radius(corners, tol)
+        first = np.array([c.min() for c in close], dtype=np.int64)
+        first_unique = np.unique(first)
+        verts = corners[first_unique]
+        vert_of_corner = np.searchsorted(first_unique, first)
+
         max_normals = 10
-        normals = np.zeros((len(self.tri) * 3, max_normals, 3))
-        normals_indices = np.zeros(len(normals), dtype=np.int32)
-        vertex_index = 0
-        for tri in self.tri:
-            normal = np.cross(tri[1] - tri[0], tri[2] - tri[0])
-            normal = normal/np.linalg.norm(normal)
-            for corner in tri:
-                added_index = None
-                for i, vert in enumerate(verts):
-                    if np.isclose(vert, corner).all():
-                        added_index = i
-                if added_index is not None:
-                    normals[added_index][normals_indices[added_index]] = normal
-                    normals_indices[added_index] += 1
-                    if normals_indices[added_index] == max_normals:
-                        normals_indices[added_index] = max_normals - 1
-                else:
-                    verts = np.append(verts, [corner], axis=0)
-                    normals[vertex_index][0] = normal
-                    normals_indices[vertex_index] = 1
-                    vertex_index += 1
-        normals = normals[:vertex_index]
-        normals_indices = normals_indices[:vertex_index]
+        normals = np.zeros((len(verts), max_normals, 3))
+        normals_indices = np.zeros(len(verts), dtype=np.int32)
+        for corner_index, vert_index in enumerate(vert_of_corner):
+            normals[vert_index][normals_indices[vert_index]] = tri_normals[corner_index // 3]
+            normals_indices[vert_index] += 1
+            if normals_indices[vert_index] == max_normals:
+                normals_indices[vert_index] = max_normals - 1
         average_vert = sum(verts)/len(verts)
         for i, vert_norms in enumerate(normals):
             vert_to_avarage = average_vert - verts[i]
@@ -97,11 +94,12 @@ class TriangulationSurface(GeoModel):
 
         handled_particles = np.array([])
         if self.particles is not None:
+            vert_tree = SpatialIndex(points=verts)
             for particle in self.particles:
                 if particle in particles and not particle in handled_particles:
                     handled_particles = np.append(handled_particles, particle)
                     pos = np.asarray(particle.coord)
-                    vert_index = np.where(verts==particle.coord)[0][0]
+                    vert_index = vert_tree.query_knn(pos, k=1)[1][0, 0]
                     normal = np.add.reduce(normals[vert_index])
                     rot = z_align(pos, pos + normal).zero_translation().inverse()
                     # Set rotation
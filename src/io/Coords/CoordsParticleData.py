@@ -43,6 +43,32 @@ class GenericEulerRotation(EulerRotation):
 
         return angle
 
+    def rot1_from_matrices(self, matrices):
+        """Phi, vectorized"""
+        matrices = np.asarray(matrices, dtype=np.float64)
+        angle = np.arctan2(matrices[:, 2, 0], matrices[:, 2, 1]) * 180.0 / np.pi
+
+        # Singularity check
+        return np.where(matrices[:, 2, 2] > 0.9999, 0.0, angle)
+
+    def rot2_from_matrices(self, matrices):
+        """Theta, vectorized"""
+        matrices = np.asarray(matrices, dtype=np.float64)
+        angle = np.arctan2(np.sqrt(1 - (matrices[:, 2, 2] * matrices[:, 2, 2])), matrices[:, 2, 2]) * 180.0 / np.pi
+
+        return angle
+
+    def rot3_from_matrices(self, matrices):
+        """Psi, vectorized"""
+        matrices = np.asarray(matrices, dtype=np.float64)
+
+        # Singularity check, arccos is only valid in the singular case
+        with np.errstate(invalid="ignore"):
+            singular = -1.0 * np.sign(matrices[:, 0, 1]) * np.arccos(matrices[:, 0, 0]) * 180.0 / np.pi
+        angle = np.arctan2(matrices[:, 0, 2], -matrices[:, 1, 2]) * 180.0 / np.pi
+
+        return np.where(matrices[:, 2, 2] > 0.9999, singular, angle)
+
 
 class CoordsParticleData(ParticleData):
 
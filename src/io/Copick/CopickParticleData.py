@@ -119,6 +119,35 @@ class CopickEulerRotation(EulerRotation):
 
         return angle
 
+    def rot1_from_matrices(self, matrices):
+        """Phi, vectorized"""
+        matrices = np.asarray(matrices, dtype=np.float64)
+        matrices = np.clip(matrices, -1, 1)
+        angle = np.arctan2(matrices[:, 2, 0], matrices[:, 2, 1]) * 180.0 / np.pi
+
+        # Singularity check
+        return np.where(matrices[:, 2, 2] > 0.9999, 0.0, angle)
+
+    def rot2_from_matrices(self, matrices):
+        """Theta, vectorized"""
+        matrices = np.asarray(matrices, dtype=np.float64)
+        matrices = np.clip(matrices, -1, 1)
+        angle = np.arctan2(np.sqrt(1 - (matrices[:, 2, 2] * matrices[:, 2, 2])), matrices[:, 2, 2]) * 180.0 / np.pi
+
+        return angle
+
+    def rot3_from_matrices(self, matrices):
+        """Psi, vectorized"""
+        matrices = np.asarray(matrices, dtype=np.float64)
+        matrices = np.clip(matrices, -1, 1)
+
+        # Singularity check, arccos is only valid in the singular case
+        with np.errstate(invalid="ignore"):
+            singular = -1.0 * np.sign(matrices[:, 0, 1]) * np.arccos(matrices[:, 0, 0]) * 180.0 / np.pi
+        angle = np.arctan2(matrices[:, 0, 2], -matrices[:, 1, 2]) * 180.0 / np.pi
+
+        return np.where(matrices[:, 2, 2] > 0.9999, singular, angle)
+
 class CopickParticleData(ParticleData):
     DATA_KEYS = {
         'location_x': ['location_x'],
@@ -160,6 +189,8 @@ class CopickParticleData(ParticleData):
 
         self.picks = CopickPicksFile(**data)
 
+        ids = []
+        rotations = []
         for point in self.picks.points:
             p = self.new_particle()
 
@@ -169,7 +200,12 @@ class CopickParticleData(ParticleData):
             p['location_y'] = point.location.y
             p['location_z'] = point.location.z
 
-            p.rotation = point.transformation[0:3, :]
+            ids.append(p.id)
+            rotations.append(point.transformation[0:3, 0:3])
+
+        # Convert all rotations at once
+        if len(ids) > 0:
+            self.set_rotations(ids, np.array(rotations))
 
 
 
@@ -2,10 +2,11 @@
 
 # General
 from __future__ import annotations
-from uuid import uuid4
 from collections import OrderedDict
 from importlib import import_module
 
+import numpy as np
+
 # ChimeraX
 from chimerax.core.errors import UserError
 from chimerax.core.state import State
@@ -59,6 +60,54 @@ class EulerRotation(State):
         """
         pass
 
+    def rot1_from_matrices(self, matrices):
+        """
+        Compute the 1st rotation angles from an array of rotation matrices (N, 3, 3) or transformation matrices
+        (N, 3, 4). Should be overridden in particle list file format definition, the default applies
+        EulerRotation.rot1_from_matrix() to each matrix.
+        """
+        return np.array(
+            [self.rot1_from_matrix(m) for m in np.array(matrices, dtype=np.float64)],
+            dtype=np.float64,
+        )
+
+    def rot2_from_matrices(self, matrices):
+        """
+        Compute the 2nd rotation angles from an array of rotation matrices (N, 3, 3) or transformation matrices
+        (N, 3, 4). Should be overridden in particle list file format definition, the default applies
+        EulerRotation.rot2_from_matrix() to each matrix.
+        """
+        return np.array(
+            [self.rot2_from_matrix(m) for m in np.array(matrices, dtype=np.float64)],
+            dtype=np.float64,
+        )
+
+    def rot3_from_matrices(self, matrices):
+        """
+        Compute the 3rd rotation angles from an array of rotation matrices (N, 3, 3) or transformation matrices
+        (N, 3, 4). Should be overridden in particle list file format definition, the default applies
+        EulerRotation.rot3_from_matrix() to each matrix.
+        """
+        return np.array(
+            [self.rot3_from_matrix(m) for m in np.array(matrices, dtype=np.float64)],
+            dtype=np.float64,
+        )
+
+    def angles_from_matrices(self, matrices):
+        """Compute all three rotation angles from an array of rotation matrices (N, 3, 3) or transformation matrices
+        (N, 3, 4).
+
+        Returns
+        -------
+        angles: tuple of three numpy.ndarray of shape (N,)
+            The 1st, 2nd and 3rd rotation angles in degrees.
+        """
+        return (
+            self.rot1_from_matrices(matrices),
+            self.rot2_from_matrices(matrices),
+            self.rot3_from_matrices(matrices),
+        )
+
     def as_place(self, ang_1, ang_2, ang_3):
         """Compute the full rotation, combining the rotations in order M3 * M2 * M1
 
@@ -87,40 +136,837 @@ class EulerRotation(State):
 
         return rot3 * rot2 * rot1
 
+    def as_matrices(self, ang_1, ang_2, ang_3):
+        """Compute the full rotations for arrays of angles, combining the rotations in order M3 * M2 * M1. Vectorized
+        version of EulerRotation.as_place().
 
-class Particle(State):
+        Parameters
+        ----------
+        ang_1 : array-like of float, shape (N,)
+            1st Rotation angles in degrees.
+        ang_2: array-like of float, shape (N,)
+            2nd Rotation angles in degrees.
+        ang_3: array-like of float, shape (N,)
+            3rd Rotation angles in degrees.
+
+        Returns
+        -------
+        matrices: numpy.ndarray, shape (N, 3, 4)
+            The full rotations as 3x4 affine matrices with zero translation.
+        """
+        ang_1 = np.asarray(ang_1, dtype=np.float64)
+        ang_2 = np.asarray(ang_2, dtype=np.float64)
+        ang_3 = np.asarray(ang_3, dtype=np.float64)
+
+        if self.invert_dir:
+            ang_1 = -ang_1
+            ang_2 = -ang_2
+            ang_3 = -ang_3
+
+        rot1 = _rotation_matrices(self.axis_1, ang_1)
+        rot2 = _rotation_matrices(self.axis_2, ang_2)
+        rot3 = _rotation_matrices(self.axis_3, ang_3)
+
+        matrices = np.zeros((len(ang_1), 3, 4), dtype=np.float64)
+        matrices[:, :, :3] = rot3 @ rot2 @ rot1
+
+        return matrices
+
+
+def _rotation_matrices(axis, angles):
+    """Rotation matrices (N, 3, 3) for right-handed rotations about axis by angles (degrees), as computed by
+    chimerax.geometry.rotation."""
+    x, y, z = np.asarray(axis, dtype=np.float64) / np.linalg.norm(axis)
+    arad = np.radians(angles)
+    sa = np.sin(arad)
+    ca = np.cos(arad)
+    k = 1 - ca
+
+    m = np.empty((len(angles), 3, 3), dtype=np.float64)
+    m[:, 0, 0] = 1 + k * (x * x - 1)
+    m[:, 0, 1] = -z * sa + k * x * y
+    m[:, 0, 2] = y * sa + k * x * z
+    m[:, 1, 0] = z * sa + k * x * y
+    m[:, 1, 1] = 1 + k * (y * y - 1)
+    m[:, 1, 2] = -x * sa + k * y * z
+    m[:, 2, 0] = -y * sa + k * x * z
+    m[:, 2, 1] = x * sa + k * y * z
+    m[:, 2, 2] = 1 + k * (z * z - 1)
+
+    return m
+
+
+def _column_dtype(value):
+    """Returns the numpy dtype of a column that can hold value without loss."""
+    if isinstance(value, (bool, int, np.integer, np.bool_)):
+        return np.dtype(np.int64)
+    elif isinstance(value, (float, np.floating)):
+        return np.dtype(np.float64)
+    else:
+        return np.dtype(object)
+
+
+def _fits_column(column, value):
+    """Returns True if value can be written to column without changing its dtype."""
+    kind = column.dtype.kind
+
+    if kind == "O":
+        return True
+    elif isinstance(value, (str, bytes)):
+        return False
+    elif kind == "i":
+        return isinstance(value, (bool, int, np.integer, np.bool_))
+    elif kind == "f":
+        return isinstance(value, (bool, int, float, np.integer, np.floating, np.bool_))
+
+    return False
+
+
+class ParticleStore:
     """
-    A Particle contains information about the position and orientation of an object of interest (usually protein)
-    within a tomogram, as well as particle format specific metadata.
+    ParticleStore holds the data of all particles of one :class:`ParticleData` instance as a structure of arrays. Each
+    data entry is stored in one typed numpy column (int64, float64 or object), particles are rows addressed through a
+    map from particle ID to row index. The alias table is shared by all particles of the list.
+
+    Particle IDs are positive integers, handed out in increasing order and never reused within a store. The map from ID
+    to row index is a dense integer array (-1 for deleted IDs), so that IDs can be resolved to rows vectorized.
+
+    Columns are allocated with spare capacity, so that appending particles is amortized constant time. Deleting
+    particles compacts all columns at once.
+
+    Every change increments a version counter. Statistics of numeric columns are cached and updated incrementally
+    when single values, rows or particles change, a column is only rescanned if its minimum or maximum is lost.
     """
 
-    def __init__(
-        self, id, data_keys, default_params, rot, pixelsize_ori, pixelsize_tra
-    ):  # rot1, rot2, rot3, pixelsize_ori, pixelsize_tra):
-        self.id = id
-        """This particles' uuid."""
+    MIN_CAPACITY = 64
+    """Minimum number of rows allocated per column."""
+
+    def __init__(self, rot, pixelsize_ori=1, pixelsize_tra=1):
+        self._rot = rot
+        """Class of type EulerRotation, describing conversion matrix->angle for all rotations."""
+        self.rot = rot()
+        """Instance of type EulerRotation, shared by all particles of the store."""
         self.pixelsize_ori = pixelsize_ori
         """Pixelsize with which the origin is specified."""
         self.pixelsize_tra = pixelsize_tra
         """Pixelsize with which the translation is specified."""
-        self._data = {}
-        """Dict containing attributes of the particle by name."""
+
+        self._data_keys = {}
+        """Dict mapping file format description to aliases."""
+        self._default_params = {}
+        """Dict mapping expected parameters to file format description."""
         self._alias = {}
-        """Dict mapping aliases for attribute names in :class:.Particle._data"""
+        """Dict mapping aliases to column names."""
+        self._defaults = {}
+        """Dict mapping column names to the value of new rows."""
+        self._columns = OrderedDict()
+        """Dict mapping column names to numpy arrays of length capacity."""
+
+        self._ids = np.zeros(0, dtype=np.int64)
+        """Array mapping row index to particle ID, length capacity."""
+        self._row_of = np.full(1, -1, dtype=np.int64)
+        """Array mapping particle ID to row index, -1 for IDs not present."""
+        self._next_id = 1
+        """The next free particle ID. ID 0 is never used, so IDs are always truthy."""
+        self._size = 0
+        self._capacity = 0
+
+        self._version = 0
+        """Incremented on every change of the particle data."""
+        self._stats = {}
+        """Cached statistics of numeric columns, column name -> [count, sum, sum of squares, min, max]."""
+        self._histograms = {}
+        """Cached histograms of numeric columns, column name -> (version, bins, counts, edges, sorted values)."""
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, _id):
+        try:
+            _id = int(_id)
+        except (TypeError, ValueError):
+            return False
+
+        return 0 < _id < self._next_id and self._row_of[_id] >= 0
+
+    @property
+    def ids(self):
+        """Array of particle IDs in row order. This is a view into the store and must not be modified."""
+        return self._ids[: self._size]
+
+    def row(self, _id):
+        """Returns the row index of a particle ID."""
+        if _id not in self:
+            raise KeyError(_id)
+
+        return int(self._row_of[_id])
+
+    def rows(self, ids):
+        """Returns the row indices of a sequence of particle IDs as an integer array."""
+        ids = np.asarray(ids, dtype=np.int64)
+
+        if ids.size == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        if ids.min() <= 0 or ids.max() >= self._next_id:
+            raise KeyError("Unknown particle ID.")
+
+        rows = self._row_of[ids]
+        if rows.min() < 0:
+            raise KeyError("Particle ID {} was deleted.".format(ids[rows < 0][0]))
+
+        return rows
+
+    def new_id(self):
+        """Reserve and return a new particle ID."""
+        _id = self._next_id
+        self._reserve_ids(_id + 1)
+
+        return _id
+
+    def _reserve_ids(self, next_id):
+        """Make sure IDs smaller than next_id can be mapped to rows."""
+        if next_id > self._next_id:
+            self._next_id = next_id
+
+        if self._next_id > len(self._row_of):
+            row_of = np.full(max(self._next_id, 2 * len(self._row_of)), -1, dtype=np.int64)
+            row_of[: len(self._row_of)] = self._row_of
+            self._row_of = row_of
+
+    def keys(self):
+        """Returns the names of all columns."""
+        return list(self._columns.keys())
+
+    @property
+    def version(self):
+        """Version counter of the data, changes whenever particles or values change."""
+        return self._version
+
+    def _changed(self, key=None):
+        """Increment the version and drop cached statistics of column key (all columns if None)."""
+        self._version += 1
+
+        if key is None:
+            self._stats.clear()
+        else:
+            self._stats.pop(key, None)
+
+    def _stats_add(self, count):
+        """Update cached statistics of all columns for count new rows holding the column defaults."""
+        for key, st in list(self._stats.items()):
+            value = self._defaults.get(key, 0)
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                self._stats.pop(key)
+                continue
+
+            st[0] += count
+            st[1] += value * count
+            st[2] += value * value * count
+            st[3] = min(st[3], value)
+            st[4] = max(st[4], value)
+
+    def stats(self, key):
+        """
+        Returns statistics of a numeric attribute.
+
+        Parameters
+        ----------
+        key : str
+            Attribute name or alias.
+
+        Returns
+        -------
+        stats : dict or None
+            Dict with keys 'min', 'max', 'mean', 'std' and 'var', None if the column is not numeric or the store is
+            empty.
+        """
+        key = self._alias.get(key, key)
+        column = self._columns.get(key)
+
+        if column is None or column.dtype.kind not in "iuf" or self._size == 0:
+            return None
+
+        st = self._stats.get(key)
+        if st is None:
+            values = column[: self._size]
+            as_float = values.astype(np.float64, copy=False)
+            st = [
+                self._size,
+                float(as_float.sum()),
+                float(np.dot(as_float, as_float)),
+                values.min().item(),
+                values.max().item(),
+            ]
+            self._stats[key] = st
+
+        count, total, squares, mini, maxi = st
+        mean = total / count
+        var = max(squares / count - mean * mean, 0.0)
+
+        return {"min": mini, "max": maxi, "mean": mean, "std": var**0.5, "var": var}
+
+    def _histogram_entry(self, key, bins=None):
+        """Returns the cached histogram entry of a column, recomputed if the data version changed. bins None accepts
+        a cached entry with any number of bins."""
+        key = self._alias.get(key, key)
+        column = self._columns.get(key)
+
+        if column is None or column.dtype.kind not in "iuf" or self._size == 0:
+            return None
+
+        entry = self._histograms.get(key)
+        if entry is None or entry[0] != self._version or (bins is not None and entry[1] != bins):
+            bins = 64 if bins is None else bins
+            st = self.stats(key)
+            values = np.sort(column[: self._size])
+            counts, edges = np.histogram(values, bins=bins, range=(st["min"], st["max"]))
+            entry = (self._version, bins, counts, edges, values)
+            self._histograms[key] = entry
+
+        return entry
+
+    def histogram(self, key, bins=64):
+        """
+        Returns the histogram of a numeric attribute. Histograms are cached until the data changes.
+
+        Parameters
+        ----------
+        key : str
+            Attribute name or alias.
+        bins : int
+            Number of bins between minimum and maximum of the attribute.
+
+        Returns
+        -------
+        counts : numpy.ndarray or None
+            Number of values in each bin, None if the column is not numeric or the store is empty.
+        edges : numpy.ndarray or None
+            The bins+1 bin edges.
+        """
+        entry = self._histogram_entry(key, bins)
+
+        if entry is None:
+            return None, None
+
+        return entry[2], entry[3]
+
+    def count_in_range(self, key, minimum, maximum):
+        """Returns the number of particles with minimum <= value <= maximum of a numeric attribute. Uses the sorted
+        values cached with the histogram, so repeated calls don't scan the column."""
+        entry = self._histogram_entry(key)
+
+        if entry is None:
+            return 0
+
+        values = entry[4]
+        lower = np.searchsorted(values, minimum, side="left")
+        upper = np.searchsorted(values, maximum, side="right")
+
+        return int(max(upper - lower, 0))
+
+    def set_schema(self, data_keys, default_params):
+        """
+        Initialize columns and the alias table from a data format specification. Columns for new keys are added,
+        existing columns are kept. If the store is empty, columns no longer in the specification are dropped.
+
+        Parameters
+        ----------
+        data_keys : dict
+            Dict mapping file format description to aliases.
+        default_params : dict
+            Dict mapping expected parameters to file format description.
+        """
+
+        expected_entries = [
+            "pos_x",
+            "pos_y",
+            "pos_z",
+            "shift_x",
+            "shift_y",
+            "shift_z",
+            "ang_1",
+            "ang_2",
+            "ang_3",
+        ]
+
+        # Define a dictionary for exceptions and their default values
+        exception_defaults = {
+            "rlnAngleRot": 0.0,
+            "rlnAngleTilt": 90.0,
+            "rlnAnglePsi": 0.0,
+        }
+
+        # note if relion5 file
+        rel5_file = "rlnCenteredCoordinateXAngst" in data_keys
+
+        defaults = {}
+        alias = {}
+
+        # Add all data entries and aliases
+        for key, value in data_keys.items():
+            if key in exception_defaults and rel5_file:
+                defaults[key] = exception_defaults[key]
+            else:
+                defaults[key] = 0
+
+            for v in value:
+                alias[v] = key
+
+        # Add aliases for the standard interface
+        for key, value in default_params.items():
+            alias[key] = value
+            if key in expected_entries:
+                expected_entries.remove(key)
+
+        # Does the data format conform to our spec?
+        if len(expected_entries) > 0:
+            raise UserError(
+                "Incomplete Particle List format definition for format {}.".format(
+                    self._rot.__name__
+                )
+            )
+
         self._data_keys = data_keys
-        """Dict mapping file format description to aliases."""
         self._default_params = default_params
-        """Dict mapping expected parameters to file format description."""
-        self._angle_alias = []
-        """List containing all the aliases for rotations."""
+        self._alias = alias
+
+        if self._size == 0:
+            for key in list(self._columns.keys()):
+                if key not in defaults:
+                    self._columns.pop(key)
+                    self._defaults.pop(key, None)
+
+        for key, value in defaults.items():
+            if key not in self._columns:
+                self._add_column(key, value)
+            elif self._size == 0:
+                self._defaults[key] = value
+                self._columns[key] = np.full(self._capacity, value, dtype=_column_dtype(value))
+
+        self._changed()
+
+    def resolve(self, key):
+        """Returns the column name for a key or alias."""
+        return self._alias.get(key, key)
+
+    def _add_column(self, key, default):
+        """Allocate a new column filled with default."""
+        column = np.empty(self._capacity, dtype=_column_dtype(default))
+        column[:] = default
+        self._columns[key] = column
+        self._defaults[key] = default
+
+        return column
+
+    def _promote(self, key, value):
+        """Change dtype of a column so that it can hold value."""
+        column = self._columns[key]
+
+        if column.dtype.kind == "i" and _column_dtype(value).kind == "f":
+            dtype = np.float64
+        else:
+            dtype = object
 
-        self._rot = rot
-        """Class of type EulerRotation, describing conversion matrix->angle for 3 rotations."""
+        column = column.astype(dtype)
+        self._columns[key] = column
+
+        return column
+
+    def _grow(self, min_capacity):
+        """Reallocate all columns to hold at least min_capacity rows."""
+        capacity = max(min_capacity, 2 * self._capacity, self.MIN_CAPACITY)
+
+        for key, column in self._columns.items():
+            new_column = np.empty(capacity, dtype=column.dtype)
+            new_column[: self._capacity] = column
+            new_column[self._capacity :] = self._defaults.get(key, 0)
+            self._columns[key] = new_column
+
+        ids = np.zeros(capacity, dtype=np.int64)
+        ids[: self._size] = self._ids[: self._size]
+        self._ids = ids
+
+        self._capacity = capacity
+
+    def append(self, _id=None):
+        """Add a row with default values for particle ID (a new ID if None). Returns the ID."""
+        if _id is None:
+            _id = self.new_id()
+        elif _id in self:
+            raise KeyError("Particle ID {} already present.".format(_id))
+        else:
+            self._reserve_ids(_id + 1)
+
+        if self._size == self._capacity:
+            self._grow(self._size + 1)
+
+        row = self._size
+        self._ids[row] = _id
+        self._row_of[_id] = row
+        self._size += 1
+
+        self._version += 1
+        self._stats_add(1)
+
+        return _id
+
+    def extend(self, count):
+        """Add count rows with default values and new IDs. Returns the new IDs as an array."""
+        start = self._size
+        stop = start + count
+
+        if stop > self._capacity:
+            self._grow(stop)
+
+        ids = np.arange(self._next_id, self._next_id + count, dtype=np.int64)
+        self._reserve_ids(self._next_id + count)
+
+        self._ids[start:stop] = ids
+        self._row_of[ids] = np.arange(start, stop, dtype=np.int64)
+        self._size = stop
+
+        self._version += 1
+        self._stats_add(count)
+
+        return ids.copy()
+
+    def delete(self, ids):
+        """Delete the rows of all particle IDs and compact the columns."""
+        rows = self.rows(ids)
+
+        if len(rows) == 0:
+            return
+
+        # Remove deleted values from cached statistics, unless an extreme value is deleted
+        for key, st in list(self._stats.items()):
+            values = self._columns[key][rows].astype(np.float64)
+            if values.min() <= st[3] or values.max() >= st[4]:
+                self._stats.pop(key)
+                continue
+
+            st[0] -= len(rows)
+            st[1] -= float(values.sum())
+            st[2] -= float(np.dot(values, values))
+
+        self._version += 1
+
+        keep = np.ones(self._size, dtype=bool)
+        keep[rows] = False
+        size = int(np.count_nonzero(keep))
+
+        for key, column in self._columns.items():
+            column[:size] = column[: self._size][keep]
+            column[size : self._size] = self._defaults.get(key, 0)
+
+        self._row_of[self._ids[rows]] = -1
+        self._ids[:size] = self._ids[: self._size][keep]
+        self._row_of[self._ids[:size]] = np.arange(size, dtype=np.int64)
+        self._size = size
+
+    def get(self, _id, key):
+        """Returns the value of the attribute key (or alias) of particle _id."""
+        return self._columns[self._alias.get(key, key)].item(self.row(_id))
+
+    def set(self, _id, key, value):
+        """Sets the value of the attribute key (or alias) of particle _id. Creates the column if necessary."""
+        key = self._alias.get(key, key)
+        column = self._columns.get(key)
+
+        if column is None:
+            column = self._add_column(key, 0)
+
+        if not _fits_column(column, value):
+            column = self._promote(key, value)
+
+        row = self.row(_id)
+        st = self._stats.get(key)
+
+        if st is not None and column.dtype.kind in "iuf":
+            old = column.item(row)
+            st[1] += value - old
+            st[2] += value * value - old * old
+
+            # Extreme value replaced by a less extreme one, needs rescan
+            if (old == st[3] and value > old) or (old == st[4] and value < old):
+                self._stats.pop(key)
+            else:
+                st[3] = min(st[3], value)
+                st[4] = max(st[4], value)
+
+            self._version += 1
+        else:
+            self._changed(key)
+
+        column[row] = value
+
+    def set_values(self, rows, key, values):
+        """
+        Sets the values of an attribute for a subset of rows. Creates the column if necessary and changes its dtype if
+        the values do not fit.
+
+        Parameters
+        ----------
+        rows : array-like of int or slice
+            The row indices.
+        key : str
+            Attribute name or alias.
+        values : array-like
+            The values, one per row.
+        """
+        key = self._alias.get(key, key)
+        values = np.asarray(values)
+        column = self._columns.get(key)
+
+        if column is None:
+            column = self._add_column(key, 0)
+
+        kind = column.dtype.kind
+        if kind == "i" and values.dtype.kind == "f":
+            column = self._columns[key] = column.astype(np.float64)
+        elif kind != "O" and values.dtype.kind not in "iubf":
+            column = self._columns[key] = column.astype(object)
+
+        st = self._stats.get(key)
+        if st is None or column.dtype.kind not in "iuf" or isinstance(rows, slice):
+            self._changed(key)
+            column[rows] = values
+            return
+
+        # Update cached statistics with the changed values only
+        rows = np.asarray(rows, dtype=np.int64).ravel()
+        old = column[rows].astype(np.float64)
+        column[rows] = values
+        new = column[rows].astype(np.float64)
+        self._version += 1
+
+        if len(rows) == 0:
+            return
+
+        # Repeated rows or NaN can't be accounted for, extreme value replaced by a less extreme one needs rescan
+        if (
+            len(np.unique(rows)) != len(rows)
+            or np.isnan(new).any()
+            or np.any((old == st[3]) & (new > old))
+            or np.any((old == st[4]) & (new < old))
+        ):
+            self._stats.pop(key)
+            return
+
+        st[1] += float(new.sum()) - float(old.sum())
+        st[2] += float(np.dot(new, new)) - float(np.dot(old, old))
+        st[3] = min(st[3], column[rows].min().item())
+        st[4] = max(st[4], column[rows].max().item())
+
+    def column(self, key):
+        """
+        Returns the values of an attribute for all particles in row order. The returned array is a view into the
+        store, it is invalidated by adding or deleting particles.
+
+        Parameters
+        ----------
+        key : str
+            Attribute name or alias.
+
+        Returns
+        -------
+        values : numpy.ndarray
+            The column.
+        """
+        key = self._alias.get(key, key)
+        column = self._columns.get(key)
+
+        if column is None:
+            column = self._add_column(key, 0)
+
+        return column[: self._size]
+
+    def set_column(self, key, values):
+        """
+        Sets the values of an attribute for all particles in row order. The dtype of the column is derived from the
+        values.
+
+        Parameters
+        ----------
+        key : str
+            Attribute name or alias.
+        values : array-like
+            Values, one per particle.
+        """
+        key = self._alias.get(key, key)
+        values = np.asarray(values)
+
+        if values.shape != (self._size,):
+            raise ValueError(
+                "Expected {} values for {}, got array of shape {}.".format(
+                    self._size, key, values.shape
+                )
+            )
+
+        if values.dtype.kind in "iub":
+            dtype = np.int64
+        elif values.dtype.kind == "f":
+            dtype = np.float64
+        else:
+            dtype = object
+
+        default = self._defaults.setdefault(key, 0)
+        column = np.empty(self._capacity, dtype=dtype)
+        column[: self._size] = values
+        column[self._size :] = default
+        self._columns[key] = column
+        self._changed(key)
+
+    def copy_row(self, other, src_id, dst_id=None):
+        """Copy all attributes of particle src_id in store other to particle dst_id in this store. Adds the row if
+        dst_id is not present."""
+        if dst_id is None:
+            dst_id = src_id
+
+        if dst_id not in self:
+            self.append(dst_id)
+
+        row = other.row(src_id)
+        for key, column in other._columns.items():
+            self.set(dst_id, key, column.item(row))
+
+    def copy(self, ids=None):
+        """
+        Returns a copy of this store, optionally restricted to a subset of particle IDs.
+
+        Parameters
+        ----------
+        ids : sequence of int
+            The IDs of the particles to copy. All particles if None. IDs are kept.
+        """
+        store = ParticleStore(self._rot, self.pixelsize_ori, self.pixelsize_tra)
+        store._data_keys = self._data_keys
+        store._default_params = self._default_params
+        store._alias = self._alias.copy()
+        store._defaults = self._defaults.copy()
+
+        rows = slice(0, self._size) if ids is None else self.rows(ids)
+        for key, column in self._columns.items():
+            store._columns[key] = column[rows].copy()
+
+        store._ids = self._ids[rows].copy()
+        store._size = len(store._ids)
+        store._capacity = store._size
+        store._next_id = self._next_id
+        store._row_of = np.full(len(self._row_of), -1, dtype=np.int64)
+        store._row_of[store._ids] = np.arange(store._size, dtype=np.int64)
+
+        return store
+
+    def assign(self, other):
+        """Replace the content of this store with a copy of the content of store other. Pixelsizes are kept."""
+        store = other.copy()
+        self._alias = store._alias
+        self._defaults = store._defaults
+        self._columns = store._columns
+        self._ids = store._ids
+        self._row_of = store._row_of
+        self._next_id = store._next_id
+        self._size = store._size
+        self._capacity = store._capacity
+        self._changed()
+
+    def snapshot(self):
+        """Returns the content of this store as a dictionary for session saving."""
+        columns = {}
+        dtypes = {}
+        for key, column in self._columns.items():
+            dtypes[key] = column.dtype.str
+            if column.dtype.kind == "O":
+                columns[key] = column[: self._size].tolist()
+            else:
+                columns[key] = column[: self._size].copy()
+
+        return {
+            "ids": self.ids.copy(),
+            "next_id": self._next_id,
+            "columns": columns,
+            "dtypes": dtypes,
+        }
+
+    def restore(self, data):
+        """Replace the content of this store with the content of a dictionary created by ParticleStore.snapshot()."""
+        self._ids = np.array(data["ids"], dtype=np.int64)
+        self._size = len(self._ids)
+        self._capacity = self._size
+        self._next_id = 1
+        self._row_of = np.full(1, -1, dtype=np.int64)
+        self._reserve_ids(max(data["next_id"], int(self._ids.max(initial=0)) + 1))
+        self._row_of[self._ids] = np.arange(self._size, dtype=np.int64)
+
+        self._columns = OrderedDict()
+        for key, values in data["columns"].items():
+            self._columns[key] = np.array(values, dtype=np.dtype(data["dtypes"][key]))
+            self._defaults.setdefault(key, 0)
+
+        self._changed()
 
-        self.rot = self._rot()
+
+class Particle(State):
+    """
+    A Particle contains information about the position and orientation of an object of interest (usually protein)
+    within a tomogram, as well as particle format specific metadata.
+
+    Particle objects do not hold any data themselves, they are a view of one row of a :class:`ParticleStore`.
+    """
+
+    def __init__(self, store, id):
+        self._store = store
+        """The ParticleStore holding this particles' data."""
+        self.id = id
+        """This particles' ID, unique within its ParticleData."""
+
+    def __eq__(self, other):
+        if not isinstance(other, Particle):
+            return NotImplemented
+
+        return self._store is other._store and self.id == other.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    @property
+    def pixelsize_ori(self):
+        """Pixelsize with which the origin is specified. Shared by all particles of the list."""
+        return self._store.pixelsize_ori
+
+    @pixelsize_ori.setter
+    def pixelsize_ori(self, value):
+        self._store.pixelsize_ori = value
+
+    @property
+    def pixelsize_tra(self):
+        """Pixelsize with which the translation is specified. Shared by all particles of the list."""
+        return self._store.pixelsize_tra
+
+    @pixelsize_tra.setter
+    def pixelsize_tra(self, value):
+        self._store.pixelsize_tra = value
+
+    @property
+    def rot(self):
         """Instance of type EulerRotation, describing conversion matrix->angle for 3 rotations."""
+        return self._store.rot
 
-        self._set_keys()
+    @property
+    def _rot(self):
+        """Class of type EulerRotation, describing conversion matrix->angle for 3 rotations."""
+        return self._store._rot
+
+    @property
+    def _data_keys(self):
+        """Dict mapping file format description to aliases."""
+        return self._store._data_keys
+
+    @property
+    def _default_params(self):
+        """Dict mapping expected parameters to file format description."""
+        return self._store._default_params
 
     def full_transform(self):
         """Compute and return the full transform to rotate and move an object centered at the global origin (0, 0, 0)
@@ -129,7 +975,7 @@ class Particle(State):
 
     def attributes(self):
         """List all available data entries and their aliases for this particle."""
-        return list(self._data.keys()) + list(self._alias.keys())
+        return self._store.keys() + list(self._store._alias.keys())
 
     @property
     def coord(self):
@@ -197,14 +1043,7 @@ class Particle(State):
 
     @rotation.setter
     def rotation(self, value):
-        if isinstance(value, Place):
-            self["ang_1"] = self.rot.rot1_from_matrix(value.matrix)
-            self["ang_2"] = self.rot.rot2_from_matrix(value.matrix)
-            self["ang_3"] = self.rot.rot3_from_matrix(value.matrix)
-        else:
-            self["ang_1"] = self.rot.rot1_from_matrix(value)
-            self["ang_2"] = self.rot.rot2_from_matrix(value)
-            self["ang_3"] = self.rot.rot3_from_matrix(value)
+        self._set_rotation(value)
 
     def __getitem__(self, item):
         """
@@ -214,7 +1053,7 @@ class Particle(State):
         ----------
         item : str
             The name of the attribute to get."""
-        return self._data[self._alias.get(item, item)]
+        return self._store.get(self.id, item)
 
     def __setitem__(self, item, value):
         """
@@ -227,73 +1066,7 @@ class Particle(State):
         value
             The value to set.
         """
-        self._data[self._alias.get(item, item)] = value
-
-    def _add_alias(self, alias: str, key: str) -> None:
-        """
-        Add an alias for an attribute name
-
-        Parameters
-        ----------
-        alias : str
-            The alias to set.
-        key : str
-            The name of the attribute to map the alias to.
-        """
-        self._alias[alias] = key
-
-    def _set_keys(self):
-        """Initialize self._data and self._alias from data format specification in self._data_keys and
-        self._default_params."""
-
-        expected_entries = [
-            "pos_x",
-            "pos_y",
-            "pos_z",
-            "shift_x",
-            "shift_y",
-            "shift_z",
-            "ang_1",
-            "ang_2",
-            "ang_3",
-        ]
-
-        # Define a dictionary for exceptions and their default values
-        exception_defaults = {
-            "rlnAngleRot": 0.0,  # Example: Default for 'pos_x' is 0
-            "rlnAngleTilt": 90.0,  # Example: Default for 'pos_y' is 2.0
-            "rlnAnglePsi": 0.0,  # Example: Default for 'pos_z' is 3.0
-        }
-
-        rel5_file=False
-        #note if relion5 file
-        #print(self._data_keys.items())
-        if "rlnCenteredCoordinateXAngst" in self._data_keys:
-            rel5_file=True
-        #print(f"rel5?:{rel5_file}")
-
-        # Add all data entries and aliases
-        for key, value in self._data_keys.items():
-            if key in exception_defaults and rel5_file==True:
-                self[key] = exception_defaults[key]  # Set the exception value
-            else:
-                self[key] = 0  # Default value for other key
-
-            for v in value:
-                self._add_alias(v, key)
-
-        # Add aliases for the standard interface
-        for key, value in self._default_params.items():
-            self._add_alias(key, value)
-            expected_entries.remove(key)
-
-        # Does the data format conform to our spec?
-        if len(expected_entries) > 0:
-            raise UserError(
-                "Incomplete Particle List format definition for format {}.".format(
-                    type(self._data)
-                )
-            )
+        self._store.set(self.id, item, value)
 
     def _get_origin(self):
         """
@@ -372,28 +1145,15 @@ class Particle(State):
             The rotation transform of the particle.
         """
         if isinstance(data, Place):
-            self["ang_1"] = self.rot.rot1_from_matrix(data.matrix)
-            self["ang_2"] = self.rot.rot2_from_matrix(data.matrix)
-            self["ang_3"] = self.rot.rot3_from_matrix(data.matrix)
-        else:
-            self["ang_1"] = self.rot.rot1_from_matrix(data)
-            self["ang_2"] = self.rot.rot2_from_matrix(data)
-            self["ang_3"] = self.rot.rot3_from_matrix(data)
+            data = data.matrix
 
-    def copy(self):
-        new_part = Particle(
-            self.id,
-            self._data_keys,
-            self._default_params,
-            self._rot,
-            self.pixelsize_ori,
-            self.pixelsize_tra,
-        )
+        self["ang_1"] = self.rot.rot1_from_matrix(data)
+        self["ang_2"] = self.rot.rot2_from_matrix(data)
+        self["ang_3"] = self.rot.rot3_from_matrix(data)
 
-        for key in self._data_keys.keys():
-            new_part[key] = self[key]
-
-        return new_part
+    def copy(self):
+        """Returns a detached copy of this particle, backed by its own single row store."""
+        return Particle(self._store.copy([self.id]), self.id)
 
     def as_dict(self):
         """
@@ -432,7 +1192,7 @@ class Particle(State):
             "pixelsize_tra": self.pixelsize_tra,
             "data_keys": self._data_keys,
             "default_params": self._default_params,
-            "data": self._data,
+            "data": {key: self[key] for key in self._store.keys()},
             "euler_module": self.rot.__class__.__module__,
             "euler_class": self.rot.__class__.__name__,
         }
@@ -445,16 +1205,24 @@ class Particle(State):
         # Get the class with some magic
         euler = getattr(import_module(data["euler_module"]), data["euler_class"])
 
-        p = cls(
-            data["id"],
-            data["data_keys"],
-            data["default_params"],
+        store = ParticleStore(
             euler,
             pixelsize_ori=data["pixelsize_ori"],
             pixelsize_tra=data["pixelsize_tra"],
         )
+        store.set_schema(data["data_keys"], data["default_params"])
+
+        # Older sessions used uuid strings as IDs
+        _id = data["id"]
+        if not isinstance(_id, int):
+            _id = store.append()
+        else:
+            store.append(_id)
 
-        p._data = data["data"]  # lol
+        p = cls(store, _id)
+        p._snapshot_id = data["id"]
+        for key, value in data["data"].items():
+            p[key] = value
 
         return p
 
@@ -484,11 +1252,6 @@ class ParticleData(State):
         if additional_files is not None:
             self.additional_files = additional_files
 
-        self._particles = OrderedDict()
-        """Dict mapping unique ids to particle instances."""
-        self._orig_particles = OrderedDict()
-        """Dict containing particles for reverting. Only set when reading from File."""
-
         self._data_keys = self.DATA_KEYS.copy()
         """Dict mapping file format description to aliases."""
         self._default_params = self.DEFAULT_PARAMS.copy()
@@ -497,6 +1260,12 @@ class ParticleData(State):
         self._rot = self.ROT
         """Class of type EulerRotation, describing conversion matrix->angle for all rotations."""
 
+        self._store = ParticleStore(self._rot)
+        """Columnar storage of all particles."""
+        self._store.set_schema(self._data_keys, self._default_params)
+        self._orig_store = self._store.copy()
+        """Copy of the store for reverting. Only filled when reading from File."""
+
         self.pixelsize_ori = oripix
         """Pixelsize with which the origin is specified."""
         self.pixelsize_tra = trapix
@@ -529,22 +1298,25 @@ class ParticleData(State):
         new_pd = cls(session, None, oripix, trapix)
 
         # Copy particles
-        for _id, p in particle_data:
-            p_new = new_pd.new_particle()
+        ids = [new_pd.new_particle().id for _ in range(particle_data.size)]
+
+        if len(ids) == 0:
+            return new_pd
 
-            for attr in default:
-                p_new[attr] = p[attr]
+        for attr in default:
+            new_pd.set_column(attr, particle_data.get_column(attr))
 
-            # For angles: get the rotation as a Place, set it using the new instances' rotation property, as
-            # conventions could be different.
-            p_new.rotation = p.rotation
+        # For angles: get the rotations as matrices, set them using the new instances' conversion, as
+        # conventions could be different.
+        rotations = particle_data.get_all_transform_matrices()[:, :, :3]
+        new_pd.set_rotations(ids, rotations)
 
         return new_pd
 
     @property
     def size(self):
         """Returns the number of particles in this list."""
-        return len(self._particles)
+        return len(self._store)
 
     @property
     def pixelsize_ori(self):
@@ -556,9 +1328,8 @@ class ParticleData(State):
             raise UserError("Pixelsize needs to be > 0.")
 
         self._pixelsize_ori = value
-
-        for _id, p in self:
-            p.pixelsize_ori = value
+        self._store.pixelsize_ori = value
+        self._orig_store.pixelsize_ori = value
 
     @property
     def pixelsize_tra(self):
@@ -570,19 +1341,8 @@ class ParticleData(State):
             raise UserError("Pixelsize needs to be > 0.")
 
         self._pixelsize_tra = value
-
-        for _id, p in self:
-            p.pixelsize_tra = value
-
-    def _new_id(self):
-        """Create a new uuid and check for collisions."""
-        _id = str(uuid4())
-
-        # Recursion in case of collision
-        if _id in self._particles.keys():
-            _id = self._new_id()
-
-        return _id
+        self._store.pixelsize_tra = value
+        self._orig_store.pixelsize_tra = value
 
     def new_particle(self):
         """Creates a new :class:.Particle instance and adds it to the list.
@@ -592,70 +1352,89 @@ class ParticleData(State):
         particle : Particle
             The new particle instance.
         """
-        _id = self._new_id()
-        particle = Particle(
-            _id,
-            self._data_keys,
-            self._default_params,
-            self._rot,
-            self.pixelsize_ori,
-            self.pixelsize_tra,
-        )
-        self._particles[_id] = particle
+        # Readers may change the format description before the first particle is created
+        if len(self._store) == 0:
+            self._store.set_schema(self._data_keys, self._default_params)
 
-        return particle
+        _id = self._store.append()
 
-    def _store_orig_particles(self):
-        for _id, part in self:
-            from copy import copy
+        return Particle(self._store, _id)
 
-            self._orig_particles[_id] = part.copy()
+    def new_particles(self, count):
+        """Adds count particles with default values at once, e.g. for readers that fill the columns afterwards.
 
-    def reset_particles(self, reset_ids):
-        from copy import copy
+        Parameters
+        ----------
+        count : int
+            Number of particles.
 
-        orig_ids = list(self._orig_particles.keys())
+        Returns
+        -------
+        ids : numpy.ndarray
+            IDs of the new particles.
+        """
+        # Readers may change the format description before the first particle is created
+        if len(self._store) == 0:
+            self._store.set_schema(self._data_keys, self._default_params)
+
+        return self._store.extend(count)
+
+    def _store_orig_particles(self):
+        self._orig_store = self._store.copy()
 
+    def reset_particles(self, reset_ids):
         for rid in reset_ids:
-            if rid in orig_ids:
-                self._particles[rid] = self._orig_particles[rid].copy()
+            if rid in self._orig_store:
+                self._store.copy_row(self._orig_store, rid)
             else:
                 print("Can't reset particle rid because it wasn't read from file.")
 
     def reset_all_particles(self):
-        from copy import copy
-
-        self._particles.clear()
-
-        for _id, p in self._orig_particles.items():
-            self._particles[_id] = p.copy()
+        self._store.assign(self._orig_store)
 
     @property
     def particle_ids(self):
-        from numpy import array, dtype
+        """Array of all particle IDs (int64) in storage order."""
+        return self._store.ids.copy()
+
+    def rows(self, ids):
+        """Returns the storage order indices (positions in ParticleData.particle_ids) of particle IDs.
 
-        return array(list(self._particles.keys()), dtype=dtype("U"))
+        Parameters
+        ----------
+        ids : sequence of int
+            The particle IDs.
+
+        Returns
+        -------
+        rows : numpy.ndarray of int64
+            The indices.
+        """
+        return self._store.rows(ids)
 
     def delete_particle(self, _id):
         """Delete one particle by id.
 
         Parameters
         ----------
-        _id : str
+        _id : int
             The ID of the particle to delete.
         """
-        self._particles.pop(_id)
+        self._store.delete([_id])
 
     def delete_particles(self, ids):
         """Delete particles corresponding to ids.
 
         Parameters
         ----------
-        ids : list of str
+        ids : list of int
             The IDs of the particles to delete.
         """
-        for _id in ids:
-            self._particles.pop(_id)
+        self._store.delete(ids)
+
+    def attributes(self):
+        """List all available data entries and their aliases for particles in this list."""
+        return self._store.keys() + list(self._store._alias.keys())
 
     def get_main_attributes(self):
         """Returns a list of the main attributes of a particle in this list."""
@@ -697,28 +1476,31 @@ class ParticleData(State):
 
         Parameters
         ----------
-        _id : str
+        _id : int
             The particle ID.
         """
-        return self._particles[_id]
+        if _id not in self._store:
+            raise KeyError(_id)
+
+        return Particle(self._store, _id)
 
     def __setitem__(self, _id, particle: Particle):
-        """Set a particle. Makes sure particle knows its correct ID.
+        """Set a particle. Copies the data of particle to the row of ID, which is created if necessary.
 
         Parameters
         ----------
-        _id : str
+        _id : int
             The particle ID.
         particle : Particle
             The particle
         """
-        # Make sure particle has correct id.
-        particle.id = _id
-        self._particles[_id] = particle
+        self._store.copy_row(particle._store, particle.id, _id)
 
     def __iter__(self):
         """Iterator over particle items. Yields tuples of (ID, particle)."""
-        yield from self._particles.items()
+        store = self._store
+        for _id in store.ids.tolist():
+            yield _id, Particle(store, _id)
 
     def __contains__(self, item):
         """
@@ -726,14 +1508,14 @@ class ParticleData(State):
 
         Parameters
         ----------
-        item : str or Particle
+        item : int or Particle
             The ID or Particle object to test.
         """
 
-        if isinstance(item, str):
-            return item in self._particles.keys()
-        elif isinstance(item, Particle):
-            return item in self._particles.values()
+        if isinstance(item, Particle):
+            return item._store is self._store and item.id in self._store
+        else:
+            return item in self._store
 
     def read_file(self):
         pass
@@ -742,8 +1524,10 @@ class ParticleData(State):
         pass
 
     def _register_keys(self):
+        # Keep the columns in sync with the format description
+        self._store.set_schema(self._data_keys, self._default_params)
+
         # Make sure all keys are added as custom attributes for the Atom class
-        # pass
         for key, value in self._data_keys.items():
             if key not in type_attrs(Atom):
                 Atom.register_attr(self.session, key, "artiax", attr_type=float)
@@ -763,28 +1547,216 @@ class ParticleData(State):
         positions : Places
             The positions of all particles.
         """
-        return Places([part.full_transform() for part in self._particles.values()])
+        return Places(place_array=self.get_all_transform_matrices())
+
+    def get_all_transform_matrices(self):
+        """Get all positions for all particles as an array. Vectorized equivalent of Particle.full_transform().
+
+        Returns
+        -------
+        matrices : numpy.ndarray, shape (N, 3, 4)
+            The full transforms of all particles, in the order of ParticleData.particle_ids.
+        """
+        return self.get_transform_matrices()
+
+    def get_transform_matrices(self, ids=None):
+        """Get the positions of some or all particles as an array. Vectorized equivalent of
+        Particle.full_transform().
+
+        Parameters
+        ----------
+        ids : sequence of int
+            The particle IDs. All particles if None.
+
+        Returns
+        -------
+        matrices : numpy.ndarray, shape (N, 3, 4)
+            The full transforms, in the order of ids.
+        """
+        store = self._store
+        rows = slice(None) if ids is None else store.rows(ids)
+
+        def col(key):
+            return np.asarray(store.column(key)[rows], dtype=np.float64)
+
+        matrices = store.rot.as_matrices(col("ang_1"), col("ang_2"), col("ang_3"))
+
+        for idx, (pos, shift) in enumerate(
+            (("pos_x", "shift_x"), ("pos_y", "shift_y"), ("pos_z", "shift_z"))
+        ):
+            matrices[:, idx, 3] = col(pos) * self.pixelsize_ori + col(shift) * self.pixelsize_tra
+
+        return matrices
+
+    def set_origins(self, ids, origins):
+        """Set the origin of many particles at once. Vectorized equivalent of setting Particle.origin.
+
+        Parameters
+        ----------
+        ids : sequence of int
+            The IDs of the particles to move.
+        origins : array-like (N, 3)
+            The origins in physical coordinates, in the order of ids.
+        """
+        store = self._store
+        rows = store.rows(ids)
+        origins = np.asarray(origins, dtype=np.float64)
+
+        for idx, key in enumerate(("pos_x", "pos_y", "pos_z")):
+            store.set_values(rows, key, origins[:, idx] / self.pixelsize_ori)
+
+    def set_translations(self, ids, translations):
+        """Set the translation of many particles at once. Vectorized equivalent of setting Particle.translation.
+
+        Parameters
+        ----------
+        ids : sequence of int
+            The IDs of the particles to move.
+        translations : array-like (N, 3)
+            The translations in physical coordinates, in the order of ids.
+        """
+        store = self._store
+        rows = store.rows(ids)
+        translations = np.asarray(translations, dtype=np.float64)
+
+        for idx, key in enumerate(("shift_x", "shift_y", "shift_z")):
+            store.set_values(rows, key, translations[:, idx] / self.pixelsize_tra)
+
+    def set_rotations(self, ids, rotations):
+        """Set the rotation of many particles at once. Vectorized equivalent of setting Particle.rotation.
+
+        Parameters
+        ----------
+        ids : sequence of int
+            The IDs of the particles to rotate.
+        rotations : numpy.ndarray (N, 3, 3) or (N, 3, 4) or Places
+            The rotations, in the order of ids.
+        """
+        if isinstance(rotations, Places):
+            rotations = rotations.array()
+
+        store = self._store
+        rows = store.rows(ids)
+        angles = store.rot.angles_from_matrices(rotations)
+
+        for key, values in zip(("ang_1", "ang_2", "ang_3"), angles):
+            store.set_values(rows, key, values)
+
+    @property
+    def version(self):
+        """Version counter of the particle data, changes whenever particles or values change."""
+        return self._store.version
+
+    def get_attribute_stats(self, key):
+        """
+        Returns cached statistics of a numeric attribute.
+
+        Parameters
+        ----------
+        key : str
+            Attribute name or alias.
+
+        Returns
+        -------
+        stats : dict or None
+            Dict with keys 'min', 'max', 'mean', 'std' and 'var', None if the attribute is not numeric or there are
+            no particles.
+        """
+        return self._store.stats(key)
+
+    def get_attribute_histogram(self, key, bins=64):
+        """
+        Returns the cached histogram of a numeric attribute.
+
+        Parameters
+        ----------
+        key : str
+            Attribute name or alias.
+        bins : int
+            Number of bins between minimum and maximum of the attribute.
+
+        Returns
+        -------
+        counts : numpy.ndarray or None
+            Number of particles in each bin, None if the attribute is not numeric or there are no particles.
+        edges : numpy.ndarray or None
+            The bins+1 bin edges.
+        """
+        return self._store.histogram(key, bins)
+
+    def count_attribute_range(self, key, minimum, maximum):
+        """Returns the number of particles with minimum <= attribute <= maximum."""
+        return self._store.count_in_range(key, minimum, maximum)
+
+    def get_column(self, key):
+        """Get the values of one attribute for all particles, in the order of ParticleData.particle_ids.
+
+        Parameters
+        ----------
+        key : str
+            Attribute name or alias.
+
+        Returns
+        -------
+        values : numpy.ndarray
+            The values. The array is a view into the particle store and must not be kept across insertions or
+            deletions.
+        """
+        return self._store.column(key)
+
+    def set_column(self, key, values):
+        """Set the values of one attribute for all particles, in the order of ParticleData.particle_ids.
+
+        Parameters
+        ----------
+        key : str
+            Attribute name or alias.
+        values : array-like
+            One value per particle.
+        """
+        self._store.set_column(key, values)
+
+    def set_values(self, ids, key, values):
+        """Set the values of one attribute for some particles.
+
+        Parameters
+        ----------
+        ids : sequence of int
+            The IDs of the particles.
+        key : str
+            Attribute name or alias.
+        values : array-like
+            One value per particle, in the order of ids.
+        """
+        self._store.set_values(self._store.rows(ids), key, values)
+
+    def add_attribute(self, key, values):
+        """Add an attribute that is not part of the file format (e.g. a computed property), or replace its values.
+
+        Parameters
+        ----------
+        key : str
+            Attribute name.
+        values : array-like
+            One value per particle, in the order of ParticleData.particle_ids.
+        """
+        key = self._store.resolve(key)
+
+        if key not in self._data_keys:
+            self._data_keys[key] = []
+
+        self._store.set_column(key, values)
 
     def as_dictionary(self):
         d = {}
 
         for k in list(self._data_keys.keys()):
-            d[k] = []
-            for _id, p in self:
-                d[k].append(p[k])
+            d[k] = self._store.column(k).tolist()
 
         return d
 
     def take_snapshot(self, session, flags):
 
-        parts = []
-        for _id, p in self:
-            parts.append(p)
-
-        orig_parts = []
-        for _id, p in self._orig_particles.items():
-            orig_parts.append(p)
-
         data = {
             "file_name": self.file_name,
             "additional_files": self.additional_files,
@@ -792,8 +1764,8 @@ class ParticleData(State):
             "default_params": self._default_params,
             "pixelsize_ori": self.pixelsize_ori,
             "pixelsize_tra": self.pixelsize_tra,
-            "parts": parts,
-            "orig_parts": orig_parts,
+            "store": self._store.snapshot(),
+            "orig_store": self._orig_store.snapshot(),
         }
 
         return data
@@ -812,13 +1784,20 @@ class ParticleData(State):
         pd._default_params = data["default_params"]
 
         pd._register_keys()
+        pd._orig_store.set_schema(pd._data_keys, pd._default_params)
 
-        for p in data["parts"]:
-            # part = Particle.restore_snapshot(p)
-            pd._particles[p.id] = p
-
-        for op in data["orig_parts"]:
-            # part = Particle.restore_snapshot(op)
-            pd._orig_particles[op.id] = op
+        if "store" in data:
+            pd._store.restore(data["store"])
+            pd._orig_store.restore(data["orig_store"])
+        else:
+            # Sessions from before the columnar store contain individual particles with uuid strings as IDs
+            new_ids = {}
+            for p in data["parts"]:
+                new_ids[p._snapshot_id] = pd.new_particle().id
+                pd[new_ids[p._snapshot_id]] = p
+
+            for op in data["orig_parts"]:
+                if op._snapshot_id in new_ids:
+                    pd._orig_store.copy_row(op._store, op.id, new_ids[op._snapshot_id])
 
         return pd
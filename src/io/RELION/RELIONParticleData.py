@@ -86,6 +86,60 @@ class RELIONEulerRotation(EulerRotation):
 
         return sign_sb
 
+    def rot1_from_matrices(self, matrices):
+        """rlnAngleRot -- Phi, vectorized"""
+        matrices = np.asarray(matrices, dtype=np.float64)
+        valid = self._abs_sb_array(matrices) > EPSILON16
+
+        angle = np.where(valid, np.arctan2(matrices[:, 2, 1], matrices[:, 2, 0]), 0.0)
+
+        return angle * 180.0 / np.pi
+
+    def rot2_from_matrices(self, matrices):
+        """rlnAngleTilt -- Theta, vectorized"""
+        matrices = np.asarray(matrices, dtype=np.float64)
+        abs_sb = self._abs_sb_array(matrices)
+        valid = abs_sb > EPSILON16
+
+        sign_sb = self._sign_rot2_array(matrices)
+        angle = np.arctan2(sign_sb * abs_sb, matrices[:, 2, 2])
+        singular = np.where(np.sign(matrices[:, 2, 2]) > 0, 0.0, np.pi)
+        angle = np.where(valid, angle, singular)
+
+        return angle * 180.0 / np.pi
+
+    def rot3_from_matrices(self, matrices):
+        """Psi, vectorized"""
+        matrices = np.asarray(matrices, dtype=np.float64)
+        valid = self._abs_sb_array(matrices) > EPSILON16
+
+        angle = np.arctan2(matrices[:, 1, 2], -matrices[:, 0, 2])
+        singular = np.where(
+            np.sign(matrices[:, 2, 2]) > 0,
+            np.arctan2(-matrices[:, 1, 0], matrices[:, 0, 0]),
+            np.arctan2(matrices[:, 1, 0], -matrices[:, 0, 0]),
+        )
+        angle = np.where(valid, angle, singular)
+
+        return angle * 180.0 / np.pi
+
+    def _abs_sb_array(self, matrices):
+        return np.sqrt(
+            matrices[:, 0, 2] * matrices[:, 0, 2] + matrices[:, 1, 2] * matrices[:, 1, 2]
+        )
+
+    def _sign_rot2_array(self, matrices):
+        rot3 = np.arctan2(matrices[:, 1, 2], -matrices[:, 0, 2])
+        sin_rot3 = np.sin(rot3)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sign_cos = np.sign(-matrices[:, 0, 2] / np.cos(rot3))
+        sign_sin = np.where(
+            sin_rot3 > 0, np.sign(matrices[:, 1, 2]), -np.sign(matrices[:, 1, 2])
+        )
+
+        return np.where(np.abs(sin_rot3) < EPSILON, sign_cos, sign_sin)
+
 
 class RELIONParticleData(ParticleData):
 
@@ -122,6 +176,7 @@ class RELIONParticleData(ParticleData):
         self.loop_name = 0
         self.name_prefix = None
         self.name_leading_zeros = None
+        self._raised_tomoname_parse_error = False
 
         super().__init__(
             session,
@@ -132,100 +187,100 @@ class RELIONParticleData(ParticleData):
         )
 
     def read_file(self):
-        """Reads RELION 3, 3.1 or 4 star file."""
-        content = starfile.read(self.file_name, always_dict=True)
-
-        # Identify the loop that contains the data
-        data_loop = None
-        for key, val in content.items():
-            if "rlnCoordinateZ" in list(val.keys()):
-                data_loop = key
-                break
-            elif "wrpCoordinateZ1" in list(val.keys()):
-                # Warp/M starfile: rename the relevant wrp* columns to their rln* equivalents.
-                self.session.logger.info("Changing Warp/M starfile columns to RELION format.")
-                wrp_to_rln = [('wrpCoordinateX1', 'rlnCoordinateX'),
-                              ('wrpCoordinateY1', 'rlnCoordinateY'),
-                              ('wrpCoordinateZ1', 'rlnCoordinateZ'),
-                              ('wrpAngleRot1', 'rlnAngleRot'),
-                              ('wrpAngleTilt1', 'rlnAngleTilt'),
-                              ('wrpAnglePsi1', 'rlnAnglePsi'), ]
-                for old, new in wrp_to_rln:
-                    if old in val.columns:
-                        self.session.logger.info("Renaming {} to {}.".format(old, new))
-                        val.rename(columns={old: new}, inplace=True)
-                data_loop = key
-                break
+        """Reads RELION 3, 3.1 or 4 star file. The particle rows are read in chunks, so memory use stays bounded."""
+        from ..star import StarLoopStream
+        from ...util.progress import ReadProgress
+
+        progress = ReadProgress(self.session, self.file_name)
+        stream = StarLoopStream(
+            self.file_name,
+            lambda columns: "rlnCoordinateZ" in columns or "wrpCoordinateZ1" in columns,
+            progress=progress,
+        )
+
+        layout = None
+        strings = {}
+        try:
+            for df in stream:
+                if layout is None:
+                    layout = self._read_header(df)
+
+                self._read_rows(df, layout)
+
+                for key in layout["strings"]:
+                    strings.setdefault(key, []).append(df[key])
+        finally:
+            progress.close()
 
         # Abort if none found
-        if data_loop is None:
+        if stream.name is None:
             raise UserError(
                 f"rlnCoordinateZ was not found in any loop section of file {self.file_name}."
             )
 
-        # Take the good one, store the rest and the loop name so we can write it out again later on
-        df = content[data_loop]
-        content.pop(data_loop)
-        self.loop_name = data_loop
-        self.remaining_loops = content
+        # Store the rest and the loop name so we can write it out again later on
+        self.loop_name = stream.name
+        self.remaining_loops = stream.blocks
+
+        for key, values in strings.items():
+            self.remaining_data[key] = pd.concat(values, ignore_index=True)
+
+    def _read_header(self, df):
+        """
+        Set up the format description from the columns of the data loop.
+
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            First chunk of rows of the data loop.
+
+        Returns
+        -------
+        layout : dict
+            Which columns are present and how they are read, used by _read_rows.
+        """
+        layout = {"rename": {}}
+
+        if "rlnCoordinateZ" not in df.columns:
+            # Warp/M starfile: rename the relevant wrp* columns to their rln* equivalents.
+            self.session.logger.info("Changing Warp/M starfile columns to RELION format.")
+            wrp_to_rln = [('wrpCoordinateX1', 'rlnCoordinateX'),
+                          ('wrpCoordinateY1', 'rlnCoordinateY'),
+                          ('wrpCoordinateZ1', 'rlnCoordinateZ'),
+                          ('wrpAngleRot1', 'rlnAngleRot'),
+                          ('wrpAngleTilt1', 'rlnAngleTilt'),
+                          ('wrpAnglePsi1', 'rlnAnglePsi'), ]
+            for old, new in wrp_to_rln:
+                if old in df.columns:
+                    self.session.logger.info("Renaming {} to {}.".format(old, new))
+                    layout["rename"][old] = new
+            df.rename(columns=layout["rename"], inplace=True)
 
         # What is present
         df_keys = list(df.keys())
-        additional_keys = df_keys
+        additional_keys = list(df_keys)
 
         # Do we have tomo names?
-        names_present = False
+        layout["names_present"] = False
         if "rlnTomoName" in df_keys:
-            names = list(df["rlnTomoName"])
-
-            # Sanity check names
-            first_name = names[0]
-            if "_" not in first_name:
-                raise UserError(
-                    'Encountered particle without "_" in rlnTomoName. Aborting.'
-                )
-
-            full = first_name.split("_")
-            prefix_guess = "".join(full[0:-1])
-            num_guess = full[-1]
-
-            for n in names:
-                if "_" not in n:
-                    raise UserError(
-                        'Encountered particle without "_" in rlnTomoName. Aborting.'
-                    )
-
-                full = n.split("_")
-                prefix_test = "".join(full[0:-1])
-
-                if prefix_test != prefix_guess:
-                    raise UserError(
-                        "Encountered particles with inconsistent "
-                        "rlnTomoName prefixes {} and {}. Aborting.".format(
-                            prefix_test, prefix_guess
-                        )
-                    )
-
-            self.name_prefix = prefix_guess
-            self.name_leading_zeros = len(num_guess)
-            names_present = True
+            layout["names_present"] = True
             additional_keys.remove("rlnTomoName")
         else:
             self._data_keys.pop("rlnTomoName")
 
         # If we have shifts in Angstrom, use those instead of the pixel shifts, remodel the format definition
-        origin_present = False
-        origin_angstrom = False
+        layout["origin_present"] = False
+        layout["origin_angstrom"] = False
         if "rlnOriginZ" in df_keys:
-            origin_present = True
+            layout["origin_present"] = True
 
             additional_keys.remove("rlnOriginX")
             additional_keys.remove("rlnOriginY")
             additional_keys.remove("rlnOriginZ")
 
         elif "rlnOriginZAngst" in df_keys:
-            origin_present = True
-            origin_angstrom = True
+            layout["origin_present"] = True
+            layout["origin_angstrom"] = True
 
             self._data_keys.pop("rlnOriginX")
             self._data_keys.pop("rlnOriginY")
@@ -246,95 +301,125 @@ class RELIONParticleData(ParticleData):
         # TODO: what about rlnTomoSubtomogramRot/Tilt/Psi? Disregard it for now.
 
         # If angles are not there, take note
-        rot_present = False
-        if "rlnAngleRot" in df_keys:
-            rot_present = True
-            additional_keys.remove("rlnAngleRot")
-
-        tilt_present = False
-        if "rlnAngleTilt" in df_keys:
-            tilt_present = True
-            additional_keys.remove("rlnAngleTilt")
-
-        psi_present = False
-        if "rlnAnglePsi" in df_keys:
-            psi_present = True
-            additional_keys.remove("rlnAnglePsi")
+        for key in ("rlnAngleRot", "rlnAngleTilt", "rlnAnglePsi"):
+            layout[key] = key in df_keys
+            if layout[key]:
+                additional_keys.remove(key)
 
         # Additional data (everything that is a number)
-        additional_entries = []
+        layout["additional_entries"] = []
+        layout["strings"] = []
         for key in additional_keys:
             if pd.api.types.is_numeric_dtype(df.dtypes[key]):
-                additional_entries.append(key)
+                layout["additional_entries"].append(key)
                 self._data_keys[key] = []
             else:
-                self.remaining_data[key] = df[key]
+                layout["strings"].append(key)
 
         # Store everything
         self._register_keys()
 
-        # Now make particles
-        df.reset_index()
-
-        _raised_tomoname_parse_error = False
-        for idx, row in df.iterrows():
-            p = self.new_particle()
-
-            # Name
-            if names_present:
-                try:
-                    n = row["rlnTomoName"].split("_")
-                    num = int(n[-1])
-                    p["rlnTomoName"] = num
-                except Exception as e:
-                    if not _raised_tomoname_parse_error:
-                        self.session.logger.warning(
-                            "Could not parse rlnTomoName the original way - applying workaround."
-                        )
-                        _raised_tomoname_parse_error = True
-                    p["rlnTomoName"] = int(''.join(filter(str.isdigit, row["rlnTomoName"])))
-
-            # Position
-            p["pos_x"] = row["rlnCoordinateX"]
-            p["pos_y"] = row["rlnCoordinateY"]
-            p["pos_z"] = row["rlnCoordinateZ"]
-
-            # Shift
-            if origin_present:
-                if origin_angstrom:
-                    # Note negation due to convention
-                    p["shift_x"] = -row["rlnOriginXAngst"]
-                    p["shift_y"] = -row["rlnOriginYAngst"]
-                    p["shift_z"] = -row["rlnOriginZAngst"]
-                else:
-                    # Note negation due to convention
-                    p["shift_x"] = -row["rlnOriginX"]
-                    p["shift_y"] = -row["rlnOriginY"]
-                    p["shift_z"] = -row["rlnOriginZ"]
-            else:
-                p["shift_x"] = 0
-                p["shift_y"] = 0
-                p["shift_z"] = 0
+        return layout
 
-            # Orientation
-            if rot_present:
-                p["ang_1"] = row["rlnAngleRot"]
-            else:
-                p["ang_1"] = 0
+    def _read_rows(self, df, layout):
+        """Add the particles of one chunk of rows of the data loop, column by column."""
+        df.rename(columns=layout["rename"], inplace=True)
+        ids = self.new_particles(len(df))
 
-            if tilt_present:
-                p["ang_2"] = row["rlnAngleTilt"]
-            else:
-                p["ang_2"] = 0
+        def column(key):
+            return df[key].to_numpy(dtype=np.float64)
 
-            if psi_present:
-                p["ang_3"] = row["rlnAnglePsi"]
-            else:
-                p["ang_3"] = 0
+        zeros = np.zeros(len(df), dtype=np.int64)
+
+        # Name
+        if layout["names_present"]:
+            self.set_values(ids, "rlnTomoName", self._parse_tomo_names(df["rlnTomoName"]))
+
+        # Position
+        self.set_values(ids, "pos_x", column("rlnCoordinateX"))
+        self.set_values(ids, "pos_y", column("rlnCoordinateY"))
+        self.set_values(ids, "pos_z", column("rlnCoordinateZ"))
+
+        # Shift, note negation due to convention
+        if layout["origin_present"]:
+            suffix = "Angst" if layout["origin_angstrom"] else ""
+            self.set_values(ids, "shift_x", -column("rlnOriginX" + suffix))
+            self.set_values(ids, "shift_y", -column("rlnOriginY" + suffix))
+            self.set_values(ids, "shift_z", -column("rlnOriginZ" + suffix))
+        else:
+            self.set_values(ids, "shift_x", zeros)
+            self.set_values(ids, "shift_y", zeros)
+            self.set_values(ids, "shift_z", zeros)
+
+        # Orientation
+        self.set_values(ids, "ang_1", column("rlnAngleRot") if layout["rlnAngleRot"] else zeros)
+        self.set_values(ids, "ang_2", column("rlnAngleTilt") if layout["rlnAngleTilt"] else zeros)
+        self.set_values(ids, "ang_3", column("rlnAnglePsi") if layout["rlnAnglePsi"] else zeros)
+
+        # Everything else
+        for attr in layout["additional_entries"]:
+            self.set_values(ids, attr, column(attr))
+
+    def _parse_tomo_names(self, names):
+        """
+        Convert rlnTomoName entries of the form <prefix>_<number> to the tomogram numbers and remember prefix and
+        number of digits for writing. Each distinct name is only parsed once.
+
+        Parameters
+        ----------
+        names : pandas.Series
+            The rlnTomoName column.
+
+        Returns
+        -------
+        numbers : numpy.ndarray
+            Tomogram number of each particle.
+        """
+        codes, uniques = pd.factorize(names)
+        uniques = [str(n) for n in uniques]
+
+        if len(uniques) == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        # Sanity check names
+        for n in uniques:
+            if "_" not in n:
+                raise UserError(
+                    'Encountered particle without "_" in rlnTomoName. Aborting.'
+                )
+
+        # Prefix and number of digits are taken from the first name of the file
+        if self.name_prefix is None:
+            full = uniques[0].split("_")
+            self.name_prefix = "".join(full[0:-1])
+            self.name_leading_zeros = len(full[-1])
+
+        prefix_guess = self.name_prefix
+
+        for n in uniques:
+            prefix_test = "".join(n.split("_")[0:-1])
+
+            if prefix_test != prefix_guess:
+                raise UserError(
+                    "Encountered particles with inconsistent "
+                    "rlnTomoName prefixes {} and {}. Aborting.".format(
+                        prefix_test, prefix_guess
+                    )
+                )
+
+        numbers = np.zeros(len(uniques), dtype=np.int64)
+        for idx, n in enumerate(uniques):
+            try:
+                numbers[idx] = int(n.split("_")[-1])
+            except Exception as e:
+                if not self._raised_tomoname_parse_error:
+                    self.session.logger.warning(
+                        "Could not parse rlnTomoName the original way - applying workaround."
+                    )
+                    self._raised_tomoname_parse_error = True
+                numbers[idx] = int("".join(filter(str.isdigit, n)))
 
-            # Everything else
-            for attr in additional_entries:
-                p[attr] = float(row[attr])
+        return numbers[codes]
 
     def write_file(self, file_name=None, additional_files=None):
         """writing file in regular relion format"""
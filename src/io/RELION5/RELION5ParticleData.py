@@ -144,109 +144,88 @@ class RELION5ParticleData(ParticleData):
 
         ###Now actual reading of file
 
-        content = starfile.read(self.file_name, always_dict=True)
+        # The particle rows are read in chunks, so memory use stays bounded
+        from ..star import StarLoopStream
+        from ...util.progress import ReadProgress
 
-        # Identify the loop that contains the data
-        data_loop = None
-        for key, val in content.items():
-            if "rlnCenteredCoordinateZAngst" in list(val.keys()):
-                data_loop = key
-                break
+        # calculate center of corresponding tomogram
+        center = (x_size / 2, y_size / 2, z_size / 2)
+
+        progress = ReadProgress(self.session, self.file_name)
+        stream = StarLoopStream(
+            self.file_name, lambda columns: "rlnCenteredCoordinateZAngst" in columns, progress=progress
+        )
+
+        layout = None
+        strings = {}
+        try:
+            for df in stream:
+                if layout is None:
+                    layout = self._read_header(df)
+
+                self._read_rows(df, layout, pixsize, center, prefix, suffix)
 
-        if data_loop is None:
+                for key in layout["strings"]:
+                    strings.setdefault(key, []).append(df[key])
+        finally:
+            progress.close()
+
+        if stream.name is None:
             raise UserError(
                 f"rlnCenteredCoordinateZAngst was not found in any loop section of file {self.file_name}."
             )
 
-        # calculate center of corresponding tomogram
-        x_center = x_size / 2
-        y_center = y_size / 2
-        z_center = z_size / 2
+        # Store the rest and the loop name so we can write it out again later on
+        self.loop_name = stream.name
+        self.remaining_loops = stream.blocks
 
+        for key, values in strings.items():
+            self.remaining_data[key] = pd.concat(values, ignore_index=True)
 
-        # Take the good loop, store the rest and the loop name so we can write it out again later on
-        df = content[data_loop]
-        content.pop(data_loop)
-        self.loop_name = data_loop
-        self.remaining_loops = content
+    def _read_header(self, df):
+        """
+        Set up the format description from the columns of the data loop.
+
+        Parameters
+        ----------
+        df : pandas.DataFrame
+            First chunk of rows of the data loop.
+
+        Returns
+        -------
+        layout : dict
+            Which columns are present and how they are read, used by _read_rows.
+        """
+        layout = {}
 
         # What is present
         df_keys = list(df.keys())
-        additional_keys = df_keys
+        additional_keys = list(df_keys)
         self.remember_keys_order = list(df_keys)
         #print("key order", self.remember_keys_order)
 
         # Do we have tomo names?
-        names_present = False
+        layout["names_present"] = False
         if "rlnTomoName" in df_keys:
-            names = list(df["rlnTomoName"])
-
-            # Sanity check names
-            first_name = names[0]
-
-            # Ensure proper handling of prefix and suffix
-            if prefix:  # Only check if prefix is not None or empty
-                if first_name.startswith(prefix):
-                    if suffix:  # Check if suffix is not empty or None
-                        if first_name.endswith(suffix):
-                            num = first_name[len(prefix): -len(suffix)]
-                        else:
-                            raise UserError('Tomogram number cannot be extracted due to unmatched suffix.')
-                    else:
-                        # If suffix is empty or None, just get the part after the prefix
-                        num = first_name[len(prefix):]
-                else:
-                    raise UserError('Tomogram number cannot be extracted due to unmatched prefix.')
-            else:
-                # No prefix specified, only handle suffix if present
-                if suffix:
-                    if first_name.endswith(suffix):
-                        num = first_name[:-len(suffix)]  # Get the part before the suffix
-                    else:
-                        raise UserError('Tomogram number cannot be extracted due to unmatched suffix.')
-                else:
-                    num = first_name  # No prefix or suffix, just use the whole name
-
-            self.name_prefix = prefix
-            if isinstance(num, int):
-                self.name_leading_zeros = None
-            else:
-                self.name_leading_zeros = len(num)
-
-            # Process the rest of the names
-            for n in names:
-                if prefix and not n.startswith(prefix):
-                    raise UserError('Encountered particle without matching prefix in rlnTomoName. Aborting.')
-
-                if suffix:
-                    if n.endswith(suffix):
-                        num = n[len(prefix): -len(suffix)] if prefix else n[:-len(
-                            suffix)]  # Handle with or without prefix
-                    else:
-                        raise UserError('Encountered particle without matching suffix in rlnTomoName. Aborting.')
-                else:
-                    num = n[len(prefix):] if prefix else n  # Handle the case where there's no suffix
-
-
-            names_present = True
+            layout["names_present"] = True
             additional_keys.remove("rlnTomoName")
         else:
             self._data_keys.pop("rlnTomoName")
 
         #check if origin there
-        origin_present = False
-        origin_angstrom=False
+        layout["origin_present"] = False
+        layout["origin_angstrom"] = False
 
         if "rlnOriginZ" in df_keys:
-            origin_present = True
+            layout["origin_present"] = True
 
             additional_keys.remove("rlnOriginX")
             additional_keys.remove("rlnOriginY")
             additional_keys.remove("rlnOriginZ")
 
         elif "rlnOriginZAngst" in df_keys:
-            origin_present = True
-            origin_angstrom = True
+            layout["origin_present"] = True
+            layout["origin_angstrom"] = True
 
             self._data_keys["rlnOriginXAngst"] = []
             self._data_keys["rlnOriginYAngst"] = []
@@ -260,191 +239,230 @@ class RELION5ParticleData(ParticleData):
             additional_keys.remove("rlnOriginYAngst")
             additional_keys.remove("rlnOriginZAngst")
 
-
-
-
-
-        # If angles are not there, take note
-        rot_present = False
-        if "rlnAngleRot" in df_keys:
-            rot_present = True
-            #additional_keys.remove("rlnAngleRot")
-
-        tilt_present = False
-        if "rlnAngleTilt" in df_keys:
-            tilt_present = True
-            #additional_keys.remove("rlnAngleTilt")
-
-        psi_present = False
-        if "rlnAnglePsi" in df_keys:
-            psi_present = True
-            #additional_keys.remove("rlnAnglePsi")
-
-        tomo_rot_present = False
-        if 'rlnTomoSubtomogramRot' in df_keys:
-            tomo_rot_present = True
-            additional_keys.remove('rlnTomoSubtomogramRot')
-
-        tomo_tilt_present = False
-        if 'rlnTomoSubtomogramTilt' in df_keys:
-            tomo_tilt_present = True
-            additional_keys.remove('rlnTomoSubtomogramTilt')
-
-        tomo_psi_present = False
-        if 'rlnTomoSubtomogramPsi' in df_keys:
-            tomo_psi_present = True
-            additional_keys.remove('rlnTomoSubtomogramPsi')
+        # If angles are not there, take note. rlnAngle* are also kept as additional entries.
+        angles_present = all(key in df_keys for key in ("rlnAngleRot", "rlnAngleTilt", "rlnAnglePsi"))
+
+        tomo_keys = ("rlnTomoSubtomogramRot", "rlnTomoSubtomogramTilt", "rlnTomoSubtomogramPsi")
+        for key in tomo_keys:
+            if key in df_keys:
+                additional_keys.remove(key)
+        tomo_angles_present = all(key in df_keys for key in tomo_keys)
+
+        # Orientation
+        self.read_rel5_and_combined = False
+
+        if angles_present and tomo_angles_present:
+            self.read_rel5_and_combined = True
+            layout["angles"] = "combined"
+        # if only rlnAngle present
+        elif angles_present:
+            layout["angles"] = "particle"
+        # if only rlnTomoSubtomogram present
+        elif tomo_angles_present:
+            layout["angles"] = "subtomogram"
+        else:
+            print("Angle Information not complete, default set to 0")
+            layout["angles"] = None
 
         additional_keys.remove("rlnCenteredCoordinateXAngst")
         additional_keys.remove("rlnCenteredCoordinateYAngst")
         additional_keys.remove("rlnCenteredCoordinateZAngst")
 
-        # Additional data (everything that is a number)
-        additional_entries = []
+        # Additional data (numbers and strings)
+        layout["additional_entries"] = []
+        layout["strings"] = []
         for key in additional_keys:
-            if pd.api.types.is_numeric_dtype(df.dtypes[key]):
-                additional_entries.append(key)
-                self._data_keys[key] = []
-            else:
-                self.remaining_data[key] = df[key]
-                additional_entries.append(key)
-                self._data_keys[key] = []
-
+            if not pd.api.types.is_numeric_dtype(df.dtypes[key]):
+                layout["strings"].append(key)
+            layout["additional_entries"].append(key)
+            self._data_keys[key] = []
 
         # Store everything
         self._register_keys()
 
-        # Now make particles
-        df.reset_index()
-
-        for idx, row in df.iterrows():
-
-            p = self.new_particle()
-
-            # Name
-            if names_present:
-                n = row['rlnTomoName']
+        return layout
 
-                if suffix:  # Check if suffix is provided
-                    if n.endswith(suffix):
-                        if prefix:  # Check if prefix is provided
-                            num = n[len(prefix): -len(suffix)]  # Extract the part between prefix and suffix
-                        else:
-                            num = n[:-len(suffix)]  # No prefix, extract everything before the suffix
-                    else:
-                        num = None  # Handle the case where the suffix doesn't match
-                else:
-                    if prefix:  # Check if prefix is provided
-                        num = n[len(prefix):]  # Extract the part after the prefix
-                    else:
-                        num = n  # No prefix or suffix, use the full name
-
-                # Attempt to convert num to float and raise error if it fails
-                try:
-                    num = float(num)
-                    p['rlnTomoName'] = num
-                except ValueError:
-                    raise UserError(f"Tomogram number could not be extracted from {n}, failed to convert to float.")
-
-
-            #Coordinate
-            p["pos_x"] = (row["rlnCenteredCoordinateXAngst"] / pixsize) + x_center
-            p["pos_y"] = (row["rlnCenteredCoordinateYAngst"] / pixsize) + y_center
-            p["pos_z"] = (row["rlnCenteredCoordinateZAngst"] / pixsize) + z_center
-
-            # Shift
-            if origin_present:
-                if origin_angstrom:
-                    #transfer from Angstrom yo pixel
-                    # Note negation due to convention
-                    p["shift_x"] = -row["rlnOriginXAngst"] / pixsize
-                    p["shift_y"] = -row["rlnOriginYAngst"] / pixsize
-                    p["shift_z"] = -row["rlnOriginZAngst"] / pixsize
-                else:
-                    # Note negation due to convention
-                    p["shift_x"] = -row["rlnOriginX"]
-                    p["shift_y"] = -row["rlnOriginY"]
-                    p["shift_z"] = -row["rlnOriginZ"]
-            else:
-                p["shift_x"] = 0
-                p["shift_y"] = 0
-                p["shift_z"] = 0
-
-
-
-            # Orientation
-
-            self.read_rel5_and_combined=False
-
-            if rot_present and tilt_present and psi_present and tomo_rot_present and tomo_psi_present and tomo_tilt_present:
-                self.read_rel5_and_combined=True
-
-                # Box angles in degrees
+    def _read_rows(self, df, layout, pixsize, center, prefix, suffix):
+        """Add the particles of one chunk of rows of the data loop, column by column."""
+        ids = self.new_particles(len(df))
 
-                box_angle_rot = row['rlnTomoSubtomogramRot']
-                box_angle_tilt = row['rlnTomoSubtomogramTilt']
-                box_angle_psi = row['rlnTomoSubtomogramPsi']
+        def column(key):
+            return df[key].to_numpy(dtype=np.float64)
 
-                # Particle angles in degrees
-                self.particle_angle_rot = row['rlnAngleRot']
-                self.particle_angle_tilt = row['rlnAngleTilt']
-                self.particle_angle_psi = row['rlnAnglePsi']
+        zeros = np.zeros(len(df), dtype=np.int64)
+        x_center, y_center, z_center = center
 
-                # Convert box angles to a rotation matrix (ZYZ convention, lowercase extrinsic)
-                box_rotation = R.from_euler('zyz', [box_angle_rot, box_angle_tilt, box_angle_psi],
-                                            degrees=True).as_matrix()
+        # Name
+        if layout["names_present"]:
+            self.set_values(ids, "rlnTomoName", self._parse_tomo_names(df["rlnTomoName"], prefix, suffix))
 
-                # Convert particle angles to a rotation matrix (ZYZ convention, uppercase intrinsic)
-                particle_rotation = R.from_euler('ZYZ',
-                                                 [self.particle_angle_rot, self.particle_angle_tilt,
-                                                  self.particle_angle_psi],
-                                                 degrees=True).as_matrix()
+        #Coordinate
+        self.set_values(ids, "pos_x", column("rlnCenteredCoordinateXAngst") / pixsize + x_center)
+        self.set_values(ids, "pos_y", column("rlnCenteredCoordinateYAngst") / pixsize + y_center)
+        self.set_values(ids, "pos_z", column("rlnCenteredCoordinateZAngst") / pixsize + z_center)
 
-                # Combine rotations by multiplying the matrices (box followed by particle)
-                combined_rotation = box_rotation @ particle_rotation
-
-                combined_rotation = R.from_matrix(
-                    combined_rotation)  # Convert matrix back to a Rotation object
-
-                # Convert the combined rotation matrix back to Euler angles in 'zyz' convention
-                combined_euler_angles = combined_rotation.as_euler('zyz', degrees=True)
+        # Shift
+        if layout["origin_present"]:
+            if layout["origin_angstrom"]:
+                #transfer from Angstrom yo pixel
+                # Note negation due to convention
+                self.set_values(ids, "shift_x", -column("rlnOriginXAngst") / pixsize)
+                self.set_values(ids, "shift_y", -column("rlnOriginYAngst") / pixsize)
+                self.set_values(ids, "shift_z", -column("rlnOriginZAngst") / pixsize)
+            else:
+                # Note negation due to convention
+                self.set_values(ids, "shift_x", -column("rlnOriginX"))
+                self.set_values(ids, "shift_y", -column("rlnOriginY"))
+                self.set_values(ids, "shift_z", -column("rlnOriginZ"))
+        else:
+            self.set_values(ids, "shift_x", zeros)
+            self.set_values(ids, "shift_y", zeros)
+            self.set_values(ids, "shift_z", zeros)
+
+        # Orientation
+        if layout["angles"] == "combined":
+            # Box angles (ZYZ convention, lowercase extrinsic) followed by particle angles (ZYZ convention,
+            # uppercase intrinsic), all particles of the chunk at once
+            box_angles = np.column_stack(
+                [column("rlnTomoSubtomogramRot"), column("rlnTomoSubtomogramTilt"), column("rlnTomoSubtomogramPsi")]
+            )
+            particle_angles = np.column_stack(
+                [column("rlnAngleRot"), column("rlnAngleTilt"), column("rlnAnglePsi")]
+            )
+            angles = self._combine_angles(box_angles, particle_angles)
 
-                # Store the combined Euler angles in the p dictionary
-                p['ang_1'] = combined_euler_angles[0]  # Combined rot
-                self.combined_angles_rot = combined_euler_angles[0]
-                p['ang_2'] = combined_euler_angles[1]  # Combined tilt
-                self.combined_angles_tilt = combined_euler_angles[1]
-                p['ang_3'] = combined_euler_angles[2]  # Combined psi
-                self.combined_angles_psi = combined_euler_angles[2]
+            self.set_values(ids, "ang_1", angles[:, 0])  # Combined rot
+            self.set_values(ids, "ang_2", angles[:, 1])  # Combined tilt
+            self.set_values(ids, "ang_3", angles[:, 2])  # Combined psi
 
-            # if only rlnAngle present
-            elif rot_present and tilt_present and psi_present:
-                p['ang_1'] = row['rlnAngleRot']
-                p['ang_2'] = row['rlnAngleTilt']
-                p['ang_3'] = row['rlnAnglePsi']
+        elif layout["angles"] == "particle":
+            self.set_values(ids, "ang_1", column("rlnAngleRot"))
+            self.set_values(ids, "ang_2", column("rlnAngleTilt"))
+            self.set_values(ids, "ang_3", column("rlnAnglePsi"))
 
-            # if only rlnTomoSubtomogram present
-            elif tomo_rot_present and tilt_present and psi_present:
-                p['ang_1'] = row['rlnTomoSubtomogramRot']
-                p['ang_2'] = row['rlnTomoSubtomogramTilt']
-                p['ang_3'] = row['rlnTomoSubtomogramPsi']
+        elif layout["angles"] == "subtomogram":
+            self.set_values(ids, "ang_1", column("rlnTomoSubtomogramRot"))
+            self.set_values(ids, "ang_2", column("rlnTomoSubtomogramTilt"))
+            self.set_values(ids, "ang_3", column("rlnTomoSubtomogramPsi"))
 
+        else:
+            self.set_values(ids, "ang_1", zeros)
+            self.set_values(ids, "ang_2", zeros)
+            self.set_values(ids, "ang_3", zeros)
+
+        # Storing Everything else
+        for attr in layout["additional_entries"]:
+            if attr in layout["strings"]:
+                #all strings
+                self.set_values(ids, attr, df[attr].astype(str).to_numpy(dtype=object))
             else:
-                print("Angle Information not complete, default set to 0")
-                p['ang_1'] = 0
-                p['ang_2'] = 0
-                p['ang_3'] = 0
-
-            # Storing Everything else
-            for attr in additional_entries:
-                if attr in self.remaining_data:
-                    #all strings
-                    p[attr] = str(row[attr])
+                #all numbers
+                self.set_values(ids, attr, column(attr))
+
+    @staticmethod
+    def _combine_angles(box_angles, particle_angles):
+        """
+        Combine subtomogram (box) and particle Euler angles of all particles, box rotation followed by particle
+        rotation.
+
+        Parameters
+        ----------
+        box_angles : numpy.ndarray
+            (N, 3) array of rlnTomoSubtomogramRot/Tilt/Psi in degrees.
+        particle_angles : numpy.ndarray
+            (N, 3) array of rlnAngleRot/Tilt/Psi in degrees.
+
+        Returns
+        -------
+        angles : numpy.ndarray
+            (N, 3) array of combined rot, tilt and psi in degrees.
+        """
+        if len(box_angles) == 0:
+            return np.zeros((0, 3))
+
+        box_rotation = R.from_euler("zyz", box_angles, degrees=True).as_matrix()
+        particle_rotation = R.from_euler("ZYZ", particle_angles, degrees=True).as_matrix()
+
+        return R.from_matrix(box_rotation @ particle_rotation).as_euler("zyz", degrees=True)
+
+    def _parse_tomo_names(self, names, prefix, suffix):
+        """
+        Extract the tomogram numbers from rlnTomoName entries of the form <prefix><number><suffix> and remember the
+        number of digits for writing. Each distinct name is only parsed once.
+
+        Parameters
+        ----------
+        names : pandas.Series
+            The rlnTomoName column.
+        prefix, suffix : str
+            Prefix and suffix of the tomogram names, may be None or empty.
+
+        Returns
+        -------
+        numbers : numpy.ndarray
+            Tomogram number of each particle.
+        """
+        codes, uniques = pd.factorize(names)
+
+        if len(uniques) == 0:
+            return np.zeros(0, dtype=np.float64)
+
+        # Names that are plain numbers are read as numbers, parse them like all other names
+        numeric = pd.api.types.is_numeric_dtype(names.dtype)
+        uniques = [str(n) for n in uniques]
+
+        # Sanity check names
+        first_name = uniques[0]
+
+        # Ensure proper handling of prefix and suffix
+        if prefix:  # Only check if prefix is not None or empty
+            if first_name.startswith(prefix):
+                if suffix:  # Check if suffix is not empty or None
+                    if first_name.endswith(suffix):
+                        num = first_name[len(prefix): -len(suffix)]
+                    else:
+                        raise UserError('Tomogram number cannot be extracted due to unmatched suffix.')
                 else:
-                    #all numbers
-                    p[attr] = float(row[attr])
+                    # If suffix is empty or None, just get the part after the prefix
+                    num = first_name[len(prefix):]
+            else:
+                raise UserError('Tomogram number cannot be extracted due to unmatched prefix.')
+        else:
+            # No prefix specified, only handle suffix if present
+            if suffix:
+                if first_name.endswith(suffix):
+                    num = first_name[:-len(suffix)]  # Get the part before the suffix
+                else:
+                    raise UserError('Tomogram number cannot be extracted due to unmatched suffix.')
+            else:
+                num = first_name  # No prefix or suffix, just use the whole name
+
+        # Number of digits is taken from the first name of the file, plain numbers have none
+        self.name_prefix = prefix
+        if self.name_leading_zeros is None and not numeric:
+            self.name_leading_zeros = len(num)
+
+        # Process the rest of the names
+        numbers = np.zeros(len(uniques), dtype=np.float64)
+        for idx, n in enumerate(uniques):
+            if prefix and not n.startswith(prefix):
+                raise UserError('Encountered particle without matching prefix in rlnTomoName. Aborting.')
+
+            if suffix:
+                if n.endswith(suffix):
+                    num = n[len(prefix): -len(suffix)] if prefix else n[:-len(suffix)]  # Handle with or without prefix
+                else:
+                    raise UserError('Encountered particle without matching suffix in rlnTomoName. Aborting.')
+            else:
+                num = n[len(prefix):] if prefix else n  # Handle the case where there's no suffix
+
+            # Attempt to convert num to float and raise error if it fails
+            try:
+                numbers[idx] = float(num)
+            except ValueError:
+                raise UserError(f"Tomogram number could not be extracted from {n}, failed to convert to float.")
 
-        #print(f"last key check:{self.remember_keys_order}")
+        return numbers[codes]
 
     def write_file(
         self,
@@ -499,175 +517,107 @@ class RELION5ParticleData(ParticleData):
         if prefix == "None":
             prefix = None  # Convert the string "None" back to actual None
 
-        if tomogram_name is not None:  # name/number is being overwritten by what was inputted
-            for idx, n in enumerate(data['rlnTomoName']):
-                num = int(float(n))
+        # Format each distinct tomogram number once
+        numbers, inverse = np.unique(np.asarray(data['rlnTomoName'], dtype=np.float64), return_inverse=True)
+        names = None
 
-                # Ensure self.name_leading_zeros has a default value if it's None
-                leading_zeros = self.name_leading_zeros if self.name_leading_zeros is not None else 0
+        # Ensure self.name_leading_zeros has a default value if it's None
+        leading_zeros = self.name_leading_zeros if self.name_leading_zeros is not None else 0
+
+        if prefix is not None or suffix is not None:
+            names = []
+            for n in numbers:
+                num = int(n)
                 # Zero-pad the number based on the leading zeros
                 formatted_num = f"{num:0{leading_zeros}d}"
-                if suffix is not None and prefix is not None:
-                    if int(formatted_num) == 0:
-                        data['rlnTomoName'][idx] = f"{prefix}{tomogram_name}{suffix}"
-                    else:
-                        data['rlnTomoName'][idx] = f"{prefix}{formatted_num}{suffix}"
-                elif prefix is not None:
-                    if int(formatted_num) == 0:
-                        #print("i am here")
-                        data['rlnTomoName'][idx] = f"{prefix}{tomogram_name}"
-                    else:
-                        data['rlnTomoName'][idx] = f"{prefix}{formatted_num}"
-                elif suffix is not None:
-                    if int(formatted_num) == 0:
-                        data['rlnTomoName'][idx] = f"{tomogram_name}{suffix}"
-                    else:
-                        data['rlnTomoName'][idx] = f"{formatted_num}{suffix}"
 
-        elif tomogram_name is None:  # no overwriting desired
-            # get tomo numbers from internal particle list data
-            for idx, n in enumerate(data['rlnTomoName']):
-                num = int(float(n))
+                # name/number is being overwritten by what was inputted
+                if tomogram_name is not None and int(formatted_num) == 0:
+                    formatted_num = tomogram_name
 
-                # Ensure self.name_leading_zeros has a default value if it's None
-                leading_zeros = self.name_leading_zeros if self.name_leading_zeros is not None else 0
-                # Zero-pad the number based on the leading zeros
-                formatted_num = f"{num:0{leading_zeros}d}"
                 # Combine the prefix, zero-padded number, and suffix
-                if suffix is not None and prefix is not None:
-                    data['rlnTomoName'][idx] = f"{prefix}{formatted_num}{suffix}"
-                elif prefix is not None:
-                    data['rlnTomoName'][idx] = f"{prefix}{formatted_num}"
-                elif suffix is not None:
-                    data['rlnTomoName'][idx] = f"{formatted_num}{suffix}"
+                names.append(f"{prefix or ''}{formatted_num}{suffix or ''}")
+
+        if names is not None:
+            data['rlnTomoName'] = np.asarray(names, dtype=object)[inverse.ravel()]
 
+        def column(key):
+            return np.asarray(data[key])
 
-        for idx in range(len(data['rlnTomoSubtomogramRot'])):
+        count = len(data['rlnTomoSubtomogramRot'])
 
+        if prior == False:
+            # move Angle values to rlnAngle columns
+            data['rlnAngleRot'] = column('rlnTomoSubtomogramRot')
+            data['rlnAngleTilt'] = column('rlnTomoSubtomogramTilt')
+            data['rlnAnglePsi'] = column('rlnTomoSubtomogramPsi')
+
+        elif prior == True:
             # Angles, set default
-            remove_angles = [0, 90, 0]
-            prior_tilt=90
-            prior_psi=0
+            remove_angles = [np.full(count, 0), np.full(count, 90), np.full(count, 0)]
+            prior_tilt = 90
+            prior_psi = 0
 
-            #if particle list was read in as relion5 and angles were combined, remember original rlnAngle values
+            # if particle list was already read in as relion5 and angles were combined, remove the original rlnAngle
+            # values instead
             if hasattr(self, 'read_rel5_and_combined') and self.read_rel5_and_combined:
-                try:
-                    saved_rlnAngles_Rot=data['rlnAngleRot'][idx]
-                    saved_rlnAngles_Tilt=data['rlnAngleTilt'][idx]
-                    saved_rlnAngles_Psi=data['rlnAnglePsi'][idx]
-                except KeyError:
-                    #adding default if particle list was read in as rel5 but new particles were added to the list
-                    saved_rlnAngles_Rot=0
-                    saved_rlnAngles_Tilt=90
-                    saved_rlnAngles_Psi=0
-
-                try:
-                    saved_rlnAnglesPriorTilt=data['rlnAnglesTiltPrior'][idx]
-                    saved_rlnAnglesPriorPsi=data['rlnAnglesPsiPrior'][idx]
-
-                except KeyError:
-                    # adding default if particle list was read in as rel5 but new particles were added to the list
-                    saved_rlnAnglesPriorTilt=90
-                    saved_rlnAnglesPriorPsi=0
-
-            if prior == False:
-                # move Angle values to rlnAngle columns
-                data['rlnAngleRot'][idx] = data['rlnTomoSubtomogramRot'][idx]
-                data['rlnAngleTilt'][idx] = data['rlnTomoSubtomogramTilt'][idx]
-                data['rlnAnglePsi'][idx] = data['rlnTomoSubtomogramPsi'][idx]
-
-                # delete rlnTomoSubtomo columns and Prior columns
-                #del data['rlnTomoSubtomogramRot']
-                #del data['rlnTomoSubtomogramTilt']
-                #del data['rlnTomoSubtomogramPsi']
-                #del data['rlnAngleTiltPrior']
-                #del data['rlnAnglePsiPrior']
-
-            elif prior ==  True:
-                # Extract the original rlnTomoSubtomogram angles
-                tomo_rot = data['rlnTomoSubtomogramRot'][idx]
-                tomo_tilt = data['rlnTomoSubtomogramTilt'][idx]
-                tomo_psi = data['rlnTomoSubtomogramPsi'][idx]
-                #print(f"rot:{tomo_rot}, tilt:{tomo_tilt}, psi:{tomo_psi}")
-
-
-                # if particle list was already read in as relion5, replace remove_angles with actual rlnAngle values
-                if hasattr(self, 'read_rel5_and_combined') and self.read_rel5_and_combined:
-                    remove_angles[0]= saved_rlnAngles_Rot
-                    remove_angles[1]= saved_rlnAngles_Tilt
-                    remove_angles[2]= saved_rlnAngles_Psi
-                    #print(f"remove angles{remove_angles}")
-                    prior_tilt = saved_rlnAnglesPriorTilt
-                    #print(f"prior tilt : {prior_tilt}")
-                    prior_psi = saved_rlnAnglesPriorPsi
-
-                # Convert rlnTomoSubtomogram angles to rotation matrix
-                rotation_matrix = R.from_euler('zyz', [tomo_rot, tomo_tilt, tomo_psi], degrees=True).as_matrix()
-
-                # Create a new rotation matrix for the angles to remove
-                remove_rotation_matrix = R.from_euler('ZYZ', remove_angles, degrees=True).as_matrix()
+                remove_angles = [column('rlnAngleRot'), column('rlnAngleTilt'), column('rlnAnglePsi')]
+
+                if 'rlnAnglesTiltPrior' in data and 'rlnAnglesPsiPrior' in data:
+                    prior_tilt = column('rlnAnglesTiltPrior')
+                    prior_psi = column('rlnAnglesPsiPrior')
+
+            if count > 0:
+                # Convert rlnTomoSubtomogram angles to rotation matrices
+                tomo_angles = np.column_stack(
+                    [column('rlnTomoSubtomogramRot'), column('rlnTomoSubtomogramTilt'), column('rlnTomoSubtomogramPsi')]
+                )
+                rotation_matrix = R.from_euler('zyz', tomo_angles, degrees=True).as_matrix()
+
+                # Rotation matrices for the angles to remove
+                remove_rotation_matrix = R.from_euler('ZYZ', np.column_stack(remove_angles), degrees=True).as_matrix()
 
                 # Combine the two rotations: original rotation minus the removal rotation
                 # Inverting the remove_rotation to effectively "remove" it
-                resulting_rotation_matrix = rotation_matrix @ remove_rotation_matrix.T
+                resulting_rotation_matrix = rotation_matrix @ np.transpose(remove_rotation_matrix, (0, 2, 1))
 
-                # Convert the resulting rotation matrix back to Euler angles
+                # Convert the resulting rotation matrices back to Euler angles
                 combined_euler_angles = R.from_matrix(resulting_rotation_matrix).as_euler('zyz', degrees=True)
 
                 # Update data with new angle sets
-                data['rlnTomoSubtomogramRot'][idx] = combined_euler_angles[0]
-                data['rlnTomoSubtomogramTilt'][idx] = combined_euler_angles[1]
-                data['rlnTomoSubtomogramPsi'][idx] = combined_euler_angles[2]
+                data['rlnTomoSubtomogramRot'] = combined_euler_angles[:, 0]
+                data['rlnTomoSubtomogramTilt'] = combined_euler_angles[:, 1]
+                data['rlnTomoSubtomogramPsi'] = combined_euler_angles[:, 2]
 
-                data['rlnAngleRot'][idx] = remove_angles[0]
-                data['rlnAngleTilt'][idx] = remove_angles[1]
-                data['rlnAnglePsi'][idx] = remove_angles[2]
+                data['rlnAngleRot'] = remove_angles[0]
+                data['rlnAngleTilt'] = remove_angles[1]
+                data['rlnAnglePsi'] = remove_angles[2]
 
                 # Also create rlnAnglePrior with (0, 90, 0)
                 data['rlnAngleTiltPrior'] = prior_tilt
                 data['rlnAnglePsiPrior'] = prior_psi
 
-
         #Coordinates
-            # Convert shifts back to their convention (*-1)
+        # Convert shifts back to their convention (*-1)
         if "rlnOriginXAngst" in self._data_keys.keys():
-            for idx, v in enumerate(data["rlnOriginXAngst"]):
-                #change internal shift in pixel back to Angstrom
-                data["rlnOriginXAngst"][idx] = data["rlnOriginXAngst"][idx] * -1 *pixsize
-                data["rlnOriginYAngst"][idx] = data["rlnOriginYAngst"][idx] * -1 *pixsize
-                data["rlnOriginZAngst"][idx] = data["rlnOriginZAngst"][idx] * -1 *pixsize
+            #change internal shift in pixel back to Angstrom
+            data["rlnOriginXAngst"] = column("rlnOriginXAngst") * -1 * pixsize
+            data["rlnOriginYAngst"] = column("rlnOriginYAngst") * -1 * pixsize
+            data["rlnOriginZAngst"] = column("rlnOriginZAngst") * -1 * pixsize
         else:
             #combine pos with shift since rlnOrigin no longer in relion5
-            for idx, v in enumerate(data["rlnOriginX"]):
-                data["rlnOriginX"][idx] *= -1
-                data["rlnOriginY"][idx] *= -1
-                data["rlnOriginZ"][idx] *= -1
-                data["rlnCenteredCoordinateXAngst"][idx] = (data["rlnOriginX"][idx] + data["rlnCenteredCoordinateXAngst"][idx])
-                data["rlnCenteredCoordinateYAngst"][idx] = (data["rlnOriginY"][idx] + data["rlnCenteredCoordinateYAngst"][idx])
-                data["rlnCenteredCoordinateZAngst"][idx] = (data["rlnOriginZ"][idx] + data["rlnCenteredCoordinateZAngst"][idx])
+            data["rlnCenteredCoordinateXAngst"] = column("rlnCenteredCoordinateXAngst") - column("rlnOriginX")
+            data["rlnCenteredCoordinateYAngst"] = column("rlnCenteredCoordinateYAngst") - column("rlnOriginY")
+            data["rlnCenteredCoordinateZAngst"] = column("rlnCenteredCoordinateZAngst") - column("rlnOriginZ")
             #removing rlnOrigin column
             del data['rlnOriginX']
             del data['rlnOriginY']
             del data['rlnOriginZ']
 
-
-        for idx, v in enumerate(data["rlnCenteredCoordinateXAngst"]):
-                # changes unit from pixel to Angstrom and makes coordinate centered
-                # center coordinate
-                data["rlnCenteredCoordinateXAngst"][idx] = (
-                    data["rlnCenteredCoordinateXAngst"][idx]
-                ) - x_center
-                data["rlnCenteredCoordinateYAngst"][idx] = (
-                    data["rlnCenteredCoordinateYAngst"][idx]
-                ) - y_center
-                data["rlnCenteredCoordinateZAngst"][idx] = (
-                    data["rlnCenteredCoordinateZAngst"][idx]
-                ) - z_center
-
-                # convert coordinate unit from pixel to angstrom
-                data["rlnCenteredCoordinateXAngst"][idx] *= pixsize
-                data["rlnCenteredCoordinateYAngst"][idx] *= pixsize
-                data["rlnCenteredCoordinateZAngst"][idx] *= pixsize
+        # changes unit from pixel to Angstrom and makes coordinate centered
+        data["rlnCenteredCoordinateXAngst"] = (column("rlnCenteredCoordinateXAngst") - x_center) * pixsize
+        data["rlnCenteredCoordinateYAngst"] = (column("rlnCenteredCoordinateYAngst") - y_center) * pixsize
+        data["rlnCenteredCoordinateZAngst"] = (column("rlnCenteredCoordinateZAngst") - z_center) * pixsize
 
         #if splitting was not desired, delete unecessary columns
         if prior == False:
@@ -54,17 +54,21 @@ def open_particle_list(
         modelname = os.path.basename(file_name)
         #print(f"{format_name} ")
         if format_name == "RELION STAR file":
-            import starfile
-            content = starfile.read(file_name, always_dict=True)
-            search_string = "rlnCenteredCoordinateZAngst"
-            # Check if the string is in the file contents
-            for key, val in content.items():
-                if "rlnCenteredCoordinateZAngst" in list(val.keys()):
-                    print(f"Processed as relion5")
+            from .star import star_blocks
+
+            # Only the column declarations are needed to tell RELION 5 from older files. Both readers use the
+            # first block with coordinates, so stop there.
+            for block, columns in star_blocks(file_name):
+                if "rlnCenteredCoordinateZAngst" in columns:
                     format_name = "RELION5 STAR file"
                     break
-                else:
-                    print(f"Processed as relion")
+                if "rlnCoordinateZ" in columns or "wrpCoordinateZ1" in columns:
+                    break
+
+            if format_name == "RELION5 STAR file":
+                print(f"Processed as relion5")
+            else:
+                print(f"Processed as relion")
 
             #print(f"Changed to {format_name} ")
 
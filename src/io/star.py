@@ -0,0 +1,296 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# General
+import os
+import shlex
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+# ChimeraX
+from chimerax.core.errors import UserError
+
+
+def star_blocks(file_name):
+    """
+    Scan the data blocks of a STAR file and the column (or key) names declared in them, without parsing any values.
+    A block is yielded as soon as the rows of its loop start, so callers that stop iterating once they found what they
+    need never read the rows. Blocks with several loops only report the columns of the first loop.
+
+    Parameters
+    ----------
+    file_name : str
+        Path of the STAR file.
+
+    Yields
+    ------
+    block : str
+        Name of the data block (without the "data_" prefix).
+    columns : list of str
+        Names of the loop columns or key-value pairs of the block (without the leading "_").
+    """
+    block = None
+    columns = []
+    in_loop = False
+    in_rows = False
+
+    with open(file_name, "r") as f:
+        for line in f:
+            # Skip the rows of a loop without looking at them
+            if in_rows and not line.startswith("data_"):
+                continue
+
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+
+            if line.startswith("data_"):
+                if block is not None and not in_rows:
+                    yield block, columns
+                block = line[5:]
+                columns = []
+                in_loop = False
+                in_rows = False
+            elif line.startswith("loop_"):
+                in_loop = True
+            elif line.startswith("_"):
+                columns.append(line[1:].split()[0])
+            elif in_loop:
+                # Columns are complete
+                in_rows = True
+                yield block, columns
+
+    if block is not None and not in_rows:
+        yield block, columns
+
+
+def _numericise(value):
+    """Convert a value of a STAR key-value block to int or float if possible."""
+    for convert in (int, float):
+        try:
+            return convert(value)
+        except ValueError:
+            pass
+
+    return value
+
+
+def _to_numeric(column):
+    try:
+        return pd.to_numeric(column)
+    except (ValueError, TypeError):
+        return column
+
+
+def parse_loop_rows(lines, columns, strings=()):
+    """
+    Parse rows of a STAR loop the way starfile does: whitespace separated, single quotes as string delimiters, and
+    columns that are all numbers converted to int or float.
+
+    Parameters
+    ----------
+    lines : list of bytes
+        The row lines.
+    columns : list of str
+        The column names.
+    strings : collection of str
+        Names of columns that are kept as strings even if all their values are numbers.
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        One row per line.
+    """
+    text = b"".join(lines).strip()
+
+    if not text:
+        return pd.DataFrame({c: pd.Series(dtype="float64") for c in columns})
+
+    df = pd.read_csv(
+        BytesIO(text.replace(b"'", b'"') + b"\n"),
+        delimiter=r"\s+",
+        header=None,
+        comment="#",
+        keep_default_na=False,
+        na_values=["nan", "NaN", "<NA>"],
+        dtype={columns.index(c): str for c in strings},
+        engine="c",
+    )
+    df.columns = columns
+
+    # Numericise columns, keep the original ones that are not numbers at all
+    numeric = df.apply(lambda column: column if column.name in strings else _to_numeric(column))
+    nan_columns = numeric.columns[numeric.isna().all()]
+    numeric[nan_columns] = df[nan_columns]
+
+    return numeric
+
+
+class StarLoopStream:
+    """
+    Reads a STAR file while streaming the rows of one loop (the data loop) in chunks, so that files with millions of
+    particles never need to be held in memory as text or as one DataFrame. The data loop is the first loop with a
+    column accepted by the select function. All other blocks are read completely and collected in
+    StarLoopStream.blocks, in the same form as starfile.read(always_dict=True) returns them.
+
+    Iterating the stream yields the rows of the data loop as DataFrames of at most chunk_size rows (at least one,
+    possibly empty, if the data loop exists). The file is read once, in order. The name and columns of the data loop
+    and the complete StarLoopStream.blocks are known once the iteration finished.
+
+    The column types are taken from the first chunk and later chunks are converted to them: string columns stay
+    strings, and a non-numeric value in a numeric column raises a UserError naming the column and row. The only
+    exception are int columns with fractional values in a later chunk, which are returned as float from that chunk
+    on, as reading the whole file would have made them float.
+    """
+
+    CHUNK_SIZE = 100000
+    """Default number of rows per chunk."""
+
+    def __init__(self, file_name, select, chunk_size=None, progress=None):
+        """
+        Parameters
+        ----------
+        file_name : str
+            Path of the STAR file.
+        select : callable
+            Function list of column names -> bool, True for the data loop.
+        chunk_size : int
+            Maximum number of rows per chunk.
+        progress : callable
+            Called as progress(bytes_read, file_size) after every chunk and block. May raise an exception to stop
+            reading, e.g. ReadProgress raises a UserError when cancelled.
+        """
+        self.file_name = file_name
+        self._select = select
+        self.chunk_size = self.CHUNK_SIZE if chunk_size is None else chunk_size
+        self._progress = progress
+
+        self.size = os.path.getsize(file_name)
+        """File size in bytes."""
+        self.position = 0
+        """Number of bytes read so far."""
+
+        self.blocks = {}
+        """Dict mapping block names to DataFrames (loops) or dicts (key-value blocks), without the data loop."""
+        self.name = None
+        """Name of the data loop block, None if not found."""
+        self.columns = None
+        """Column names of the data loop. May be changed (e.g. renamed) before the rows are read."""
+        self.dtypes = None
+        """Dict mapping the columns of the data loop to their types, set from the first chunk."""
+        self.rows = 0
+        """Number of rows of the data loop read so far."""
+
+    def __iter__(self):
+        with open(self.file_name, "rb") as f:
+            yield from self._read(f)
+
+    def _lines(self, f):
+        for line in f:
+            self.position += len(line)
+            yield line
+
+    def _report(self):
+        if self._progress is not None:
+            self._progress(self.position, self.size)
+
+    def _read(self, f):
+        lines = self._lines(f)
+        line = next(lines, None)
+
+        while line is not None:
+            stripped = line.strip()
+
+            if not stripped.startswith(b"data_"):
+                line = next(lines, None)
+                continue
+
+            name = stripped[5:].decode()
+            line = next(lines, None)
+
+            # Block header
+            columns = []
+            is_loop = False
+            values = {}
+            while line is not None:
+                stripped = line.strip()
+                if stripped.startswith(b"loop_"):
+                    is_loop = True
+                elif stripped.startswith(b"_"):
+                    if is_loop:
+                        columns.append(stripped.split()[0][1:].decode())
+                    else:
+                        key, value = shlex.split(stripped.decode())
+                        values[key[1:]] = _numericise(value)
+                elif stripped and not stripped.startswith(b"#"):
+                    # First row or next block
+                    break
+                line = next(lines, None)
+
+            if not is_loop:
+                self.blocks[name] = values
+                self._report()
+                continue
+
+            # Loop rows, until the next block
+            stream = self.name is None and self._select(columns)
+            if stream:
+                self.name = name
+                self.columns = columns
+
+            rows = []
+            yielded = False
+            while line is not None and not line.startswith(b"data_"):
+                # Blank lines and comments don't count as rows
+                stripped = line.strip()
+                if stripped and not stripped.startswith(b"#"):
+                    rows.append(line)
+                line = next(lines, None)
+
+                if stream and len(rows) >= self.chunk_size:
+                    yield self._chunk(rows)
+                    yielded = True
+                    rows = []
+                    self._report()
+
+            if stream:
+                if rows or not yielded:
+                    yield self._chunk(rows)
+            else:
+                self.blocks[name] = parse_loop_rows(rows, columns)
+            self._report()
+
+    def _chunk(self, lines):
+        """Parse rows of the data loop, with the column types of the first chunk."""
+        if self.dtypes is None:
+            df = parse_loop_rows(lines, self.columns)
+            self.dtypes = df.dtypes.to_dict()
+        else:
+            strings = [key for key, dtype in self.dtypes.items() if not pd.api.types.is_numeric_dtype(dtype)]
+            df = parse_loop_rows(lines, self.columns, strings)
+            for key, dtype in self.dtypes.items():
+                if key not in strings:
+                    df[key] = self._numeric_column(df[key], dtype)
+
+        self.rows += len(df)
+        return df
+
+    def _numeric_column(self, column, dtype):
+        if column.dtype == dtype:
+            return column
+
+        values = pd.to_numeric(column, errors="coerce")
+        invalid = (values.isna() & column.notna()).to_numpy()
+        if invalid.any():
+            row = int(np.argmax(invalid))
+            raise UserError(
+                f"Column {column.name} of {self.file_name} is numeric, but row {self.rows + row + 1} of the data loop "
+                f"contains {column.iloc[row]!r}."
+            )
+
+        values = values.astype(np.float64)
+        if pd.api.types.is_integer_dtype(dtype) and np.all(np.mod(values, 1) == 0):
+            return values.astype(dtype)
+
+        return values
@@ -26,6 +26,14 @@ class MarkerSetPlus(MarkerSet):
     SESSION_SAVE = False
     DEBUG = False
 
+    _REASON_TRIGGERS = (
+        ("coord changed", MARKER_MOVED),
+        ("color changed", MARKER_COLOR_CHANGED),
+        ("selected changed", MARKER_SELECTED),
+        ("display changed", MARKER_DISPLAY_CHANGED),
+    )
+    """Atom change reasons and the trigger fired for them, in order."""
+
     def __init__(self, session, name):
         super().__init__(session, name=name)
 
@@ -121,6 +129,48 @@ class MarkerSetPlus(MarkerSet):
 
         return a
 
+    def create_markers(self, xyz, rgba, radius, ids=None):
+        """
+        Create many markers at once. Coordinates, colors and radii are assigned to the new atoms as arrays, no
+        MARKER_CREATED trigger is fired.
+
+        Parameters
+        ----------
+        xyz : numpy.ndarray
+            (N, 3) array of marker coordinates.
+        rgba : array-like
+            Color of all markers.
+        radius : float
+            Radius of all markers.
+        ids : iterable of int
+            Marker ids, default None (next free ids).
+
+        Returns
+        -------
+        markers : chimerax.atomic.Atoms
+            The new markers, in the order of xyz.
+        """
+        from chimerax.atomic import Atoms
+
+        xyz = np.asarray(xyz, dtype=np.float64)
+        count = xyz.shape[0]
+
+        if ids is None:
+            ids = [None] * count
+
+        origin = (0, 0, 0)
+        new = [MarkerSet.create_marker(self, origin, rgba, radius, _id) for _id in ids]
+        self._markers.extend(new)
+
+        markers = Atoms(new)
+        markers.coords = xyz
+        markers.radii = np.full((count,), radius, dtype=np.float32)
+        col = np.empty((count, 4), dtype=np.uint8)
+        col[:, :] = rgba
+        markers.colors = col
+
+        return markers
+
     def get_marker(self, idx):
         return self.atoms[idx]
 
@@ -161,14 +211,15 @@ class MarkerSetPlus(MarkerSet):
             self._remove_atoms(deleted)
 
 
-        if 'coord changed' in changes.atom_reasons():
-            self.triggers.activate_trigger(MARKER_MOVED, changes.modified_atoms().instances())
-        if 'color changed' in changes.atom_reasons():
-            self.triggers.activate_trigger(MARKER_COLOR_CHANGED, changes.modified_atoms().instances())
-        if 'selected changed' in changes.atom_reasons():
-            self.triggers.activate_trigger(MARKER_SELECTED, changes.modified_atoms().instances())
-        if 'display changed' in changes.atom_reasons():
-            self.triggers.activate_trigger(MARKER_DISPLAY_CHANGED, changes.modified_atoms().instances())
+        # All changes since the last frame arrive here at once, fire each trigger at most once for them and only
+        # collect the modified markers once.
+        reasons = changes.atom_reasons()
+        fire = [(r, t) for r, t in self._REASON_TRIGGERS if r in reasons]
+
+        if fire:
+            modified = changes.modified_atoms().instances()
+            for _, trigger in fire:
+                self.triggers.activate_trigger(trigger, modified)
 
         if self.DEBUG:
             print("Finished changes")
@@ -178,8 +229,12 @@ class MarkerSetPlus(MarkerSet):
          self._markers = self.atoms.instances()
 
     def _remove_atoms(self, atoms):
-        for m in atoms:
-            self._markers.remove(m)
+        if len(atoms) == 0:
+            return
+
+        # Rebuild once instead of removing one by one
+        removed = set(atoms)
+        self._markers = [m for m in self._markers if m not in removed]
 
     def _deleted_atoms(self):
         if self.DEBUG:
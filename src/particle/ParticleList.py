@@ -6,7 +6,6 @@ from __future__ import annotations
 from operator import length_hint
 
 import numpy as np
-import math
 from importlib import import_module
 
 # ChimeraX imports
@@ -21,11 +20,13 @@ from chimerax.graphics import Drawing
 from ..volume import VolumePlus
 from ..util import ManagerModel
 from ..io.ParticleData import ParticleData
+from ..util.decimate import lod_surfaces
 from .SurfaceCollectionModel import (
     SurfaceCollectionModel,
     MODELS_MOVED,
     MODELS_SELECTED,
 )
+from .SpatialIndex import SpatialIndex, SlabIndex
 from .MarkerSetPlus import (
     MarkerSetPlus,
     MARKER_CREATED,
@@ -38,7 +39,7 @@ from .MarkerSetPlus import (
 )
 
 # Triggers
-PARTLIST_CHANGED = "partlist changed"  # Data is the modified particle list.
+PARTLIST_CHANGED = "partlist changed"  # Data is the modified particle list. Fired at most once per frame.
 PARTLIST_DISPLAY_CHANGED = "partlist "
 
 END_SESSION_RESTORE = "end restore session"
@@ -49,6 +50,11 @@ class ParticleList(Model):
 
     DEBUG = False
     SESSION_SAVE = True
+    LOD_SIZES = (100, 30)
+    # Lists with more particles only create markers for a subset of the particles (lazy markers)
+    LAZY_MARKER_COUNT = 200000
+    # With lazy markers, all displayed particles get markers if there are at most this many
+    LAZY_MARKER_LIMIT = 20000
 
     def __init__(
         self,
@@ -114,10 +120,18 @@ class ParticleList(Model):
             "transparency": 0,
         }
 
-        # Contains mapping Particle.id -> (Particle, Atom)
+        # Contains mapping Particle.id -> Atom for the particles that have a marker. Particle objects are views of the
+        # particle data and are created on demand (get_particle).
         self._map = {}
-        # Register particle id tuple as attribute of atoms
-        Atom.register_attr(self.session, "particle_id", "artiax", attr_type=str)
+        # Whether marker attributes lag behind the particle data
+        self._marker_attrs_stale = False
+        self._marker_sync_handler = None
+        # PARTLIST_CHANGED is fired at most once per frame
+        self._changed_handler = None
+        # Spatial index of particle positions, created on first use
+        self._spatial_index = None
+        # Register particle id as attribute of atoms
+        Atom.register_attr(self.session, "particle_id", "artiax", attr_type=int)
 
         # MarkerSet changes connections
         self._connect_markers()
@@ -133,7 +147,29 @@ class ParticleList(Model):
             self._radius = 4 * self.origin_pixelsize
             self._axes_size = 15 * self.origin_pixelsize
 
-        self._marker_cache = []
+        self._marker_cache = set()
+
+        # Lazy markers
+        self._lazy_markers = data.size > self.LAZY_MARKER_COUNT
+        """Whether markers only exist for the displayed particles, or the displayed and selected ones if many are
+        displayed."""
+        self._marker_pids = None
+        """Particle ids of the markers in atom order, None if every particle has a marker in particle order."""
+
+        # Slab culling
+        self._slab = None
+        """(axis, offset, thickness) of the slab outside of which particles are hidden, None if not culled."""
+        self._slab_index = None
+        self._slab_version = None
+        """Data version the slab index was built for."""
+        self._slab_mask = None
+        """Particles inside the slab."""
+
+        # Level of detail of the particle surfaces
+        self._lod_sizes = list(self.LOD_SIZES)
+        """Screen sizes (diameter in pixels) below which the next simplified surface is shown, in decreasing order."""
+        self._impostor_size = 0
+        """Screen size below which a bounding box is shown instead of the surface, 0 for no box."""
 
         # Initialize the surface collection model
         self._init_collection_model()
@@ -230,6 +266,25 @@ class ParticleList(Model):
     def particle_ids(self):
         return self._data.particle_ids
 
+    @property
+    def spatial_index(self):
+        """SpatialIndex of the particle positions, kept up to date on insert, move and delete."""
+        if self._spatial_index is None:
+            self._spatial_index = SpatialIndex(source=self._spatial_source)
+
+        return self._spatial_index
+
+    def _spatial_source(self):
+        return self._data.particle_ids, self._data.get_all_transform_matrices()[:, :, 3]
+
+    def _spatial_update(self, particle_ids):
+        """Push new positions of particles to the spatial index, if it exists."""
+        if self._spatial_index is None or len(particle_ids) == 0:
+            return
+
+        matrices = self._data.get_transform_matrices(particle_ids)
+        self._spatial_index.update(particle_ids, matrices[:, :, 3])
+
     @property
     def origin_pixelsize(self):
         return self._data.pixelsize_ori
@@ -313,6 +368,49 @@ class ParticleList(Model):
                 base_model.surfaces[0].normals,
                 base_model.surfaces[0].triangles,
             )
+            self._update_lod()
+
+    @property
+    def lod_sizes(self):
+        return list(self._lod_sizes)
+
+    @lod_sizes.setter
+    def lod_sizes(self, sizes):
+        if any(s <= 0 for s in sizes):
+            raise UserError("Level of detail sizes need to be > 0.")
+
+        self._lod_sizes = sorted(sizes, reverse=True)
+        self._update_lod()
+
+    @property
+    def impostor_size(self):
+        return self._impostor_size
+
+    @impostor_size.setter
+    def impostor_size(self, value):
+        if value < 0:
+            raise UserError("Impostor size needs to be >= 0.")
+
+        self._impostor_size = value
+        self._update_lod()
+
+    def _update_lod(self):
+        """Precompute the simplified particle surfaces shown at small screen sizes."""
+        scm = self.collection_model
+        surfaces = scm.get_collection("surfaces")
+
+        if not surfaces.has_surface():
+            scm.clear_lod("surfaces")
+            return
+
+        levels, thresholds = lod_surfaces(
+            surfaces.vertices,
+            surfaces.normals,
+            surfaces.triangles,
+            self._lod_sizes,
+            self._impostor_size,
+        )
+        scm.set_lod("surfaces", levels, thresholds)
 
     @property
     def selected_particles(self):
@@ -353,8 +451,9 @@ class ParticleList(Model):
 
         self._selected_particles = copy(value)
 
-        self.markers.selected_markers = copy(value)
+        self.markers.selected_markers = self._marker_values(value)
         self.collection_model.selected_child_positions = copy(value)
+        self._update_markers()
 
     @property
     def displayed_particles(self):
@@ -394,9 +493,91 @@ class ParticleList(Model):
         from numpy import copy
 
         self._displayed_particles = copy(value)
+        self._show_particles()
 
-        self.markers.displayed_markers = copy(value)
-        self.collection_model.displayed_child_positions = copy(value)
+    @property
+    def shown_particles(self):
+        """Displayed particles that are not culled by a slab (see cull_to_slab)."""
+        displayed = self._displayed_particles
+        mask = self._slab_mask
+
+        if self._slab is None or displayed is None or mask is None or len(mask) != len(displayed):
+            return displayed
+
+        return np.logical_and(displayed, mask)
+
+    def _show_particles(self):
+        """Display the shown particles as markers and in the collection model."""
+        self._update_slab_mask()
+
+        shown = self.shown_particles
+        self.markers.displayed_markers = self._marker_values(shown)
+        self.collection_model.displayed_child_positions = np.copy(shown)
+        self._update_markers()
+
+    def cull_to_slab(self, axis, offset, thickness, coordinate_system=None):
+        """
+        Hide the particles outside of a slab, e.g. the clipped slab of a tomogram. Particles are sorted along the axis
+        once, when the slab moves only the particles entering or leaving it are updated. The displayed_particles
+        mask is not changed.
+
+        Parameters
+        ----------
+        axis : array-like
+            Normal of the slab.
+        offset : float
+            Position of the slab center along the axis.
+        thickness : float
+            Thickness of the slab.
+        coordinate_system : chimerax.geometry.Place
+            Scene position of the coordinate system of axis and offset, default scene coordinates.
+        """
+        # Slab in the coordinates of the particles
+        tf = self.scene_position.inverse()
+        if coordinate_system is not None:
+            tf = tf * coordinate_system
+
+        axis = tf.transform_vector(np.asarray(axis, dtype=np.float64))
+        axis = axis / np.linalg.norm(axis)
+        offset = offset + float(np.dot(axis, tf.origin()))
+
+        self._slab = (axis, offset, thickness)
+
+        if self._update_slab_mask():
+            self._show_particles()
+
+    def clear_slab_culling(self):
+        """Show all displayed particles again after cull_to_slab."""
+        if self._slab is None:
+            return
+
+        self._slab = None
+        self._slab_index = None
+        self._slab_mask = None
+        self._show_particles()
+
+    def _update_slab_mask(self):
+        """Bring the slab mask up to date with the slab and the particle positions. Returns True if it changed."""
+        if self._slab is None or self.size == 0:
+            return False
+
+        axis, offset, thickness = self._slab
+        index = self._slab_index
+        changed = False
+
+        # Particles changed or different axis
+        if index is None or self._slab_version != self._data.version or not np.allclose(index.axis, axis):
+            index = SlabIndex(self._data.get_all_transform_matrices()[:, :, 3], axis)
+            self._slab_index = index
+            self._slab_version = self._data.version
+            self._slab_mask = np.zeros((self.size,), dtype=bool)
+            changed = True
+
+        entered, left = index.move(offset - thickness / 2, offset + thickness / 2)
+        self._slab_mask[entered] = True
+        self._slab_mask[left] = False
+
+        return changed or len(entered) > 0 or len(left) > 0
 
     @property
     def particle_colors(self):
@@ -429,7 +610,133 @@ class ParticleList(Model):
         self._particle_colors = col
         self.display_model.color = copy(col[0, :])
         self.collection_model.colors = copy(col)
-        self.markers.marker_colors = copy(col)
+        self.markers.marker_colors = self._marker_values(col)
+
+    @property
+    def lazy_markers(self):
+        return self._lazy_markers
+
+    @lazy_markers.setter
+    def lazy_markers(self, value):
+        if value and self._marker_pids is None:
+            self._marker_pids = self._data.particle_ids
+
+        self._lazy_markers = value
+        self._update_markers()
+
+    def _marker_rows(self):
+        """Rows of the particles of the markers in atom order, None if every particle has a marker in particle
+        order."""
+        if self._marker_pids is None:
+            return None
+
+        return self._data.rows(self._marker_pids)
+
+    def _marker_values(self, values):
+        """Values of a per-particle array for the markers, in atom order."""
+        rows = self._marker_rows()
+        if rows is None or values is None:
+            return np.copy(values)
+
+        return values[rows]
+
+    def _values_from_markers(self, values, marker_values):
+        """Copy of a per-particle array with the values of the particles that have markers replaced."""
+        rows = self._marker_rows()
+        if rows is None:
+            return np.copy(marker_values)
+
+        values = np.copy(values)
+        values[rows] = marker_values
+        return values
+
+    def _lazy_marker_mask(self):
+        """Particles that get a marker in lazy mode, None while the display mask is outdated."""
+        displayed = self.shown_particles
+        if displayed is None or len(displayed) != self.size:
+            return None
+
+        if np.count_nonzero(displayed) <= self.LAZY_MARKER_LIMIT:
+            return np.copy(displayed)
+
+        selected = self._selected_particles
+        if selected is None or len(selected) != len(displayed):
+            return np.zeros((self.size,), dtype=bool)
+
+        return np.logical_and(displayed, selected)
+
+    def _update_markers(self):
+        """
+        Create markers for the particles that should have one and, with lazy markers, delete those of particles that
+        left the subset. The particle data stays untouched.
+        """
+        if self._marker_pids is None or self.markers.deleted or self.size == 0:
+            return
+
+        if self._lazy_markers:
+            target = self._lazy_marker_mask()
+            if target is None:
+                return
+        else:
+            target = np.ones((self.size,), dtype=bool)
+
+        rows = self._marker_rows()
+        has_marker = np.zeros((self.size,), dtype=bool)
+        has_marker[rows] = True
+
+        # Create first, so the marker set is never emptied
+        create = np.nonzero(target & ~has_marker)[0]
+        if len(create) > 0:
+            self._create_markers(create)
+
+        remove = has_marker & ~target
+        if np.count_nonzero(remove) == len(rows) and len(create) == 0 and len(rows) > 0:
+            # Deleting the last atom deletes the marker set, keep one
+            remove[rows[0]] = False
+
+        remove = np.nonzero(remove)[0]
+        if len(remove) > 0:
+            self._delete_markers(remove)
+
+    def _create_markers(self, rows):
+        """Create markers for the particles at rows."""
+        pids = self._data.particle_ids[rows]
+        matrices = self._data.get_transform_matrices(pids)
+
+        atoms = self.markers.create_markers(matrices[:, :, 3], self.color, self.radius)
+
+        # Masks can be outdated while particles are initialized
+        if self._selected_particles is not None and len(self._selected_particles) == self.size:
+            atoms.selecteds = self._selected_particles[rows]
+        if self._displayed_particles is not None and len(self._displayed_particles) == self.size:
+            atoms.displays = self._displayed_particles[rows]
+        if self._particle_colors is not None and len(self._particle_colors) == self.size:
+            atoms.colors = self._particle_colors[rows]
+
+        marker_list = list(atoms)
+        self._attrs_to_markers(marker_list, pids)
+
+        self._map.update(zip(pids.tolist(), marker_list))
+
+        self._marker_pids = np.append(self._marker_pids, pids)
+
+    def _delete_markers(self, rows):
+        """Delete the markers of the particles at rows, without deleting the particles."""
+        from chimerax.atomic import Atoms
+
+        pids = self._data.particle_ids[rows]
+
+        ats = []
+        for pid in pids.tolist():
+            marker = self._map.pop(pid, None)
+            if marker is not None and not marker.deleted:
+                ats.append(marker)
+
+        # Not a deletion of particles
+        self._marker_cache.update(ats)
+        self._marker_pids = self._marker_pids[~np.isin(self._marker_pids, pids)]
+
+        Atoms(ats).delete()
 
     def has_display_model(self):
         if self.display_model.count > 0:
@@ -468,13 +775,13 @@ class ParticleList(Model):
             )
 
         self._add_display_set()
-        self.triggers.activate_trigger(PARTLIST_CHANGED, self)
+        self._notify_changed()
 
     def _display_set_after_restore(self, name: str = None, value=None):
         if self.has_display_model():
             self.display_model.get(0).update_drawings()
             self._add_display_set()
-            self.triggers.activate_trigger(PARTLIST_CHANGED, self)
+            self._notify_changed()
 
     def store_marker_information(self):
         self.session._marker_settings = {
@@ -510,7 +817,25 @@ class ParticleList(Model):
         return self._data.get_main_attributes()
 
     def get_values_of_attribute(self, attribute):
-        return [getattr(m, attribute) for m in self.markers.atoms]
+        """Values of an attribute for all particles, in the order of particle_ids (view, must not be modified)."""
+        return self._data.get_column(attribute)
+
+    def set_values_of_attribute(self, attribute, values):
+        """Set the values of an attribute for all particles, in the order of particle_ids. Attributes that do not
+        exist yet are added to the list."""
+        self._data.add_attribute(attribute, values)
+        self._marker_attributes_changed()
+        self._notify_changed()
+
+    def get_tomogram_column(self):
+        """Tomogram affiliation (rlnTomoName, tomo_number or tomo) of all particles, None if not available."""
+        attri = self.get_main_attributes()
+
+        for name in ("rlnTomoName", "tomo_number", "tomo"):
+            if name in attri:
+                return np.asarray(self.get_values_of_attribute(name))
+
+        return None
 
     def get_all_attributes(self):
         return self._data.get_all_attributes()
@@ -521,15 +846,9 @@ class ParticleList(Model):
             if self.size == 0:
                 minima.append(0)
             else:
-                is_numeric = True
-                values=[getattr(m, a) for m in self.markers.atoms]
-                #check if attribute is numerical
-                for index, value in enumerate(values):
-                    if not isinstance(value, (int, float)) or isinstance(value, (bool, str)):
-                        is_numeric = False
-                        break  # No need to check further if one value is not numeric
-                if is_numeric:
-                    minima.append(min(values))
+                stats = self._data.get_attribute_stats(a)
+                if stats is not None:
+                    minima.append(stats["min"])
                 else:
                     minima.append(None)
 
@@ -541,37 +860,30 @@ class ParticleList(Model):
             if self.size == 0:
                 maxima.append(0)
             else:
-                is_numeric=True
-                values = [getattr(m, a) for m in self.markers.atoms]
-                #check if attribute is numerical
-                for index, value in enumerate(values):
-                    if not isinstance(value, (int, float)) or isinstance(value, (bool, str)):
-                        is_numeric = False
-                        break  # No need to check further if one value is not numeric
-                if is_numeric:
-                    maxima.append(max(values))
+                stats = self._data.get_attribute_stats(a)
+                if stats is not None:
+                    maxima.append(stats["max"])
                 else:
                     maxima.append(None)
 
         return maxima
 
+    def get_attribute_histogram(self, attribute, bins=64):
+        """Histogram (counts, edges) of a numeric attribute, cached until the particle data changes."""
+        return self._data.get_attribute_histogram(attribute, bins)
+
+    def count_attribute_range(self, attribute, minimum, maximum):
+        """Number of particles with minimum <= attribute <= maximum."""
+        return self._data.count_attribute_range(attribute, minimum, maximum)
+
     def get_attribute_info(self, attrs):
         info = {}
 
         for a in attrs:
-            is_numeric = False
-            values=[getattr(m, a) for m in self.markers.atoms]
-            for index, value in enumerate(values):
-                if isinstance(value, (int, float)) and not isinstance(value, (bool, str)):
-                    is_numeric = True
+            stats = self._data.get_attribute_stats(a)
 
-            if is_numeric:
-                info[a] = {}
-                info[a]["min"] = min(values)
-                info[a]["max"] = max(values)
-                info[a]["mean"] = np.mean(values)
-                info[a]["std"] = np.std(values)
-                info[a]["var"] = np.var(values)
+            if stats is not None:
+                info[a] = dict(stats)
                 info[a]["alias"] = self.data._data_keys[a]
             else:
                 info[a] = {}
@@ -598,24 +910,33 @@ class ParticleList(Model):
         places = []
         for rid in reset_ids:
             new_part = self._data[rid]
-            old_part, marker = self._map[rid]
+            marker = self._map.get(rid)
 
             # Full particle position
             place = new_part.full_transform()
             places.append(place)
-            marker.coord = place.translation()
 
-            # To map with new particle object
-            self._map[rid] = (new_part, marker)
+            if marker is None:
+                continue
+
+            marker.coord = place.translation()
 
             # Update attributes
             self._attr_to_marker(marker, new_part)
 
         self.collection_model.set_places(reset_ids, places)
-        self.triggers.activate_trigger(PARTLIST_CHANGED, self)
+        self._spatial_update(reset_ids)
+        self._notify_changed()
 
     def reset_all_particles(self):
-        self.markers.delete()
+        # Replace the marker set, so it isn't repopulated with the old particles on deletion
+        markers = self.markers
+        self.markers = MarkerSetPlus(self.session, "Markers")
+        markers.delete()
+        self.add([self.markers])
+        self._connect_markers()
+        self._marker_pids = None
+
         self.collection_model.delete_places(self.particle_ids)
         self._map.clear()
         self._data.reset_all_particles()
@@ -625,7 +946,9 @@ class ParticleList(Model):
         self._displayed_particles = None
 
         self._init_particles()
-        self.triggers.activate_trigger(PARTLIST_CHANGED, self)
+        if self._spatial_index is not None:
+            self._spatial_index.invalidate()
+        self._notify_changed()
 
     def _markerset_deleted(self, name, value):
         """
@@ -638,6 +961,7 @@ class ParticleList(Model):
             self.add([self.markers])
 
             # Repopulate markers
+            self._marker_pids = None
             if self.data.size > 0:
                 # Initialize only the marker set.
                 self._init_particles(collection=False)
@@ -660,35 +984,29 @@ class ParticleList(Model):
 
     def _init_particles(self, markers=True, collection=True):
         """Add initial particles to this list."""
-        pids = []
-        pl = []
+        from chimerax.geometry import Places
 
-        for idx, value in enumerate(self._data):
-            _id = value[0]
-            particle = value[1]
-
-            # Full particle position
-            place = particle.full_transform()
-
-            # Lists for adding particles to collections
-            if collection:
-                pids.append(_id)
-                pl.append(place)
-
-            # Create the respective marker and set custom attributes
-            if markers:
-                marker = self.markers.create_marker(
-                    place.translation(), self.color, self.radius, id=idx, trigger=False
-                )
+        # Full particle positions, computed for all particles at once
+        pids = self._data.particle_ids
+        matrices = self._data.get_all_transform_matrices()
 
-                # Add custom attributes
-                self._attr_to_marker(marker, particle)
+        if collection:
+            self.collection_model.add_places(pids.tolist(), Places(place_array=matrices))
+
+        # Create all markers at once and set custom attributes
+        if markers and self._lazy_markers:
+            # Markers are created when the display masks are set below
+            self._marker_pids = np.zeros((0,), dtype=np.int64)
+        elif markers:
+            atoms = self.markers.create_markers(
+                matrices[:, :, 3], self.color, self.radius, ids=range(len(pids))
+            )
+            marker_list = list(atoms)
 
-                # Add to internal map
-                self._map[particle.id] = (particle, marker)
+            self._attrs_to_markers(marker_list, pids)
 
-        if collection:
-            self.collection_model.add_places(pids, pl)
+            # Add to internal map
+            self._map.update(zip(pids.tolist(), marker_list))
 
         from numpy import ones, zeros, empty, uint8
 
@@ -699,31 +1017,39 @@ class ParticleList(Model):
         self.particle_colors = col
 
     def update_places(self):
-        pids = []
-        places = []
-        for particle, marker in self._map.values():
-            # Full particle position
-            place = particle.full_transform()
+        from chimerax.atomic import Atoms
+        from chimerax.geometry import Places
 
-            # Lists for adding particles to collections
-            pids.append(particle.id)
-            places.append(place)
+        # Full particle positions, computed for all particles at once
+        pids = self._data.particle_ids
+        matrices = self._data.get_all_transform_matrices()
 
-            # Shift marker
-            marker.coord = place.translation()
+        # Shift markers
+        rows = self._marker_rows()
+        marker_pids = pids if rows is None else pids[rows]
+        marker_coords = matrices[:, :, 3] if rows is None else matrices[rows, :, 3]
+        markers = [self._map[pid] for pid in marker_pids.tolist()]
+        Atoms(markers).coords = marker_coords
 
-            # Update attributes
-            self._attr_to_marker(marker, particle)
+        # Update attributes
+        self._attrs_to_markers(markers, marker_pids)
+
+        places = Places(place_array=matrices)
+        if np.array_equal(self.collection_model.child_ids, pids):
+            self.collection_model.child_positions = places
+        else:
+            self.collection_model.set_places(pids, places)
 
-        self.collection_model.set_places(pids, places)
+        if self._spatial_index is not None:
+            self._spatial_index.invalidate()
 
     def get_particle(self, particle_id):
         """Return Particle instance for ParticleModel ID."""
-        return self._map[particle_id][0]
+        return self._data[particle_id]
 
     def get_marker(self, particle_id):
-        """Return Marker instance for ParticleModel ID."""
-        return self._map[particle_id][1]
+        """Return Marker instance for ParticleModel ID, None if the particle has no marker (lazy markers)."""
+        return self._map.get(particle_id)
 
     def _attr_to_marker(self, marker, particle):
         for attr in particle.attributes():
@@ -743,8 +1069,101 @@ class ParticleList(Model):
 
         marker.particle_id = particle.id
 
+    def _attrs_to_markers(self, markers, particle_ids):
+        """
+        Bulk version of _attr_to_marker. Only the particle ids are set on the markers right away, all other attributes
+        are mirrored lazily by sync_marker_attributes.
+        """
+        if len(markers) == 0:
+            return
+
+        rows = self._data.rows(particle_ids)
+        names = self.selection_settings["names"]
+        attributes = self._data.attributes()
+
+        for idx, attr in enumerate(names):
+            if attr not in attributes:
+                continue
+
+            column = self._data.get_column(attr)[rows]
+            if column.dtype.kind in "iuf":
+                mini, maxi = column.min().item(), column.max().item()
+            else:
+                mini, maxi = min(column), max(column)
+
+            if mini < self.selection_settings["minima"][idx]:
+                self.selection_settings["minima"][idx] = mini
+
+            if maxi > self.selection_settings["maxima"][idx]:
+                self.selection_settings["maxima"][idx] = maxi
+
+        for marker, pid in zip(markers, np.asarray(particle_ids).tolist()):
+            marker.particle_id = pid
+
+        self._marker_attributes_changed()
+
+    def _notify_changed(self):
+        """
+        Schedule PARTLIST_CHANGED for the next frame. Changes until then are merged into one notification, so bulk
+        edits only cause one update of the UI.
+        """
+        if self._changed_handler is None:
+            self._changed_handler = self.session.triggers.add_handler("new frame", self._changed_on_frame)
+
+    def _changed_on_frame(self, name, data):
+        from chimerax.core.triggerset import DEREGISTER
+
+        self._changed_handler = None
+        if not self.deleted:
+            self.triggers.activate_trigger(PARTLIST_CHANGED, self)
+
+        return DEREGISTER
+
+    def _marker_attributes_changed(self):
+        """Mark marker attributes as outdated and schedule mirroring them before the next frame is drawn."""
+        self._marker_attrs_stale = True
+
+        if self._marker_sync_handler is None:
+            self._marker_sync_handler = self.session.triggers.add_handler(
+                "new frame", self._sync_marker_attributes_on_frame
+            )
+
+    def _sync_marker_attributes_on_frame(self, name, data):
+        from chimerax.core.triggerset import DEREGISTER
+
+        self._marker_sync_handler = None
+        if not self.deleted:
+            self.sync_marker_attributes()
+
+        return DEREGISTER
+
+    def sync_marker_attributes(self):
+        """
+        Mirror the particle attributes onto the marker atoms, so they can be used in atom specs (e.g. @@attribute>1).
+        Does nothing if the markers are up to date.
+        """
+        if not self._marker_attrs_stale:
+            return
+
+        self._marker_attrs_stale = False
+
+        if self.size == 0 or self.markers.deleted:
+            return
+
+        rows = self._marker_rows()
+        pids = self._data.particle_ids if rows is None else self._marker_pids
+        markers = [self._map[pid] for pid in pids.tolist()]
+
+        for attr in self._data.attributes():
+            column = self._data.get_column(attr)
+            if rows is not None:
+                column = column[rows]
+
+            for marker, val in zip(markers, column.tolist()):
+                setattr(marker, attr, val)
+
     def _add_to_map(self, particle, marker):
-        self._map[particle.id] = (particle, marker)
+        self._map[particle.id] = marker
 
     def _add_display_set(self):
         base_model = self.display_model.get(0)
@@ -755,6 +1174,7 @@ class ParticleList(Model):
             base_model.surfaces[0].normals,
             base_model.surfaces[0].triangles,
         )
+        self._update_lod()
 
         base_model.display = False
 
@@ -766,7 +1186,7 @@ class ParticleList(Model):
         # this trigger after being deleted below. The parent model is deleted if surface was deleted.
         # if data.id is None:
         #     return
-        if data.id in self._map.keys():
+        if data.id in self._data:
             particle_id = data.id
         else:
             return
@@ -779,13 +1199,21 @@ class ParticleList(Model):
 
         triggered by MARKER_DELETED
         """
-        # Data should be list of deleted markers
-        self.delete_data([m.particle_id for m in data if m not in self._marker_cache])
+        # Data should be list of deleted markers. Markers in the cache were deleted on purpose.
+        pids = [m.particle_id for m in data if m not in self._marker_cache]
+        self._marker_cache.difference_update(data)
+        self.delete_data(pids)
         # for m in data:
         #     self.delete_data(m.particle_id)
 
     def id_mask(self, particle_id):
-        return particle_id == self.particle_ids
+        from numpy import zeros
+
+        mask = zeros((self.size,), dtype=bool)
+        if particle_id in self._data:
+            mask[self._data.rows([particle_id])] = True
+
+        return mask
 
     def delete_data(self, particle_ids, cache_markers=True):
         """Delete Marker and Particle instances if they exist."""
@@ -799,53 +1227,47 @@ class ParticleList(Model):
             return
 
         # Do it this way, because deleting atoms happens all at once, so we cannot individually set masks
-        from numpy import zeros, logical_not, logical_or
+        from numpy import ones
 
-        #find index of
-        #print(f"deleting particle {particle_ids}")
+        # Particles might already be deleted, because deletion can be triggered by different actions
+        pids = [pid for pid in dict.fromkeys(particle_ids) if pid in self._data]
 
-        mask = zeros((self.size,), dtype=bool)
-        prev_ids = self._data.particle_ids
+        if len(pids) == 0:
+            return
 
-        pids = []
-        ats = []
-        self._marker_cache = []
+        # Resolve all ids to rows at once
+        data_ids = pids
+        mask = ones((self.size,), dtype=bool)
+        mask[self._data.rows(data_ids)] = False
 
         pre_sel = self.selected_particles
         pre_disp = self.displayed_particles
         pre_col = self.particle_colors
 
-        for pid in particle_ids:
-            # Particle already deleted?
-            if pid in self._map:
-                mask = logical_or(prev_ids == pid, mask)
-                particle, marker = self._map.pop(pid)
-            else:
-                continue
-
-            # Need to check because deletion can be triggered by different actions, and one or more might already be deleted
-            if particle in self._data:
-                self._data.delete_particle(particle.id)
-
-            if not marker.deleted:
+        ats = []
+        for pid in pids:
+            marker = self._map.pop(pid, None)
+            if marker is not None and not marker.deleted:
                 ats.append(marker)
-                # self.markers.delete_atom(marker)
-                if cache_markers:
-                    self._marker_cache.append(marker)
 
-            if pid in self.collection_model:
-                pids.append(pid)
-                # self.collection_model.delete_place(pid)
+        if cache_markers:
+            self._marker_cache.update(ats)
+        if self._marker_pids is not None:
+            self._marker_pids = self._marker_pids[~np.isin(self._marker_pids, pids)]
+        place_ids = [pid for pid in pids if pid in self.collection_model]
 
-        # Delete all atoms/places at once
-        self.collection_model.delete_places(pids)
+        # Delete all particles/atoms/places at once
+        self._data.delete_particles(data_ids)
+        self.collection_model.delete_places(place_ids)
+        if self._spatial_index is not None:
+            self._spatial_index.remove(data_ids)
 
         # For atoms this is a little weird. If we delete the last atom of the set using a collection, chimerax crashes.
         # So we intersect with all atoms, and if all are contained, we handle special cases.
         from chimerax.atomic import Atoms
 
         atoms = Atoms(ats)
-        if np.all(self.markers.atoms.mask(atoms)):
+        if len(atoms) > 0 and np.all(self.markers.atoms.mask(atoms)):
             # If there is only one atom, just delete using Atom-object's method
             if len(atoms) == 1:
                 atoms[0].delete()
@@ -858,14 +1280,11 @@ class ParticleList(Model):
             atoms.delete()
 
         # Now update colors and display to keep consistent
-        mask = logical_not(mask)
-        # print(mask)
-
         self.selected_particles = pre_sel[mask]  # zeros((self.size,), dtype=bool)
         self.displayed_particles = pre_disp[mask]  # self.displayed_particles[mask]
 
         self.particle_colors = pre_col[mask, :]  # self.particle_colors[mask, :]
-        self.triggers.activate_trigger(PARTLIST_CHANGED, self)
+        self._notify_changed()
 
     def new_particles(self, origins, translations, rotations):
         if self.editing_locked:
@@ -942,6 +1361,9 @@ class ParticleList(Model):
 
         # To map
         self._add_to_map(particle, marker)
+        self._spatial_update([particle.id])
+        if self._marker_pids is not None:
+            self._marker_pids = np.append(self._marker_pids, particle.id)
 
         # Now reset selection and so on to keep things consistent
         from numpy import array, append, reshape
@@ -988,6 +1410,9 @@ class ParticleList(Model):
 
         # To map
         self._add_to_map(particle, marker)
+        self._spatial_update([particle.id])
+        if self._marker_pids is not None:
+            self._marker_pids = np.append(self._marker_pids, particle.id)
 
         # Now reset selection and so on to keep things consistent
         from numpy import array, append, reshape
@@ -1018,7 +1443,8 @@ class ParticleList(Model):
         places = []
 
         for m in markers:
-            particle, marker = self._map[m.particle_id]
+            particle = self._data[m.particle_id]
+            marker = self._map[m.particle_id]
 
             if self.translation_locked:
                 m.coord = particle.coord
@@ -1045,6 +1471,7 @@ class ParticleList(Model):
             places.append(particle.full_transform())
 
         self.collection_model.set_places(place_ids, places)
+        self._spatial_update(place_ids)
 
     def _model_moved(self, name, data):
         # Data sent by trigger should be particle ids
@@ -1052,48 +1479,46 @@ class ParticleList(Model):
             print("Particles {} moved.".format(data))
 
         scm = self.collection_model
+        pids = [pid for pid in data if pid in self._data]
 
-        # Update the marker, block changes trigger to prevent loop
-        with self.markers.triggers.block_trigger("changes"):
-            for pid in data:
-                particle, marker = self._map[pid]
-
-                place = scm.get_place(pid)
+        if len(pids) == 0:
+            return
 
-                if self.translation_locked:
-                    new_coord = particle.coord
-                else:
-                    new_coord = place.translation()
+        from chimerax.atomic import Atoms
+        from chimerax.geometry import Places
 
-                from chimerax.geometry import translation
+        # Current particle positions and new positions of the moved instances
+        old = self._data.get_transform_matrices(pids)
+        new = scm.get_place_array(pids)
 
-                if self.rotation_locked:
-                    new_rot = particle.rotation
-                else:
-                    new_rot = place
+        if self.translation_locked:
+            new[:, :, 3] = old[:, :, 3]
 
-                new_place = translation(new_coord) * new_rot.zero_translation()
+        if self.rotation_locked:
+            new[:, :, :3] = old[:, :, :3]
 
-                # Set as additional translation for now
-                # ori = particle.origin_coord
-                # dx = new_coord[0] - ori[0]
-                # dy = new_coord[1] - ori[1]
-                # dz = new_coord[2] - ori[2]
-                # particle.translation = (dx, dy, dz)
+        # Set particle translation to 0 and origin to the new position
+        self._data.set_translations(pids, np.zeros((len(pids), 3)))
+        self._data.set_origins(pids, new[:, :, 3])
+        if not self.rotation_locked:
+            self._data.set_rotations(pids, new[:, :, :3])
 
-                # Set particle translation to 0
-                if not particle.translation.is_identity():
-                    particle.translation = (0, 0, 0)
+        if self._spatial_index is not None:
+            self._spatial_index.update(pids, new[:, :, 3])
 
-                particle.origin = (new_coord[0], new_coord[1], new_coord[2])
-                particle.rotation = new_rot
-                marker.coord = particle.coord
+        # Update the marker, block changes trigger to prevent loop
+        with self.markers.triggers.block_trigger("changes"):
+            markers = [self._map.get(pid) for pid in pids]
+            has_marker = np.array([m is not None for m in markers], dtype=bool)
+            markers = [m for m in markers if m is not None]
+            Atoms(markers).coords = new[has_marker, :, 3]
 
-                if self.translation_locked:
-                    scm.set_place(pid, new_place)
+            if self.translation_locked:
+                scm.set_places(pids, Places(place_array=new))
 
-                # Update attributes
-                self._attr_to_marker(marker, particle)
+            # Update attributes
+            for pid, marker in zip(np.asarray(pids)[has_marker].tolist(), markers):
+                self._attr_to_marker(marker, self._data[pid])
 
     def update_position_selectors(self):
         # names = self.selection_settings['names']
@@ -1113,19 +1538,17 @@ class ParticleList(Model):
         # self.selection_settings['minima'] = mini
         # self.selection_settings['maxima'] = maxi
 
-        self.triggers.activate_trigger(PARTLIST_CHANGED, self)
+        self._notify_changed()
 
     def _marker_selected(self, name, data):
         sm = self.markers.selected_markers
 
         from numpy import all
 
-        if all(self._selected_particles == sm):
+        if all(self._marker_values(self._selected_particles) == sm):
             return
 
-        from numpy import copy
-
-        self.selected_particles = copy(sm)
+        self.selected_particles = self._values_from_markers(self._selected_particles, sm)
 
     def _model_selected(self, name, data):
         sc = self.collection_model.selected_child_positions
@@ -1144,24 +1567,25 @@ class ParticleList(Model):
 
         from numpy import all
 
-        if all(self._particle_colors == cm):
+        if all(self._marker_values(self._particle_colors) == cm):
             return
 
-        from numpy import copy
-
-        self.colors = copy(cm)
+        self.colors = self._values_from_markers(self._particle_colors, cm)
 
     def _marker_display_changed(self, name, data):
         dm = self.markers.displayed_markers
 
         from numpy import all
 
-        if all(self._displayed_particles == dm):
+        if all(self._marker_values(self.shown_particles) == dm):
             return
 
-        from numpy import copy
+        displayed = self._values_from_markers(self.shown_particles, dm)
+        if self.shown_particles is not self._displayed_particles:
+            # Culled particles keep their state
+            displayed = np.where(self._slab_mask, displayed, self._displayed_particles)
 
-        self.displayed_particles = copy(dm)
+        self.displayed_particles = displayed
 
     def _particlelist_set_color(self, rgba):
         Model.set_color(self, rgba)
@@ -1211,6 +1635,9 @@ class ParticleList(Model):
             "color_settings": self.color_settings,
             "radius": self._radius,
             "axes_size": self._axes_size,
+            "lod_sizes": self._lod_sizes,
+            "impostor_size": self._impostor_size,
+            "lazy_markers": self._lazy_markers,
         }
 
         return data
@@ -1224,17 +1651,17 @@ class ParticleList(Model):
         Model.set_state_from_snapshot(pl, session, data["model state"])
 
         pl._selected_particles = data["selected"]
-        pl.markers.selected_markers = copy(pl._selected_particles)
+        pl.markers.selected_markers = pl._marker_values(pl._selected_particles)
         pl.collection_model.selected_child_positions = copy(pl._selected_particles)
 
         pl._displayed_particles = data["displayed"]
-        pl.markers.displayed_markers = copy(pl._displayed_particles)
+        pl.markers.displayed_markers = pl._marker_values(pl._displayed_particles)
         pl.collection_model.displayed_child_positions = copy(pl._displayed_particles)
 
         pl._particle_colors = data["colors"]
         pl.display_model.color = copy(pl._particle_colors[0, :])
         pl.collection_model.colors = copy(pl._particle_colors)
-        pl.markers.marker_colors = copy(pl._particle_colors)
+        pl.markers.marker_colors = pl._marker_values(pl._particle_colors)
 
         pl.translation_locked = data["translation_locked"]
         pl.rotation_locked = data["rotation_locked"]
@@ -1242,10 +1669,21 @@ class ParticleList(Model):
         pl.color_settings = data["color_settings"]
         pl._radius = data["radius"]
         pl._axes_size = data["axes_size"]
+        pl._lod_sizes = data.get("lod_sizes", pl._lod_sizes)
+        pl._impostor_size = data.get("impostor_size", pl._impostor_size)
+        pl.lazy_markers = data.get("lazy_markers", pl.lazy_markers)
 
         return pl
 
     def delete(self):
+        if self._marker_sync_handler is not None:
+            self.session.triggers.remove_handler(self._marker_sync_handler)
+            self._marker_sync_handler = None
+
+        if self._changed_handler is not None:
+            self.session.triggers.remove_handler(self._changed_handler)
+            self._changed_handler = None
+
         if not self.markers.deleted:
             self.markers.delete()
         if not self._collection_model.deleted:
@@ -1301,7 +1739,6 @@ def selected_collections(session, exclude_rot_lock=False):
 
     for plist in artia.partlists.iter():
         scm = plist.collection_model
-        markers = plist.markers
 
         if plist.rotation_locked and exclude_rot_lock:
             continue
@@ -1309,7 +1746,10 @@ def selected_collections(session, exclude_rot_lock=False):
         if any(plist.selected_particles):
             selected_drawings.append(scm)
             position_masks.append(
-                np.logical_or(scm.position_mask(), markers.position_mask())
+                np.logical_or(
+                    scm.position_mask(),
+                    np.logical_and(plist.shown_particles, plist.selected_particles),
+                )
             )
 
     return selected_drawings, position_masks
@@ -1365,7 +1805,7 @@ def lock_particlelist(models, lock_state, what, do_print=True):
 
             if lock_trans or lock_rot:
                 text += "{}, ".format(str(m))
-                m.triggers.activate_trigger(PARTLIST_CHANGED, m)
+                m._notify_changed()
 
     text = text[:-2]
 
@@ -1393,85 +1833,164 @@ def invert_selection(session):
 
     from numpy import logical_not
 
+    # Invert the particle selection, with lazy markers not every particle has a marker
     for plist in artia.partlists.iter():
-        if plist.visible:
-            markerset = plist.markers
-            markerset.atoms.selecteds = logical_not(markerset.atoms.selecteds)
+        if plist.visible and plist.size > 0:
+            plist.selected_particles = logical_not(plist.selected_particles)
+
+
+
+def delete_duplicates(session, models, radius=0, keep_attribute=None, across_lists=False):
+    """
+    Delete particles that are within radius of another particle of the same tomogram.
+
+    Parameters
+    ----------
+    session : chimerax.core.session.Session
+        The session.
+    models : list of str
+        ID strings of the particle lists to process.
+    radius : float
+        Particles closer than this (in angstrom) are duplicates.
+    keep_attribute : str
+        If set, of each group of duplicates the particle with the highest value of this attribute is kept. Otherwise,
+        of each pair of duplicates the particle that comes first in its list is deleted.
+    across_lists : bool
+        If True, particles of different lists can be duplicates of each other.
+    """
+    if not hasattr(session, "ArtiaX"):
+        return
 
+    import time
+    from .SpatialIndex import SpatialIndex
 
+    t0 = time.time()
 
-def delete_duplicates(session, models, radius=0):
-    if not hasattr(session, "ArtiaX"):
+    # The particle lists to process, in the given order
+    partlists = {pl.id_string: pl for pl in session.ArtiaX.partlists.iter()}
+    partlists = [partlists[_id] for _id in models if _id in partlists]
+
+    if len(partlists) == 0:
         return
 
-    for pl in session.ArtiaX.partlists.iter():
-        for id in models:
-            if f"{pl.id_string}" == id:
-                # Find the particle list
-                selected_pl = pl
-                particle_ids = selected_pl.particle_ids
-                attri = selected_pl.get_main_attributes()
-
-                tomoname = None
-                if "rlnTomoName" in attri:
-                    tomoname = selected_pl.get_values_of_attribute("rlnTomoName")
-                elif "tomo_number" in attri:
-                    tomoname = selected_pl.get_values_of_attribute("tomo_number")
-                elif "tomo" in attri:
-                    tomoname = selected_pl.get_values_of_attribute("tomo")
-
-                # If no tomogram info, treat all particles as one tomogram
-                if not tomoname:
-                    print(
-                        f"Warning: Tomogram information not found for particle list ID {id}. Treating all particles as one tomogram.")
-                    tomoname = [0] * len(particle_ids)  # Assign all particles to one "virtual tomogram"
-
-                # Create a dictionary to group coordinates by tomogram
-                tomo_coordinates = {}
-                tomo_particle_ids = {}
-
-                for pid, tomo_id in zip(particle_ids, tomoname):
-                    particle, marker = pl._map[pid]
-                    coord = particle.coord
-
-                    if tomo_id not in tomo_coordinates:
-                        tomo_coordinates[tomo_id] = []
-                        tomo_particle_ids[tomo_id] = []
-
-                    tomo_coordinates[tomo_id].append(coord)
-                    tomo_particle_ids[tomo_id].append(pid)
-
-                # Check for duplicates within each tomogram
-                duplicate_ids = []
-
-                for tomo_id, coords in tomo_coordinates.items():
-                    ids = tomo_particle_ids[tomo_id]
-                    duplicates = []
-
-                    for i, coord1 in enumerate(coords):
-                        for j in range(i + 1, len(coords)):
-                            coord2 = coords[j]
-
-                            # Calculate Euclidean distance
-                            distance = math.sqrt(
-                                (coord1[0] - coord2[0]) ** 2 +
-                                (coord1[1] - coord2[1]) ** 2 +
-                                (coord1[2] - coord2[2]) ** 2
-                            )
-
-                            if distance <= radius:
-                                duplicates.append((i, j))
-                                #print(f"Tomogram {tomo_id}: Adding particle {i} to deletion list, "f"distance {distance} to particle {j}")
-
-                    # Map duplicate indices to particle IDs
-                    for i, j in duplicates:
-                        if ids[i] not in duplicate_ids:
-                            duplicate_ids.append(ids[i])
-
-                if duplicate_ids:
-                    print(f"Deleting {len(duplicate_ids)} particles")
-                    selected_pl.delete_data(duplicate_ids)
-                else:
-                    print(f"No duplicates found.")
+    # Concatenate all lists, particles are addressed by their global index
+    sizes = [pl.size for pl in partlists]
+    offsets = np.cumsum([0] + sizes)
+    list_index = np.repeat(np.arange(len(partlists)), sizes)
+
+    tomos = []
+    scores = []
+    for pl in partlists:
+        tomo = pl.get_tomogram_column()
+        if tomo is None:
+            session.logger.warning(
+                "artiax delete duplicates: Tomogram information not found for particle list #{}. Treating all "
+                "particles as one tomogram.".format(pl.id_string)
+            )
+            tomo = np.zeros((pl.size,), dtype=np.int64)
+        tomos.append(np.asarray(tomo, dtype=object))
+
+        if keep_attribute is not None:
+            if keep_attribute not in pl.get_all_attributes():
+                raise UserError(
+                    "artiax delete duplicates: Attribute {} unknown for particle list #{}.".format(
+                        keep_attribute, pl.id_string
+                    )
+                )
+            scores.append(np.asarray(pl.get_values_of_attribute(keep_attribute), dtype=np.float64))
+
+    tomo = np.concatenate(tomos)
+
+    # Candidate pairs of global indices
+    if across_lists and len(partlists) > 1:
+        # Lists can be moved independently, so compare their particles in scene coordinates
+        coords = np.concatenate(
+            [pl.scene_position.transform_points(pl.data.get_all_transform_matrices()[:, :, 3]) for pl in partlists]
+        )
+        pairs = SpatialIndex(points=coords).query_pairs(radius)
+    else:
+        pairs = [np.zeros((0, 2), dtype=np.int64)]
+        for pl, offset in zip(partlists, offsets):
+            pl_pairs = pl.spatial_index.query_pairs(radius)
+            pairs.append(pl.data.rows(pl_pairs.ravel()).reshape((-1, 2)) + offset)
+        pairs = np.concatenate(pairs)
+
+    # Only particles of the same tomogram are duplicates
+    pairs.sort(axis=1)
+    pairs = pairs[tomo[pairs[:, 0]] == tomo[pairs[:, 1]]]
+
+    t1 = time.time()
+
+    if keep_attribute is None:
+        # Of each pair, delete the particle that comes first
+        delete = np.zeros((len(tomo),), dtype=bool)
+        delete[pairs[:, 0]] = True
+    else:
+        delete = _suppress_duplicates(pairs, np.concatenate(scores))
+
+    t2 = time.time()
+
+    total = 0
+    for i, pl in enumerate(partlists):
+        rows = np.nonzero(delete[offsets[i] : offsets[i + 1]])[0]
+        if len(rows) == 0:
+            continue
+
+        if pl.editing_locked:
+            session.logger.warning(
+                "artiax delete duplicates: Particle list #{} is locked, {} duplicates not deleted.".format(
+                    pl.id_string, len(rows)
+                )
+            )
+            continue
+
+        pl.delete_data(pl.particle_ids[rows].tolist())
+        total += len(rows)
+        session.logger.info(
+            "artiax delete duplicates: Deleted {} of {} particles from #{}.".format(
+                len(rows), sizes[i], pl.id_string
+            )
+        )
+
+    t3 = time.time()
+
+    if total == 0:
+        session.logger.info("artiax delete duplicates: No duplicates found.")
+
+    session.logger.info(
+        "artiax delete duplicates: {} duplicate pairs among {} particles. Search {:.2f} s, selection {:.2f} s, "
+        "deletion {:.2f} s.".format(len(pairs), len(tomo), t1 - t0, t2 - t1, t3 - t2)
+    )
+
+
+def _suppress_duplicates(pairs, scores):
+    """
+    Greedy selection of the particles to delete: particles are visited by descending score, a particle is kept if
+    none of its duplicates was kept before. Returns a boolean mask of the particles to delete.
+    """
+    n = len(scores)
+    delete = np.zeros((n,), dtype=bool)
+
+    if len(pairs) == 0:
+        return delete
+
+    # Adjacency in compressed form
+    both = np.concatenate((pairs, pairs[:, ::-1]))
+    both = both[np.argsort(both[:, 0], kind="stable")]
+    starts = np.searchsorted(both[:, 0], np.arange(n + 1))
+    neighbours = both[:, 1]
+
+    # Only particles with duplicates need to be visited, NaN scores come last
+    involved = np.unique(pairs)
+    order = involved[np.argsort(-np.nan_to_num(scores[involved], nan=-np.inf), kind="stable")]
+
+    kept = np.zeros((n,), dtype=bool)
+    for idx in order.tolist():
+        if kept[neighbours[starts[idx] : starts[idx + 1]]].any():
+            delete[idx] = True
+        else:
+            kept[idx] = True
+
+    return delete
 
 
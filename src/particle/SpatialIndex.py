@@ -0,0 +1,432 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# General
+import numpy as np
+
+
+class SpatialIndex:
+    """
+    A SpatialIndex answers neighbour queries (radius, k-nearest, box and all pairs within a distance) on a set of
+    3D points identified by IDs, e.g. the particles of a ParticleList.
+
+    The points are kept in a KD-tree (scipy.spatial.cKDTree). Points that are moved or inserted after the tree was
+    built are kept in a small pending set with its own KD-tree, removed points are masked out. Once the pending or
+    removed points exceed REBUILD_FRACTION of the tree size, the tree is rebuilt. Queries with many query points
+    rebuild earlier, as soon as working around the outdated points would cost more than rebuilding. If the index has
+    a source, it is rebuilt from the source after invalidate().
+    """
+
+    REBUILD_FRACTION = 0.05
+    """Fraction of moved/inserted/removed points above which the tree is rebuilt."""
+    MIN_PENDING = 256
+    """Number of moved/inserted/removed points that is always tolerated before rebuilding."""
+
+    def __init__(self, points=None, ids=None, source=None):
+        """
+        Parameters
+        ----------
+        points : array-like
+            (N, 3) array of coordinates.
+        ids : array-like
+            N integer IDs of the points, default 0..N-1.
+        source : callable
+            Function returning a tuple (ids, points) with the current state, used to (re)build the tree lazily.
+        """
+        self._source = source
+        """Callable returning (ids, points) used to rebuild the index, or None."""
+        self._tree = None
+        self._ids = np.zeros((0,), dtype=np.int64)
+        """IDs of the points in the tree, in tree order."""
+        self._points = np.zeros((0, 3), dtype=np.float64)
+        self._row_of = {}
+        """Map of IDs to rows of the tree."""
+        self._excluded = np.zeros((0,), dtype=bool)
+        """True for tree rows that were moved or removed since the tree was built."""
+        self._excluded_count = 0
+        """Number of True entries in self._excluded."""
+        self._pending = {}
+        """Map of IDs to coordinates of points moved or inserted since the tree was built."""
+        self._pending_tree = None
+        """KD-tree of the pending points and their IDs, built on demand."""
+
+        if points is not None:
+            self._build(ids, points)
+
+    def __len__(self):
+        self._ensure()
+        return len(self._ids) - self._excluded_count + len(self._pending)
+
+    # ==============================================================================
+    # Maintenance ==================================================================
+    # ==============================================================================
+
+    def _build(self, ids, points):
+        from scipy.spatial import cKDTree
+
+        points = np.asarray(points, dtype=np.float64).reshape((-1, 3))
+
+        if ids is None:
+            ids = np.arange(points.shape[0], dtype=np.int64)
+
+        self._ids = np.asarray(ids, dtype=np.int64)
+        self._points = points
+        self._tree = cKDTree(points)
+        self._row_of = {_id: row for row, _id in enumerate(self._ids.tolist())}
+        self._excluded = np.zeros((len(self._ids),), dtype=bool)
+        self._excluded_count = 0
+        self._pending = {}
+        self._pending_tree = None
+
+    def _ensure(self):
+        """Rebuild the tree if it is outdated."""
+        if self._tree is not None:
+            return
+
+        if self._source is not None:
+            ids, points = self._source()
+        else:
+            ids, points = self._all_points()
+
+        self._build(ids, points)
+
+    def _outdated(self):
+        """Number of points the tree does not describe correctly anymore."""
+        return max(self._excluded_count, len(self._pending))
+
+    def _check_rebuild(self):
+        """Rebuild once too many points are outdated."""
+        if self._outdated() > max(self.MIN_PENDING, self.REBUILD_FRACTION * len(self._ids)):
+            self.invalidate()
+
+    def _prepare(self, count):
+        """
+        Make the tree ready for a query with count query points. Every query point costs work proportional to the
+        number of outdated points, so the tree is rebuilt if that would exceed the cost of rebuilding.
+        """
+        self._ensure()
+
+        outdated = self._outdated()
+        if outdated > 0 and count * outdated > len(self._ids):
+            self.invalidate()
+            self._ensure()
+
+    def _exclude(self, row):
+        if not self._excluded[row]:
+            self._excluded[row] = True
+            self._excluded_count += 1
+
+    def _all_points(self):
+        """IDs and coordinates of all current points."""
+        keep = ~self._excluded
+        p_ids, p_points = self._pending_arrays()
+
+        ids = np.concatenate((self._ids[keep], p_ids))
+        points = np.concatenate((self._points[keep], p_points))
+
+        return ids, points
+
+    def _pending_arrays(self):
+        count = len(self._pending)
+        ids = np.fromiter(self._pending.keys(), dtype=np.int64, count=count)
+        points = np.array(list(self._pending.values()), dtype=np.float64).reshape((count, 3))
+
+        return ids, points
+
+    def _pending_search(self):
+        """IDs and KD-tree of the pending points, the tree is None if there are none."""
+        from scipy.spatial import cKDTree
+
+        if self._pending_tree is None:
+            p_ids, p_points = self._pending_arrays()
+            self._pending_tree = (p_ids, cKDTree(p_points) if len(p_ids) > 0 else None)
+
+        return self._pending_tree
+
+    def invalidate(self):
+        """Mark the whole index as outdated. Indices with a source are rebuilt from it on the next query."""
+        if self._source is None:
+            self._build(*self._all_points())
+        else:
+            self._tree = None
+
+    def update(self, ids, points):
+        """
+        Insert or move points.
+
+        Parameters
+        ----------
+        ids : array-like
+            IDs of the points.
+        points : array-like
+            (N, 3) array of new coordinates.
+        """
+        if self._tree is None:
+            return
+
+        points = np.asarray(points, dtype=np.float64).reshape((-1, 3))
+
+        for _id, point in zip(np.asarray(ids).tolist(), points):
+            row = self._row_of.get(_id)
+            if row is not None:
+                self._exclude(row)
+            self._pending[_id] = point
+
+        self._pending_tree = None
+        self._check_rebuild()
+
+    def remove(self, ids):
+        """Remove points by ID."""
+        if self._tree is None:
+            return
+
+        for _id in np.asarray(ids).tolist():
+            row = self._row_of.get(_id)
+            if row is not None:
+                self._exclude(row)
+            self._pending.pop(_id, None)
+
+        self._pending_tree = None
+        self._check_rebuild()
+
+    # ==============================================================================
+    # Queries ======================================================================
+    # ==============================================================================
+
+    def query_radius(self, points, radius):
+        """
+        IDs of all points within radius of each query point.
+
+        Parameters
+        ----------
+        points : array-like
+            (M, 3) array of query points.
+        radius : float
+            Search radius.
+
+        Returns
+        -------
+        ids : list of numpy.ndarray
+            For each query point the IDs of all points with distance <= radius.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape((-1, 3))
+        self._prepare(points.shape[0])
+
+        rows = self._tree.query_ball_point(points, radius, workers=-1)
+        p_ids, p_tree = self._pending_search()
+
+        if p_tree is not None:
+            p_rows = p_tree.query_ball_point(points, radius, workers=-1)
+
+        result = []
+        for i, r in enumerate(rows):
+            r = np.asarray(r, dtype=np.int64)
+            ids = self._ids[r[~self._excluded[r]]]
+            if p_tree is not None:
+                ids = np.concatenate((ids, p_ids[np.asarray(p_rows[i], dtype=np.int64)]))
+            result.append(ids)
+
+        return result
+
+    def query_knn(self, points, k=1):
+        """
+        The k nearest points of each query point.
+
+        Parameters
+        ----------
+        points : array-like
+            (M, 3) array of query points.
+        k : int
+            Number of neighbours.
+
+        Returns
+        -------
+        distances : numpy.ndarray
+            (M, k) array of distances, sorted ascending. inf where fewer than k points exist.
+        ids : numpy.ndarray
+            (M, k) array of IDs, -1 where fewer than k points exist.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape((-1, 3))
+        m = points.shape[0]
+        self._prepare(m)
+
+        # Ask the tree for enough neighbours to make up for removed points
+        n_tree = len(self._ids)
+        kk = min(k + self._excluded_count, n_tree)
+
+        if kk > 0:
+            dist, rows = self._tree.query(points, k=kk, workers=-1)
+            dist = np.asarray(dist, dtype=np.float64).reshape((m, kk))
+            rows = np.asarray(rows).reshape((m, kk))
+            dist[self._excluded[rows]] = np.inf
+            ids = self._ids[rows]
+        else:
+            dist = np.zeros((m, 0), dtype=np.float64)
+            ids = np.zeros((m, 0), dtype=np.int64)
+
+        p_ids, p_tree = self._pending_search()
+        if p_tree is not None:
+            pk = min(k, len(p_ids))
+            p_dist, p_rows = p_tree.query(points, k=pk, workers=-1)
+            p_dist = np.asarray(p_dist, dtype=np.float64).reshape((m, pk))
+            p_rows = np.asarray(p_rows).reshape((m, pk))
+            dist = np.concatenate((dist, p_dist), axis=1)
+            ids = np.concatenate((ids, p_ids[p_rows]), axis=1)
+
+        # Pad if there are fewer than k points
+        if dist.shape[1] < k:
+            pad = k - dist.shape[1]
+            dist = np.concatenate((dist, np.full((m, pad), np.inf)), axis=1)
+            ids = np.concatenate((ids, np.full((m, pad), -1, dtype=np.int64)), axis=1)
+
+        order = np.argsort(dist, axis=1, kind="stable")[:, :k]
+        dist = np.take_along_axis(dist, order, axis=1)
+        ids = np.take_along_axis(ids, order, axis=1)
+        ids[np.isinf(dist)] = -1
+
+        return dist, ids
+
+    def query_box(self, xyz_min, xyz_max):
+        """
+        IDs of all points inside an axis-aligned box.
+
+        Parameters
+        ----------
+        xyz_min : array-like
+            Lower corner of the box.
+        xyz_max : array-like
+            Upper corner of the box.
+
+        Returns
+        -------
+        ids : numpy.ndarray
+            IDs of the points with xyz_min <= point <= xyz_max.
+        """
+        xyz_min = np.asarray(xyz_min, dtype=np.float64)
+        xyz_max = np.asarray(xyz_max, dtype=np.float64)
+
+        # Candidates from the ball around the box, then exact test
+        center = (xyz_min + xyz_max) / 2
+        radius = np.linalg.norm(xyz_max - xyz_min) / 2
+        candidates = self.query_radius(center, radius)[0]
+        if len(candidates) == 0:
+            return candidates
+
+        coords = self.coords(candidates)
+        inside = np.all((coords >= xyz_min) & (coords <= xyz_max), axis=1)
+
+        return candidates[inside]
+
+    def query_pairs(self, radius):
+        """
+        All pairs of points with distance <= radius.
+
+        Parameters
+        ----------
+        radius : float
+            Maximum distance.
+
+        Returns
+        -------
+        pairs : numpy.ndarray
+            (K, 2) array of ID pairs, each pair reported once.
+        """
+        # All points are queried, so an up to date tree is always cheaper
+        self._ensure()
+        if self._outdated() > 0:
+            self.invalidate()
+            self._ensure()
+
+        rows = self._tree.query_pairs(radius, output_type="ndarray")
+
+        return self._ids[rows.reshape((-1, 2))].astype(np.int64)
+
+    def coords(self, ids):
+        """Coordinates of points by ID as (N, 3) array."""
+        self._ensure()
+        result = np.empty((len(ids), 3), dtype=np.float64)
+
+        for i, _id in enumerate(np.asarray(ids).tolist()):
+            point = self._pending.get(_id)
+            if point is None:
+                point = self._points[self._row_of[_id]]
+            result[i] = point
+
+        return result
+
+
+class SlabIndex:
+    """
+    A SlabIndex finds the points inside a slab between two planes perpendicular to an axis. The points are sorted by
+    their position along the axis once, so a slab is found by binary search, and moving the slab only touches the
+    points that enter or leave it.
+    """
+
+    def __init__(self, points, axis):
+        """
+        Parameters
+        ----------
+        points : array-like
+            (N, 3) array of coordinates.
+        axis : array-like
+            Normal of the slab planes.
+        """
+        axis = np.asarray(axis, dtype=np.float64)
+        self.axis = axis / np.linalg.norm(axis)
+        """Unit normal of the slab planes."""
+
+        depth = np.asarray(points, dtype=np.float64).reshape((-1, 3)) @ self.axis
+        self.order = np.argsort(depth, kind="stable")
+        """Indices of the points sorted by depth along the axis."""
+        self._depth = depth[self.order]
+
+        self._range = None
+        """Range of self.order inside the slab of the last call to move()."""
+
+    def __len__(self):
+        return len(self.order)
+
+    def query(self, minimum, maximum):
+        """Indices of the points with minimum <= depth <= maximum along the axis."""
+        start, stop = self._bounds(minimum, maximum)
+        return self.order[start:stop]
+
+    def move(self, minimum, maximum):
+        """
+        Move the slab, returning which points entered and left it since the last call. On the first call, all points
+        inside the slab have entered.
+
+        Returns
+        -------
+        entered : numpy.ndarray
+            Indices of the points that are now inside the slab.
+        left : numpy.ndarray
+            Indices of the points that are not inside the slab anymore.
+        """
+        new_start, new_stop = self._bounds(minimum, maximum)
+
+        if self._range is None:
+            old_start, old_stop = 0, 0
+        else:
+            old_start, old_stop = self._range
+        self._range = (new_start, new_stop)
+
+        # Parts of each range not covered by the other one
+        entered = np.concatenate(
+            (
+                self.order[new_start : min(new_stop, old_start)],
+                self.order[max(new_start, old_stop) : new_stop],
+            )
+        )
+        left = np.concatenate(
+            (
+                self.order[old_start : min(old_stop, new_start)],
+                self.order[max(old_start, new_stop) : old_stop],
+            )
+        )
+
+        return entered, left
+
+    def _bounds(self, minimum, maximum):
+        start = np.searchsorted(self._depth, minimum, side="left")
+        stop = np.searchsorted(self._depth, maximum, side="right")
+        return int(start), int(max(start, stop))
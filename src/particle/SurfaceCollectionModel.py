@@ -1,13 +1,13 @@
 # vim: set expandtab shiftwidth=4 softtabstop=4:
 
 # General
-from collections import OrderedDict
 import numpy as np
 
 # ChimeraX
 from chimerax.core.models import Model
-from chimerax.geometry import Place, Places, _geometry
+from chimerax.geometry import Place, Places
 from chimerax.graphics.drawing import Drawing, PickedTriangle
+from chimerax.core.triggerset import DEREGISTER
 
 # Triggers
 MODELS_MOVED = "models moved"
@@ -25,6 +25,7 @@ class SurfaceCollectionModel(Model):
     SESSION_ENDURING = False
     SESSION_SAVE = False
     DEBUG = False
+    MIN_CAPACITY = 64
 
     def __init__(self, name, session):
         super(SurfaceCollectionModel, self).__init__(name, session)
@@ -32,22 +33,38 @@ class SurfaceCollectionModel(Model):
         self.collections = {}
         """Maps the contained visualization drawings to names."""
 
-        self._gl_instances = OrderedDict()
-        """Map of ids to place instances."""
+        self._gl_instances = np.zeros((self.MIN_CAPACITY, 3, 4), dtype=np.float64)
+        """(capacity, 3, 4) array of instance matrices, the first len(self) rows are in use."""
+        self._gl_ids = []
+        """Ids of the instances, in row order."""
+        self._gl_rows = {}
+        """Map of ids to rows of _gl_instances."""
+        self._child_ids = None
+        """Cached array of the ids in _gl_ids, None if outdated."""
 
         self._selected_child_positions = None
         self._displayed_child_positions = None
         self._child_colors = None
 
+        self._lod = {}
+        """Maps collection names to the names of their level of detail collections, from fine to coarse."""
+        self._lod_thresholds = {}
+        """Maps collection names to the screen sizes (pixels) below which each level of detail is shown."""
+        self._lod_levels = {}
+        """Maps collection names to the level of detail of each position."""
+        self._lod_camera = None
+        """Camera state the levels of detail were computed for, None if outdated."""
+        self._lod_handler = None
+
         self.triggers.add_trigger(MODELS_MOVED)
         self.triggers.add_trigger(MODELS_SELECTED)
 
     def __contains__(self, item):
         """Checks if particle id present in collection."""
-        return item in self._gl_instances.keys()
+        return item in self._gl_rows
 
     def __len__(self):
-        return len(self._gl_instances)
+        return len(self._gl_ids)
 
     # ==============================================================================
     # Collection level actions =====================================================
@@ -67,6 +84,8 @@ class SurfaceCollectionModel(Model):
 
     def remove_collection(self, name):
         """Remove a collection of surfaces."""
+        self.clear_lod(name)
+
         if name in self.collections:
             self.remove_drawing(self.collections[name])
             self.collections.pop(name)
@@ -80,12 +99,10 @@ class SurfaceCollectionModel(Model):
             # TODO: Warning?
             return
 
-        from numpy import logical_and
+        for n in [name] + self._lod.get(name, []):
+            self.collections[n].active = show
 
-        self.collections[name].display_positions = logical_and(
-            self.displayed_child_positions, show
-        )
-        self.collections[name].active = show
+        self._update_display(name)
 
     def hide_collection(self, name):
         self.show_collection(name, show=False)
@@ -99,17 +116,206 @@ class SurfaceCollectionModel(Model):
             self.collections[name].vertex_colors = vertex_colors
             self.collections[name].color_locked = True
 
-    def _update_collections(self):
-        """Updates the graphics of all child SurfaceCollectionDrawings."""
+    def _update_collections(self, rows=None):
+        """
+        Updates the graphics of all child SurfaceCollectionDrawings.
+
+        Parameters
+        ----------
+        rows: numpy.ndarray or None
+            Indices of the positions that changed since the last update. None if all positions may have changed.
+        """
+        places = self.child_positions
         for name, col in self.collections.items():
-            col.update_graphics(self.child_positions)
+            col.update_graphics(places, rows)
+
+        if self._lod:
+            if rows is None:
+                # Number of positions may have changed
+                self._update_lod(force=True)
+            else:
+                self._lod_camera = None
+
+    def _update_display(self, name):
+        """Set the displayed positions of a collection and its level of detail collections."""
+        active = self.collections[name].active
+        displayed = self.displayed_child_positions
+        if displayed is None:
+            displayed = np.ones((len(self),), dtype=bool)
+
+        levels = self._lod_levels.get(name)
+        for idx, n in enumerate([name] + self._lod.get(name, [])):
+            if levels is None:
+                mask = displayed if idx == 0 else np.zeros_like(displayed)
+            else:
+                mask = np.logical_and(displayed, levels == idx)
+
+            self.collections[n].display_positions = np.logical_and(mask, active)
+
+    # ==============================================================================
+    # Level of detail ==============================================================
+    # ==============================================================================
+    def set_lod(self, name, levels, thresholds):
+        """
+        Set simplified surfaces that replace the surface of a collection at positions that appear small on screen.
+
+        Parameters
+        ----------
+        name : str
+            Name of the collection.
+        levels : list of tuple
+            (vertices, normals, triangles) of each simplified surface, from fine to coarse.
+        thresholds : list of float
+            Screen size (diameter in pixels) below which each level is shown, in decreasing order.
+        """
+        self.clear_lod(name)
+
+        if len(levels) == 0:
+            return
+
+        base = self.collections[name]
+        lod_names = []
+        for idx, (vertices, normals, triangles) in enumerate(levels):
+            lod_name = "{} lod {}".format(name, idx + 1)
+            col = self.add_collection(lod_name)
+            col.set_geometry(vertices, normals, triangles)
+            col.active = base.active
+            if base.colors is not None and len(base.colors) == len(self):
+                col.colors = base.colors
+            lod_names.append(lod_name)
+
+        self._lod[name] = lod_names
+        self._lod_thresholds[name] = np.asarray(thresholds, dtype=np.float64)
+
+        if self._lod_handler is None:
+            self._lod_handler = self.session.triggers.add_handler(
+                "new frame", self._lod_on_frame
+            )
+
+        self._update_lod(force=True)
+
+    def clear_lod(self, name):
+        """Remove the simplified surfaces of a collection."""
+        if name not in self._lod:
+            return
+
+        for lod_name in self._lod.pop(name):
+            self.remove_drawing(self.collections.pop(lod_name))
+        self._lod_thresholds.pop(name)
+        self._lod_levels.pop(name, None)
+
+        if not self._lod and self._lod_handler is not None:
+            self.session.triggers.remove_handler(self._lod_handler)
+            self._lod_handler = None
+
+        if name in self.collections:
+            self._update_display(name)
+
+    def _lod_on_frame(self, name, data):
+        if self.deleted or not self._lod:
+            self._lod_handler = None
+            return DEREGISTER
+
+        self._update_lod()
+
+    def _update_lod(self, force=False):
+        """
+        Choose the level of detail of each position from its size on screen. Only does work if the camera or the
+        positions changed since the last call.
+        """
+        from chimerax.graphics import OrthographicCamera
+
+        view = self.session.main_view
+        camera = view.camera
+        width = max(view.window_size[0], 1)
+        ortho = isinstance(camera, OrthographicCamera)
+        fov = camera.field_width if ortho else camera.field_of_view
+
+        state = (camera.position.matrix.tobytes(), width, ortho, fov)
+        if not force and state == self._lod_camera:
+            return
+        self._lod_camera = state
+
+        # Size of a pixel at the depth of each position
+        centers = self.child_scene_positions.array()[:, :, 3]
+        depth = (centers - camera.position.origin()) @ camera.view_direction()
+        if ortho:
+            pixel = np.full(depth.shape, fov / width)
+        else:
+            # Positions behind the camera get the coarsest level
+            pixel = 2 * depth * np.tan(np.radians(fov) / 2) / width
+            pixel[depth <= 0] = np.inf
+
+        for name, lod_names in self._lod.items():
+            bounds = self.collections[name].geometry_bounds()
+            diameter = 0 if bounds is None else 2 * bounds.radius()
+            with np.errstate(divide="ignore"):
+                size = diameter / pixel
+
+            # Number of thresholds above the size
+            thresholds = self._lod_thresholds[name]
+            levels = len(thresholds) - np.searchsorted(thresholds[::-1], size, side="right")
+
+            old = self._lod_levels.get(name)
+            if force or old is None or not np.array_equal(old, levels):
+                self._lod_levels[name] = levels
+                self._update_display(name)
 
     # ==============================================================================
     # Position level actions =======================================================
     # ==============================================================================
+    @staticmethod
+    def _as_matrices(places):
+        """Returns positions (Places, list of Place or (N, 3, 4) array) as (N, 3, 4) float64 array."""
+        if isinstance(places, Places):
+            return places.array()
+
+        if isinstance(places, np.ndarray) and places.dtype != object:
+            return places.reshape((-1, 3, 4))
+
+        arr = np.empty((len(places), 3, 4), dtype=np.float64)
+        for i, p in enumerate(places):
+            arr[i] = p.matrix
+
+        return arr
+
+    def _rows(self, place_ids):
+        """Rows of _gl_instances for an iterable of ids."""
+        rows = self._gl_rows
+        return np.fromiter((rows[pid] for pid in place_ids), dtype=np.int64)
+
+    def _append_places(self, place_ids, matrices):
+        """Append rows to the instance array, growing capacity as needed."""
+        n = len(self._gl_ids)
+        count = len(place_ids)
+        cap = self._gl_instances.shape[0]
+
+        if n + count > cap:
+            while cap < n + count:
+                cap *= 2
+            arr = np.zeros((cap, 3, 4), dtype=np.float64)
+            arr[:n] = self._gl_instances[:n]
+            self._gl_instances = arr
+
+        self._gl_instances[n : n + count] = matrices
+
+        for i, pid in enumerate(place_ids):
+            self._gl_rows[pid] = n + i
+        self._gl_ids.extend(place_ids)
+        self._child_ids = None
+
+    def _remove_rows(self, mask):
+        """Compact the instance array, keeping only rows where mask is True."""
+        n = len(self._gl_ids)
+        keep = mask.nonzero()[0]
+        self._gl_instances[: keep.shape[0]] = self._gl_instances[:n][keep]
+        self._gl_ids = [self._gl_ids[i] for i in keep]
+        self._gl_rows = {pid: i for i, pid in enumerate(self._gl_ids)}
+        self._child_ids = None
+
     def add_place(self, place_id, pos):
         """Add a new display position and update graphics."""
-        self._gl_instances[place_id] = pos
+        self._append_places([place_id], pos.matrix)
 
         from numpy import array, append
 
@@ -129,8 +335,7 @@ class SurfaceCollectionModel(Model):
 
     def add_places(self, place_ids, positions):
         """Add many positions, and do only one graphics update afterwards (for speed)."""
-        for pid, pos in zip(place_ids, positions):
-            self._gl_instances[pid] = pos
+        self._append_places(list(place_ids), self._as_matrices(positions))
 
         from numpy import ones, zeros, append
 
@@ -149,35 +354,35 @@ class SurfaceCollectionModel(Model):
 
     def get_place(self, place_id):
         """Get a specific position by id."""
-        return self._gl_instances[place_id]
+        return Place(matrix=self._gl_instances[self._gl_rows[place_id]].copy())
 
     def get_places(self, place_ids):
         """Get specific positions by id list."""
-        ret = []
-        for _id in place_ids:
-            ret.append(self._gl_instances[_id])
+        return [Place(matrix=m) for m in self.get_place_array(place_ids)]
 
-        return ret
+    def get_place_array(self, place_ids):
+        """Get specific positions by id list as (N, 3, 4) array (copy)."""
+        return self._gl_instances[self._rows(place_ids)]
 
     def set_place(self, place_id, place):
         """Set a specific position by id."""
-        self._gl_instances[place_id] = place
-        self._update_collections()
+        row = self._gl_rows[place_id]
+        self._gl_instances[row] = place.matrix
+        self._update_collections(np.array([row]))
 
     def set_places(self, place_ids, places):
         """Set multiple positions by id. Update graphics only once for speed."""
-        for pid, p in zip(place_ids, places):
-            self._gl_instances[pid] = p
+        rows = self._rows(place_ids)
+        self._gl_instances[rows] = self._as_matrices(places)
 
-        self._update_collections()
+        self._update_collections(rows)
 
     def delete_place(self, place_id):
         """Delete a specific position by id."""
-        from numpy import logical_not
-
-        mask = logical_not(self.child_ids == place_id)
+        mask = np.ones((len(self),), dtype=bool)
+        mask[self._gl_rows[place_id]] = False
 
-        self._gl_instances.pop(place_id)
+        self._remove_rows(mask)
 
         self._displayed_child_positions = self.displayed_child_positions[mask]
         self._selected_child_positions = self.selected_child_positions[mask]
@@ -186,49 +391,45 @@ class SurfaceCollectionModel(Model):
 
     def delete_places(self, place_ids):
         """Delete multiple positions by ids. Update graphics only once for speed."""
-        from numpy import zeros, logical_or, logical_not
+        if len(place_ids) == 0:
+            return
 
-        mask = zeros((len(self),), dtype=bool)
+        mask = np.ones((len(self),), dtype=bool)
+        mask[self._rows(place_ids)] = False
 
-        cids = self.child_ids
-        for pid in place_ids:
-            self._gl_instances.pop(pid)
-            mask = logical_or(pid == cids, mask)
+        self._remove_rows(mask)
 
-        mask = logical_not(mask)
         self._displayed_child_positions = self.displayed_child_positions[mask]
         self._selected_child_positions = self.selected_child_positions[mask]
 
         self._update_collections()
 
-    # def get_id(self, idx):
-    #     return list(self._gl_instances.keys())[idx]
-
     # ==============================================================================
     # Properties ===================================================================
     # ==============================================================================
 
     @property
     def child_ids(self):
-        from numpy import array, dtype
+        """Array of the ids of all positions, in the order of child_positions. Must not be modified."""
+        if self._child_ids is None:
+            self._child_ids = np.array(self._gl_ids)
 
-        return array(list(self._gl_instances.keys()), dtype=dtype("U"))
+        return self._child_ids
 
     @property
     def child_positions(self):
         """
-        Places object containing all positions rendered by the child SurfaceCollectionDrawings.
+        Places object containing all positions rendered by the child SurfaceCollectionDrawings. The returned Places
+        share memory with the instance array, so they reflect later in-place changes made with set_place(s).
 
         :getter: Returns this model's places (Places object)
         :setter: Sets this model's places (Places object)
         """
-        return Places([place for place in self._gl_instances.values()])
+        return Places(place_array=self._gl_instances[: len(self)])
 
     @child_positions.setter
     def child_positions(self, positions):
-        pl = positions.place_list()
-        for pid, p in zip(self._gl_instances.keys(), pl):
-            self._gl_instances[pid] = p
+        self._gl_instances[: len(self)] = self._as_matrices(positions)
 
         self._update_collections()
 
@@ -287,9 +488,10 @@ class SurfaceCollectionModel(Model):
 
         self._displayed_child_positions = copy(value)
 
-        for name, col in self.collections.items():
-            if col.active:
-                col.display_positions = copy(value)
+        lod_names = [n for names in self._lod.values() for n in names]
+        for name in self.collections.keys():
+            if name not in lod_names:
+                self._update_display(name)
 
     def scm_set_color(self, rgba):
         Drawing.set_color(self, rgba)
@@ -347,45 +549,31 @@ class SurfaceCollectionModel(Model):
         pm:
             Position mask of len(SurfaceCollectionModel.child_positions), True for objects to be transformed.
         """
-        # TODO: This all needs to be C++ for speed.
-        # This returns references to the actual place instances used for display
-        pos = self.child_positions
-        scene_pos = self.child_scene_positions
+        # Which places (so we don't have to iterate over all)
+        indices = pm.nonzero()[0]
 
         # Modified object ids
-        ids = self.child_ids[pm]
+        ids = self.child_ids[indices]
 
-        # Work matrix so we don't allocate for every multiplication
-        sp_new = np.zeros((3, 4), np.float64, order="C")
+        # Homogeneous matrices of position (P), scene position (S) and transform (T)
+        count = indices.shape[0]
+        P = np.zeros((count, 4, 4), np.float64)
+        P[:, :3, :] = self._gl_instances[indices]
+        P[:, 3, 3] = 1
 
-        # Which places (so we don't have to iterate over all)
-        indeces = pm.nonzero()[0]
-
-        # Invert scene position array at once (much faster)
-        spi = np.zeros((indeces.shape[0], 4, 4), np.float64, order="C")
-        spi[:, :3, :] = scene_pos.masked(pm).array()
-        spi[:, 3, 3] = 1
-        spi = np.linalg.inv(spi)
-        # Faster than individual place.inverse() or individual m34.invert_matrix()
-
-        for i, idx in enumerate(indeces):
-            # For speed do this:
-            _geometry.multiply_matrices(tf._matrix, scene_pos[idx]._matrix, sp_new)
-            # instead of this:
-            # sp_new = tf * sp   <-- This would generate another place instance with _reuse_place()
-
-            # For speed do this:
-            _geometry.multiply_matrices(np.squeeze(spi[i, :3, :]), sp_new, sp_new)
-            _geometry.multiply_matrices(
-                pos[idx]._matrix, sp_new, pos[idx]._matrix
-            )  # <-- This already changes the
-            #                                                                              correct place, no need for
-            #                                                                              assigning again.
-            # instead of:
-            # p = p * (sp_inv * sp_new) <---- would generate 2 more place instances with _reuse_place()
+        S = np.zeros((count, 4, 4), np.float64)
+        S[:, :3, :] = self.child_scene_positions.array()[indices]
+        S[:, 3, 3] = 1
+
+        T = np.eye(4, dtype=np.float64)
+        T[:3, :] = tf.matrix
+
+        # New position in parent coordinates: P * S^-1 * T * S
+        new = P @ np.linalg.inv(S) @ T @ S
+        self._gl_instances[indices] = new[:, :3, :]
 
         # Update collections with new places
-        self._update_collections()
+        self._update_collections(indices)
         self.triggers.activate_trigger(MODELS_MOVED, ids)
 
     def highlighted_instances(self):
@@ -398,7 +586,7 @@ class SurfaceCollectionModel(Model):
 
         from numpy import logical_or, zeros
 
-        hpos = zeros((len(self._gl_instances),), dtype=bool)
+        hpos = zeros((len(self),), dtype=bool)
         for name, col in self.collections.items():
             hpos = logical_or(hpos, col.highlighted_positions)
 
@@ -431,7 +619,7 @@ class SurfaceCollectionModel(Model):
 
         from numpy import logical_or, zeros
 
-        pm = zeros((len(self._gl_instances),), dtype=bool)
+        pm = zeros((len(self),), dtype=bool)
         for name, col in self.collections.items():
             pm = logical_or(pm, col.position_mask(highlighted_only))
 
@@ -458,6 +646,10 @@ class SurfaceCollectionModel(Model):
     positions = property(Drawing.positions.fget, _scm_set_positions)
 
     def delete(self):
+        if self._lod_handler is not None:
+            self.session.triggers.remove_handler(self._lod_handler)
+            self._lod_handler = None
+
         # Delete own triggers
         triggers = list(self.triggers.trigger_names())
         for t in triggers:
@@ -502,15 +694,50 @@ class SurfaceCollectionDrawing(Drawing):
         self.active = True
         self.clip_cap = False
 
+        self._instance_matrices = None
+        """Cached (N, 4, 4) float32 OpenGL instance matrices of the current positions."""
+        self._instance_places = None
+        """Places last set by update_graphics, used to check if the cache is still valid."""
+
     def has_surface(self):
         if self.vertices is None:
             return False
         else:
             return True
 
-    def update_graphics(self, places):
-        """Set updated positions and update graphics"""
-        self.positions = places
+    def update_graphics(self, places, rows=None):
+        """
+        Set updated positions and update graphics.
+
+        The OpenGL instance matrices are cached, so that if only some positions changed (rows), only those are
+        converted again before the instance buffer is refreshed.
+
+        Parameters
+        ----------
+        places: chimerax.geometry.Places
+            All positions of this drawing.
+        rows: numpy.ndarray or None
+            Indices of the positions that changed. None if all positions may have changed.
+        """
+        arr = places.array()
+        gl = self._instance_matrices
+
+        partial = (
+            rows is not None
+            and gl is not None
+            and gl.shape[0] == arr.shape[0]
+            and self._instance_places is self.positions
+        )
+
+        if partial:
+            if len(rows) > 0:
+                gl[rows] = _opengl_matrices(arr[rows])
+        else:
+            gl = _opengl_matrices(arr)
+
+        self._instance_matrices = gl
+        self._instance_places = Places(place_array=arr, opengl_array=gl)
+        self.positions = self._instance_places
 
     def highlighted_bounds(self):
         """Compute union bounds of highlighted positions (center of rotation)."""
@@ -705,6 +932,15 @@ def move_instances(tf, drawings, masks):
         d.move_children(tf, m)
 
 
+def _opengl_matrices(matrices):
+    """Converts (N, 3, 4) place matrices to (N, 4, 4) float32 OpenGL (column-major) matrices."""
+    gl = np.empty((matrices.shape[0], 4, 4), np.float32)
+    gl[:, :, :3] = matrices.transpose((0, 2, 1))
+    gl[:, :3, 3] = 0
+    gl[:, 3, 3] = 1
+    return gl
+
+
 def invert_place(place):
     from numpy import zeros
     from numpy.linalg import inv
@@ -1,4 +1,5 @@
 from .MarkerSetPlus import *
 from .ParticleList import ParticleList
+from .SpatialIndex import SpatialIndex, SlabIndex
 
 from .SurfaceCollectionModel import *
@@ -12,7 +12,9 @@ from chimerax.core.session import Session
 from ..volume import Tomogram
 
 
-def clip(session: Session, thickness: Union[float, str], model: Model = None, log: bool = True) -> None:
+def clip(
+    session: Session, thickness: Union[float, str], model: Model = None, cull: bool = None, log: bool = True
+) -> None:
     """
     Turn on/off slab-dependent clipping planes for a tomogram.
 
@@ -24,6 +26,8 @@ def clip(session: Session, thickness: Union[float, str], model: Model = None, lo
         Thickness of the visible slab in Angstrom. 'off' to turn off clipping. 'toggle' to toggle the clipping on/off.
     model : Optional[chimerax.core.models.Model]
         Tomogram model to clip. If None, the currently displayed tomogram will be used.
+    cull : Optional[bool]
+        Hide particles outside the slab instead of only clipping them. If None, the current setting is kept.
     log : bool
         Log the thickness change.
 
@@ -31,6 +35,9 @@ def clip(session: Session, thickness: Union[float, str], model: Model = None, lo
     # Get the ArtiaX session
     artia = session.ArtiaX
 
+    if cull is not None:
+        artia.cull_particles = cull
+
     _toggle = False
 
     # Turn off clipping
@@ -0,0 +1,96 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# General
+import numpy as np
+
+
+def dbscan(pairs, n, min_samples=5):
+    """
+    DBSCAN on a precomputed neighbour graph.
+
+    Parameters
+    ----------
+    pairs : numpy.ndarray
+        (K, 2) array of indices of all pairs of points that are neighbours, each pair once.
+    n : int
+        Number of points.
+    min_samples : int
+        Minimum number of points in the neighbourhood of a core point, including the point itself.
+
+    Returns
+    -------
+    labels : numpy.ndarray
+        Cluster label of each point, 1 for the largest cluster, 2 for the next and so on. 0 for noise.
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    labels = np.zeros((n,), dtype=np.int64)
+    if n == 0:
+        return labels
+
+    degree = np.bincount(pairs.ravel(), minlength=n)
+    core = degree + 1 >= min_samples
+
+    # Clusters are the connected components of the core points
+    core_pairs = pairs[core[pairs[:, 0]] & core[pairs[:, 1]]]
+    graph = coo_matrix(
+        (np.ones(len(core_pairs), dtype=np.int8), (core_pairs[:, 0], core_pairs[:, 1])),
+        shape=(n, n),
+    )
+    _, component = connected_components(graph, directed=False)
+
+    # Border points join the cluster of a core neighbour
+    border_pairs = pairs[core[pairs[:, 0]] != core[pairs[:, 1]]]
+    border_pairs = np.where(core[border_pairs[:, :1]], border_pairs[:, ::-1], border_pairs)
+    member = np.where(core, component, -1)
+    member[border_pairs[:, 0]] = component[border_pairs[:, 1]]
+
+    # Number clusters by size
+    clustered = member >= 0
+    if not clustered.any():
+        return labels
+
+    ids, inverse, counts = np.unique(member[clustered], return_inverse=True, return_counts=True)
+    rank = np.empty(len(ids), dtype=np.int64)
+    rank[np.argsort(-counts, kind="stable")] = np.arange(1, len(ids) + 1)
+    labels[clustered] = rank[inverse]
+
+    return labels
+
+
+def cluster_particles(partlist, eps, min_samples=5, max_angle=None):
+    """
+    Density based clustering (DBSCAN) of the particles of a list. Particles are neighbours if they are at most eps
+    apart, belong to the same tomogram and, if max_angle is given, their orientations differ by at most max_angle.
+
+    Parameters
+    ----------
+    partlist : ParticleList
+        The particle list.
+    eps : float
+        Neighbourhood radius in angstrom.
+    min_samples : int
+        Minimum number of particles in the neighbourhood of a core particle, including the particle itself.
+    max_angle : float
+        Maximum angle (in degrees) of the rotation between the orientations of neighbours.
+
+    Returns
+    -------
+    labels : numpy.ndarray
+        Cluster label of each particle in the order of ParticleList.particle_ids, 1 for the largest cluster, 0 for
+        noise.
+    """
+    pairs = partlist.spatial_index.query_pairs(eps)
+    rows = partlist.data.rows(pairs.ravel()).reshape((-1, 2))
+
+    tomo = partlist.get_tomogram_column()
+    if tomo is not None:
+        rows = rows[tomo[rows[:, 0]] == tomo[rows[:, 1]]]
+
+    if max_angle is not None and len(rows) > 0:
+        rot = partlist.data.get_all_transform_matrices()[:, :, :3]
+        trace = np.einsum("nji,nji->n", rot[rows[:, 0]], rot[rows[:, 1]])
+        rows = rows[(trace - 1) / 2 >= np.cos(np.radians(max_angle))]
+
+    return dbscan(rows, partlist.size, min_samples)
@@ -0,0 +1,161 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# General
+import numpy as np
+
+
+def decimate_surface(vertices, normals, triangles, cell_size):
+    """
+    Simplify a triangulated surface by vertex clustering. All vertices within a cubic cell of the grid with spacing
+    cell_size are merged into their mean, triangles that collapse are removed.
+
+    Parameters
+    ----------
+    vertices : numpy.ndarray
+        (N, 3) array of vertex coordinates.
+    normals : numpy.ndarray
+        (N, 3) array of vertex normals.
+    triangles : numpy.ndarray
+        (M, 3) array of vertex indices.
+    cell_size : float
+        Edge length of the grid cells.
+
+    Returns
+    -------
+    vertices, normals, triangles : numpy.ndarray
+        The simplified surface, as float32, float32 and int32 arrays.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    normals = np.asarray(normals, dtype=np.float64)
+    triangles = np.asarray(triangles)
+
+    if len(triangles) == 0 or cell_size <= 0:
+        return vertices.astype(np.float32), normals.astype(np.float32), triangles.astype(np.int32)
+
+    cells = np.floor((vertices - vertices.min(axis=0)) / cell_size).astype(np.int64)
+    shape = cells.max(axis=0) + 1
+    keys = (cells[:, 0] * shape[1] + cells[:, 1]) * shape[2] + cells[:, 2]
+    _, cluster, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    cluster = cluster.ravel()
+    n = len(counts)
+
+    # Mean position and normal of each cluster
+    v = np.empty((n, 3), dtype=np.float64)
+    nrm = np.empty((n, 3), dtype=np.float64)
+    for axis in range(3):
+        v[:, axis] = np.bincount(cluster, weights=vertices[:, axis], minlength=n)
+        nrm[:, axis] = np.bincount(cluster, weights=normals[:, axis], minlength=n)
+    v /= counts[:, np.newaxis]
+    length = np.linalg.norm(nrm, axis=1)
+    length[length == 0] = 1
+    nrm /= length[:, np.newaxis]
+
+    # Drop collapsed and duplicate triangles
+    t = cluster[triangles]
+    keep = (t[:, 0] != t[:, 1]) & (t[:, 1] != t[:, 2]) & (t[:, 0] != t[:, 2])
+    t = t[keep]
+    if len(t) > 0:
+        _, first = np.unique(np.sort(t, axis=1), axis=0, return_index=True)
+        t = t[np.sort(first)]
+
+    # Drop vertices that are not used anymore
+    used = np.zeros((n,), dtype=bool)
+    used[t.ravel()] = True
+    remap = np.cumsum(used) - 1
+
+    return v[used].astype(np.float32), nrm[used].astype(np.float32), remap[t].astype(np.int32)
+
+
+def box_surface(vertices):
+    """
+    Box enclosing a set of vertices, for use as an impostor of a surface.
+
+    Parameters
+    ----------
+    vertices : numpy.ndarray
+        (N, 3) array of vertex coordinates.
+
+    Returns
+    -------
+    vertices, normals, triangles : numpy.ndarray
+        Surface of the bounding box (12 triangles, separate vertices per face for flat shading).
+    """
+    lo = np.min(vertices, axis=0)
+    hi = np.max(vertices, axis=0)
+
+    corners = np.array(
+        [[x, y, z] for x in (lo[0], hi[0]) for y in (lo[1], hi[1]) for z in (lo[2], hi[2])],
+        dtype=np.float32,
+    )
+
+    # Corner indices of each face (counter clockwise from outside) and the face normal
+    faces = [
+        ((0, 1, 3, 2), (-1, 0, 0)),
+        ((4, 6, 7, 5), (1, 0, 0)),
+        ((0, 4, 5, 1), (0, -1, 0)),
+        ((2, 3, 7, 6), (0, 1, 0)),
+        ((0, 2, 6, 4), (0, 0, -1)),
+        ((1, 5, 7, 3), (0, 0, 1)),
+    ]
+
+    v = np.empty((24, 3), dtype=np.float32)
+    n = np.empty((24, 3), dtype=np.float32)
+    t = np.empty((12, 3), dtype=np.int32)
+    for idx, (quad, normal) in enumerate(faces):
+        v[4 * idx : 4 * idx + 4] = corners[list(quad)]
+        n[4 * idx : 4 * idx + 4] = normal
+        t[2 * idx] = (4 * idx, 4 * idx + 1, 4 * idx + 2)
+        t[2 * idx + 1] = (4 * idx, 4 * idx + 2, 4 * idx + 3)
+
+    return v, n, t
+
+
+def lod_surfaces(vertices, normals, triangles, sizes, impostor_size=0, pixel_error=2):
+    """
+    Simplified versions of a surface for display at decreasing screen sizes.
+
+    Parameters
+    ----------
+    vertices, normals, triangles : numpy.ndarray
+        The full resolution surface.
+    sizes : list of float
+        Screen sizes (diameter in pixels) below which the next simplified level is used, in decreasing order.
+    impostor_size : float
+        Screen size below which a bounding box is shown instead of the surface, 0 for no box.
+    pixel_error : float
+        Approximate allowed error of a level (in pixels) at the screen size it is used at.
+
+    Returns
+    -------
+    levels : list of tuple
+        (vertices, normals, triangles) of each simplified level.
+    thresholds : list of float
+        Screen size below which each level is used.
+    """
+    vertices = np.asarray(vertices)
+    if len(vertices) == 0:
+        return [], []
+
+    diameter = 2 * np.max(np.linalg.norm(vertices - vertices.mean(axis=0), axis=1))
+    sizes = sorted((s for s in sizes if s > impostor_size), reverse=True)
+
+    levels = []
+    thresholds = []
+    tri_count = len(triangles)
+    for size in sizes:
+        # At this screen size one pixel corresponds to diameter/size
+        level = decimate_surface(vertices, normals, triangles, pixel_error * diameter / size)
+
+        # Not worth an extra level
+        if len(level[2]) == 0 or len(level[2]) > 0.7 * tri_count:
+            continue
+
+        levels.append(level)
+        thresholds.append(size)
+        tri_count = len(level[2])
+
+    if impostor_size > 0:
+        levels.append(box_surface(vertices))
+        thresholds.append(impostor_size)
+
+    return levels, thresholds
@@ -0,0 +1,297 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# General
+from functools import lru_cache, reduce
+import operator
+import re
+
+import numpy as np
+
+# ChimeraX
+from chimerax.core.errors import UserError
+
+_TOKEN = re.compile(
+    r"""
+    \s*(?:
+        (?P<number>[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)
+      | (?P<string>"[^"]*"|'[^']*')
+      | (?P<op><=|>=|==|!=|<|>|=|&|\||~|\(|\)|,)
+      | (?P<name>[A-Za-z_][A-Za-z0-9_.]*)
+    )""",
+    re.VERBOSE,
+)
+
+_COMPARISONS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "=": operator.eq,
+    "!=": operator.ne,
+}
+
+_KEYWORDS = {"and": "&", "or": "|", "not": "~", "in": "in"}
+
+
+def _tokenize(expression):
+    """Split a filter expression into (kind, value) tuples."""
+    tokens = []
+    pos = 0
+    expression = expression.rstrip()
+
+    while pos < len(expression):
+        m = _TOKEN.match(expression, pos)
+        if m is None or m.end() == pos:
+            raise UserError(
+                'Filter expression "{}": unexpected character at position {}.'.format(
+                    expression, pos + 1
+                )
+            )
+        pos = m.end()
+
+        if m.group("number") is not None:
+            text = m.group("number")
+            try:
+                tokens.append(("literal", int(text)))
+            except ValueError:
+                tokens.append(("literal", float(text)))
+        elif m.group("string") is not None:
+            tokens.append(("literal", m.group("string")[1:-1]))
+        elif m.group("op") is not None:
+            tokens.append(("op", m.group("op")))
+        else:
+            name = m.group("name")
+            if name.lower() in _KEYWORDS:
+                tokens.append(("op", _KEYWORDS[name.lower()]))
+            else:
+                tokens.append(("name", name))
+
+    return tokens
+
+
+class _Parser:
+    """
+    Recursive descent parser for filter expressions. Each rule returns a function that takes a callable mapping
+    attribute names to columns and returns an array.
+
+    Grammar::
+
+        expression := term ( ('|' | 'or') term )*
+        term       := factor ( ('&' | 'and') factor )*
+        factor     := ('~' | 'not') factor | '(' expression ')' | comparison
+        comparison := operand ( 'in' '(' literal (',' literal)* ')' | ( cmp operand )* )
+        operand    := name | literal
+    """
+
+    def __init__(self, expression):
+        self.expression = expression
+        self.tokens = _tokenize(expression)
+        self.pos = 0
+        self.attributes = set()
+
+    def error(self, message):
+        raise UserError('Filter expression "{}": {}'.format(self.expression, message))
+
+    def peek(self):
+        if self.pos < len(self.tokens):
+            return self.tokens[self.pos]
+        return (None, None)
+
+    def take(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def expect(self, op):
+        kind, value = self.take()
+        if kind != "op" or value != op:
+            self.error('expected "{}".'.format(op))
+
+    def parse(self):
+        if len(self.tokens) == 0:
+            self.error("expression is empty.")
+
+        node = self.expression_rule()
+        if self.pos != len(self.tokens):
+            self.error('unexpected "{}".'.format(self.peek()[1]))
+
+        return node
+
+    def expression_rule(self):
+        nodes = [self.term_rule()]
+        while self.peek() == ("op", "|"):
+            self.take()
+            nodes.append(self.term_rule())
+
+        if len(nodes) == 1:
+            return nodes[0]
+
+        return lambda col: reduce(np.logical_or, [n(col) for n in nodes])
+
+    def term_rule(self):
+        nodes = [self.factor_rule()]
+        while self.peek() == ("op", "&"):
+            self.take()
+            nodes.append(self.factor_rule())
+
+        if len(nodes) == 1:
+            return nodes[0]
+
+        return lambda col: reduce(np.logical_and, [n(col) for n in nodes])
+
+    def factor_rule(self):
+        token = self.peek()
+
+        if token == ("op", "~"):
+            self.take()
+            node = self.factor_rule()
+            return lambda col: np.logical_not(node(col))
+
+        if token == ("op", "("):
+            self.take()
+            node = self.expression_rule()
+            self.expect(")")
+            return node
+
+        return self.comparison_rule()
+
+    def operand_rule(self):
+        kind, value = self.take()
+
+        if kind == "name":
+            self.attributes.add(value)
+            return lambda col: col(value)
+
+        if kind == "literal":
+            return lambda col: value
+
+        self.error("expected attribute name or value.")
+
+    def comparison_rule(self):
+        left = self.operand_rule()
+
+        # Set membership
+        if self.peek() == ("op", "in"):
+            self.take()
+            self.expect("(")
+            values = []
+            while True:
+                kind, value = self.take()
+                if kind != "literal":
+                    self.error('expected value in "in (...)".')
+                values.append(value)
+                if self.peek() == ("op", ","):
+                    self.take()
+                    continue
+                self.expect(")")
+                break
+
+            return lambda col: np.isin(left(col), values)
+
+        # Chained comparisons, e.g. 1 <= a < 5
+        pairs = []
+        while self.peek()[0] == "op" and self.peek()[1] in _COMPARISONS:
+            op = _COMPARISONS[self.take()[1]]
+            right = self.operand_rule()
+            pairs.append((op, left, right))
+            left = right
+
+        # Bare attribute
+        if len(pairs) == 0:
+            node = left
+            return lambda col: np.asarray(node(col)) != 0
+
+        # Masks are combined pairwise, comparisons of two values are scalars and broadcast
+        def compare(col):
+            masks = [op(np.asarray(a(col)), np.asarray(b(col))) for op, a, b in pairs]
+            return reduce(np.logical_and, masks)
+
+        return compare
+
+
+class ParticleFilter:
+    """
+    A compiled filter on particle attributes. Filters are evaluated on whole attribute columns at once and return a
+    boolean mask in the order of the particle list.
+
+    Expressions support comparisons (<, <=, >, >=, ==, !=, also chained like 1 <= a < 5), set membership
+    (a in (1, 2, 3)), boolean combinations (&, |, ~ or and, or, not) and parentheses. Strings are quoted.
+    """
+
+    def __init__(self, node, attributes, expression=None):
+        self._node = node
+        self.attributes = frozenset(attributes)
+        """Names of all attributes used by the filter."""
+        self.expression = expression
+        """The expression the filter was compiled from, None if built otherwise."""
+
+    @classmethod
+    def from_ranges(cls, attributes, minima, maxima):
+        """Filter selecting particles with mini <= attribute <= maxi for all attributes (all particles if empty)."""
+        ranges = list(zip(attributes, minima, maxima))
+
+        def node(col):
+            masks = [(mini <= col(a)) & (col(a) <= maxi) for a, mini, maxi in ranges]
+            return np.logical_and.reduce(masks)
+
+        return cls(node, attributes)
+
+    def evaluate(self, partlist):
+        """
+        Evaluate the filter on a particle list.
+
+        Parameters
+        ----------
+        partlist : ParticleList
+            The particle list.
+
+        Returns
+        -------
+        mask : numpy.ndarray
+            Boolean array, True for particles passing the filter, in the order of ParticleList.particle_ids.
+        """
+        size = partlist.size
+        known = set(partlist.get_all_attributes())
+        unknown = sorted(a for a in self.attributes if a not in known)
+
+        if len(unknown) > 0:
+            raise UserError(
+                "Attribute(s) {} unknown for particle list #{}.".format(
+                    ", ".join(unknown), partlist.id_string
+                )
+            )
+
+        if size == 0:
+            return np.zeros((0,), dtype=bool)
+
+        try:
+            mask = self._node(partlist.get_values_of_attribute)
+        except TypeError as e:
+            raise UserError(
+                'Filter expression "{}" cannot be evaluated: {}'.format(self.expression, e)
+            )
+
+        return np.broadcast_to(np.asarray(mask, dtype=bool), (size,)).copy()
+
+
+@lru_cache(maxsize=64)
+def compile_filter(expression):
+    """
+    Compile a filter expression, e.g. "rlnLogLikelihoodContribution > 3 & rlnClassNumber in (1,2)". Compiled
+    filters are cached by expression.
+
+    Parameters
+    ----------
+    expression : str
+        The filter expression.
+
+    Returns
+    -------
+    filter : ParticleFilter
+        The compiled filter.
+    """
+    parser = _Parser(expression)
+    node = parser.parse()
+
+    return ParticleFilter(node, parser.attributes, expression)
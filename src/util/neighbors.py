@@ -0,0 +1,130 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# General
+import numpy as np
+
+# This package
+from ..particle.SpatialIndex import SpatialIndex
+
+
+def tomogram_groups(partlist):
+    """Row indices of the particles of each tomogram of a particle list (one group if there is no tomogram info)."""
+    tomo = partlist.get_tomogram_column()
+
+    if tomo is None:
+        return [np.arange(partlist.size)]
+
+    try:
+        _, inverse = np.unique(tomo, return_inverse=True)
+    except TypeError:
+        # Mixed types
+        _, inverse = np.unique(np.asarray(tomo).astype(str), return_inverse=True)
+    order = np.argsort(inverse, kind="stable")
+
+    return np.split(order, np.cumsum(np.bincount(inverse))[:-1])
+
+
+def nearest_neighbors(coords, groups, k=1, max_distance=None):
+    """
+    The k nearest neighbours of all points among the points of the same group.
+
+    Parameters
+    ----------
+    coords : numpy.ndarray
+        (N, 3) array of coordinates.
+    groups : list of numpy.ndarray
+        Indices of the points of each group. Points only have neighbours in their own group.
+    k : int
+        Number of neighbours.
+    max_distance : float
+        Neighbours further away are ignored.
+
+    Returns
+    -------
+    distances : numpy.ndarray
+        (N, k) array of distances, sorted ascending. NaN where there is no neighbour.
+    neighbors : numpy.ndarray
+        (N, k) array of indices of the neighbours, -1 where there is no neighbour.
+    """
+    n = coords.shape[0]
+    distances = np.full((n, k), np.nan)
+    neighbors = np.full((n, k), -1, dtype=np.int64)
+
+    for rows in groups:
+        if len(rows) < 2:
+            continue
+
+        # Ask for one more to skip the point itself
+        index = SpatialIndex(points=coords[rows], ids=rows)
+        dist, ids = index.query_knn(coords[rows], k=k + 1)
+
+        # Move the point itself to the end, ties at distance 0 keep their order
+        is_self = ids == rows[:, np.newaxis]
+        is_self[~is_self.any(axis=1), -1] = True
+        order = np.argsort(is_self, axis=1, kind="stable")[:, :k]
+        dist = np.take_along_axis(dist, order, axis=1)
+        ids = np.take_along_axis(ids, order, axis=1)
+
+        missing = ids < 0
+        if max_distance is not None:
+            missing |= dist > max_distance
+        dist[missing] = np.nan
+        ids[missing] = -1
+
+        distances[rows] = dist
+        neighbors[rows] = ids
+
+    return distances, neighbors
+
+
+def neighbor_attributes(partlist, k=1, max_distance=None, prefix="nn"):
+    """
+    Nearest neighbour distances, neighbour positions in each particle's own frame and relative rotation angles of
+    the particles of a list. Neighbours are only searched within the same tomogram.
+
+    Parameters
+    ----------
+    partlist : ParticleList
+        The particle list.
+    k : int
+        Number of neighbours.
+    max_distance : float
+        Neighbours further away (in angstrom) are ignored.
+    prefix : str
+        Prefix of the attribute names.
+
+    Returns
+    -------
+    attributes : dict
+        Maps attribute names to arrays of values in the order of ParticleList.particle_ids: <prefix>_count is the
+        number of neighbours found, <prefix><j>_dist, <prefix><j>_x, _y, _z and _angle describe the j-th neighbour
+        and are 0 where a particle has no j-th neighbour.
+    """
+    matrices = partlist.data.get_all_transform_matrices()
+    coords = matrices[:, :, 3]
+    rot = matrices[:, :, :3]
+
+    distances, neighbors = nearest_neighbors(coords, tomogram_groups(partlist), k, max_distance)
+
+    attributes = {"{}_count".format(prefix): np.count_nonzero(neighbors >= 0, axis=1)}
+    for j in range(k):
+        found = neighbors[:, j] >= 0
+        nb = np.where(found, neighbors[:, j], np.arange(len(coords)))
+
+        # Neighbour position in the particle's frame: R^T (p_nb - p)
+        local = np.einsum("nji,nj->ni", rot, coords[nb] - coords)
+        local[~found] = 0
+
+        # Angle of the rotation between the particle and its neighbour
+        trace = np.einsum("nji,nji->n", rot, rot[nb])
+        angle = np.degrees(np.arccos(np.clip((trace - 1) / 2, -1, 1)))
+        angle[~found] = 0
+
+        name = "{}{}".format(prefix, j + 1)
+        attributes[name + "_dist"] = np.where(found, distances[:, j], 0)
+        attributes[name + "_x"] = local[:, 0]
+        attributes[name + "_y"] = local[:, 1]
+        attributes[name + "_z"] = local[:, 2]
+        attributes[name + "_angle"] = angle
+
+    return attributes
@@ -0,0 +1,57 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# General
+import os
+
+# ChimeraX
+from chimerax.core.errors import UserError
+
+
+class ReadProgress:
+    """
+    Reports the progress of reading a file in the status bar. In the GUI, a progress dialog with a cancel button is
+    shown if reading takes more than a moment. Cancelling raises a UserError from the next update, which aborts
+    reading.
+
+    Instances are called as progress(done, total) and must be closed when reading finished or failed.
+    """
+
+    def __init__(self, session, file_name):
+        self.session = session
+        self.name = os.path.basename(file_name)
+        self._percent = None
+        self._dialog = None
+
+        if session.ui.is_gui:
+            from Qt.QtCore import Qt
+            from Qt.QtWidgets import QProgressDialog
+
+            dialog = QProgressDialog("Reading {}".format(self.name), "Cancel", 0, 100, session.ui.main_window)
+            dialog.setWindowTitle("ArtiaX")
+            dialog.setWindowModality(Qt.WindowModality.WindowModal)
+            dialog.setMinimumDuration(1000)
+            dialog.setAutoClose(False)
+            dialog.setValue(0)
+            self._dialog = dialog
+
+    def __call__(self, done, total):
+        percent = min(int(100 * done / total), 100) if total > 0 else 100
+
+        if percent != self._percent:
+            self._percent = percent
+            self.session.logger.status("Reading {}: {}%".format(self.name, percent))
+
+        if self._dialog is not None:
+            # Processes events of the modal dialog, so the cancel button works
+            self._dialog.setValue(percent)
+
+            if self._dialog.wasCanceled():
+                raise UserError("Reading {} was cancelled.".format(self.name))
+
+    def close(self):
+        if self._dialog is not None:
+            self._dialog.close()
+            self._dialog.deleteLater()
+            self._dialog = None
+
+        self.session.logger.status("")
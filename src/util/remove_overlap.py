@@ -3,6 +3,8 @@ from chimerax.geometry import z_align
 import numpy as np
 import time
 
+from ..particle.SpatialIndex import SpatialIndex
+
 def remove_overlap(session, particles, pls, scms, bounds, method='distance', on_surface_particles=None, in_surface_particles=None, particles_to_keep_still=None, max_iterations=100, num_points=100, move_factor=1, rotate_to_normal=True):
     if method == 'distance':
         calculate_overlap = calculate_overlap_distance
@@ -110,16 +112,10 @@ def calculate_overlap_distance(particles, scms, bounds, particles_to_keep_still=
     from chimerax.geometry._geometry import find_close_points
 
     overlaps = {p: [] for p in particles}
-    for i, p in enumerate(particles[:-1]):
-        bounds_p = bounds[p]
-        xyz_min_p, xyz_max_p = np.array(bounds_p.xyz_min + p.coord), np.array(bounds_p.xyz_max + p.coord)
-        for j, other_p in enumerate(particles[i + 1:]):
-            bounds_other_p = bounds[other_p]
-            xyz_min_other_p, xyz_max_other_p = np.array(bounds_other_p.xyz_min + other_p.coord), np.array(
-                bounds_other_p.xyz_max + other_p.coord)
-            if (xyz_min_p <= xyz_max_other_p).all() and (xyz_max_p >= xyz_min_other_p).all():
-                overlaps[p].append(other_p)
-                overlaps[other_p].append(p)
+    for i, j in find_overlapping_pairs(particles, bounds):
+        p, other_p = particles[i], particles[j]
+        overlaps[p].append(other_p)
+        overlaps[other_p].append(p)
 
     movements = {p: np.array([0,0,0], dtype=np.float64) for p in particles}
     number_of_overlaps = {p: 0 for p in particles}
@@ -170,6 +166,30 @@ def calculate_overlap_distance(particles, scms, bounds, particles_to_keep_still=
     return movements
 
 
+def find_overlapping_pairs(particles, bounds):
+    # Returns the index pairs (i, j), i < j, of all particles whose bounding boxes overlap, sorted by i, then j.
+    # Candidates come from a spatial index: boxes can only overlap if the particle centers are closer than the sum of
+    # the distances from center to the farthest box corner.
+    if len(particles) < 2:
+        return np.zeros((0, 2), dtype=np.int64)
+
+    coords = np.array([p.coord for p in particles], dtype=np.float64)
+    xyz_min = np.array([bounds[p].xyz_min for p in particles], dtype=np.float64)
+    xyz_max = np.array([bounds[p].xyz_max for p in particles], dtype=np.float64)
+    reach = np.linalg.norm(np.maximum(np.abs(xyz_min), np.abs(xyz_max)), axis=1)
+
+    pairs = SpatialIndex(points=coords).query_pairs(2 * reach.max())
+    pairs.sort(axis=1)
+
+    # Exact box test on the candidates
+    xyz_min, xyz_max = xyz_min + coords, xyz_max + coords
+    i, j = pairs[:, 0], pairs[:, 1]
+    overlap = np.all(xyz_min[i] <= xyz_max[j], axis=1) & np.all(xyz_max[i] >= xyz_min[j], axis=1)
+    pairs = pairs[overlap]
+
+    return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+
 def find_depth_of_pts_from_plane(pts, middle, normal, calc_depth=True):
     # Returns distance from the plane to the point furthest away from the plane on the side the normal points to.
     # Could maybe be faster?
@@ -196,17 +216,12 @@ def calculate_overlap_point_volume(particles, scms, bounds, particles_to_keep_st
     # Figure out which particles overlap each other and create an ordered list with the particles to generate points for
     overlaps = {p: [] for p in particles}
     overlaps_list = [[] for i in range(len(particles))]
-    for i, p in enumerate(particles[:-1]):
-        bounds_p = bounds[p]
-        xyz_min_p, xyz_max_p = np.array(bounds_p.xyz_min + p.coord), np.array(bounds_p.xyz_max + p.coord)
-        for j, other_p in enumerate(particles[i+1:]):
-            bounds_other_p = bounds[other_p]
-            xyz_min_other_p, xyz_max_other_p = np.array(bounds_other_p.xyz_min + other_p.coord), np.array(bounds_other_p.xyz_max + other_p.coord)
-            if (xyz_min_p <= xyz_max_other_p).all() and (xyz_max_p >= xyz_min_other_p).all():
-                overlaps[p].append(other_p)
-                overlaps[other_p].append(p)
-                overlaps_list[i].append(other_p)
-                overlaps_list[j].append(p)
+    for i, j in find_overlapping_pairs(particles, bounds):
+        p, other_p = particles[i], particles[j]
+        overlaps[p].append(other_p)
+        overlaps[other_p].append(p)
+        overlaps_list[i].append(other_p)
+        overlaps_list[j].append(p)
 
     ordered_particles = []
     while len(max(overlaps_list, key=len)):
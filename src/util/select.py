@@ -8,47 +8,37 @@ from chimerax.core.commands import run
 
 
 def selection_cmd(session, list_id, attributes, minima, maxima):
-    markerset = session.ArtiaX.partlists.get(list_id).markers
-    markers = markerset.get_all_markers()
+    partlist = session.ArtiaX.partlists.get(list_id)
 
     # Attributes not empty, select
     if len(attributes) > 0:
-        # Mask for fast execution
-        mask = np.full((len(markers),), True)
-        # mask[0] = False
+        from .filter import ParticleFilter
 
-        # Build mask
-        for idx, m in enumerate(markers):
-            for a, mini, maxi in zip(attributes, minima, maxima):
-                mask[idx] = mask[idx] and (mini <= getattr(m, a) <= maxi)
-
-        markerset.atoms.selecteds = mask
+        # Evaluated on the attribute columns at once
+        mask = ParticleFilter.from_ranges(attributes, minima, maxima).evaluate(partlist)
+        partlist.selected_particles = mask
 
     # Nothing to select, just clear selection
     else:
-        mask = np.full((len(markers),), False)
-        markerset.atoms.selecteds = mask
+        mask = np.full((partlist.size,), False)
+        partlist.selected_particles = mask
 
 
 def display_cmd(session, list_id, attributes, minima, maxima):
-    markerset = session.ArtiaX.partlists.get(list_id).markers
-    markers = markerset.get_all_markers()
+    partlist = session.ArtiaX.partlists.get(list_id)
 
     # Attributes not empty, select
     if len(attributes) > 0:
-        # Mask for fast execution
-        mask = np.full((len(markers),), True)
-
-        for idx, m in enumerate(markers):
-            for a, mini, maxi in zip(attributes, minima, maxima):
-                mask[idx] = mask[idx] and (mini <= getattr(m, a) <= maxi)
+        from .filter import ParticleFilter
 
-        markerset.atoms.displays = mask
+        # Evaluated on the attribute columns at once
+        mask = ParticleFilter.from_ranges(attributes, minima, maxima).evaluate(partlist)
+        partlist.displayed_particles = mask
 
     # Nothing to select, just show all
     else:
-        mask = np.full((len(markers),), True)
-        markerset.atoms.displays = mask
+        mask = np.full((partlist.size,), True)
+        partlist.displayed_particles = mask
 
 
 def color_cmd(session, list_id, color, log=False):
@@ -71,16 +61,24 @@ def color_cmd(session, list_id, color, log=False):
 
 
 def colormap_cmd(session, list_id, palette, attribute, minimum, maximum, transparency=100, log=False):
-    markers = session.ArtiaX.partlists.get(list_id).markers
-    _id = markers.id_string
-
-    run(session,
-        'color byattribute a:{} #{} palette {} range {},{} transparency {}'.format(attribute,
-                                                                                   markers.id_string,
-                                                                                   palette,
-                                                                                   minimum,
-                                                                                   maximum,
-                                                                                   transparency), log=False)
+    partlist = session.ArtiaX.partlists.get(list_id)
+    markers = partlist.markers
+
+    if partlist.lazy_markers:
+        # Not every particle has a marker, color from the attribute column instead
+        cmap = session.user_colormaps[palette].rescale_range(minimum, maximum)
+        colors = cmap.interpolated_rgba8(partlist.get_values_of_attribute(attribute))
+        colors[:, 3] = round(255 * (100 - transparency) / 100)
+        partlist.colors = colors
+    else:
+        partlist.sync_marker_attributes()
+        run(session,
+            'color byattribute a:{} #{} palette {} range {},{} transparency {}'.format(attribute,
+                                                                                       markers.id_string,
+                                                                                       palette,
+                                                                                       minimum,
+                                                                                       maximum,
+                                                                                       transparency), log=False)
 
     if log:
         from chimerax.core.commands import log_equivalent_command
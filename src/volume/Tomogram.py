@@ -590,6 +590,9 @@ class Tomogram(VolumePlus):
             self._set_clipping()
         self._is_clipped = value
 
+        if not value:
+            self.session.ArtiaX.update_particle_culling()
+
     def update_clip(self, name=None, value=None):
         self._set_clipping()
 
@@ -620,6 +623,9 @@ class Tomogram(VolumePlus):
             log=False,
         )
 
+        # Particles outside the slab
+        artia.update_particle_culling()
+
     def _get_min_offset(self):
         corners = self.corners()
 
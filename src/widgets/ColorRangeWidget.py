@@ -27,6 +27,7 @@ from Qt.QtWidgets import (
 # This package
 from .IgnorantComboBox import IgnorantComboBox
 from .GradientRangeSlider import GradientRangeSlider
+from .HistogramWidget import HistogramWidget
 from .LabelEditSlider import LabelEditSlider
 
 class ColorRangeWidget(QWidget):
@@ -145,6 +146,9 @@ class ColorRangeWidget(QWidget):
         _slider_min_max_layout.addWidget(self.min_label, alignment=Qt.AlignmentFlag.AlignLeft)
         _slider_min_max_layout.addWidget(self.max_label, alignment=Qt.AlignmentFlag.AlignRight)
 
+        # Histogram of the current attribute
+        self.histogram = HistogramWidget()
+
         # Slider Line 2
         self.slider = GradientRangeSlider()
         self.slider._singleStep = 0.001
@@ -165,6 +169,7 @@ class ColorRangeWidget(QWidget):
 
         # Assemble slider
         _slider_layout.addLayout(_slider_min_max_layout)
+        _slider_layout.addWidget(self.histogram)
         _slider_layout.addWidget(self.slider)
         _slider_layout.addLayout(_slider_edit_layout)
 
@@ -312,6 +317,8 @@ class ColorRangeWidget(QWidget):
         else:
             self._set_min_max()
 
+        self._update_histogram()
+
         # Color changed signal
         # self._color_changed()
 
@@ -428,8 +435,20 @@ class ColorRangeWidget(QWidget):
         self._att_idx = idx
         self._enable_widgets()
         self._set_min_max()
+        self._update_histogram()
         self._color_changed(released=True)
 
+    def _update_histogram(self):
+        """Show the cached histogram of the current attribute."""
+        if self.partlist is None or len(self.attributes) == 0:
+            self.histogram.set_histogram(None, None)
+            return
+
+        name = self.attribute_box.currentText()
+        counts, edges = self.partlist.get_attribute_histogram(name)
+        self.histogram.set_histogram(counts, edges, partial(self.partlist.count_attribute_range, name))
+        self.histogram.set_range(*self.slider.value())
+
     def _enable_widgets(self):
         if self.constant:
             self.slider.setEnabled(False)
@@ -476,6 +495,7 @@ class ColorRangeWidget(QWidget):
         self.lower_edit.blockSignals(prev)
         self.upper_edit.blockSignals(prev1)
 
+        self.histogram.set_range(value[0], value[1])
         self._color_changed(released)
 
     def _transparency_changed(self, value, released=False):
@@ -503,6 +523,7 @@ class ColorRangeWidget(QWidget):
         self.slider.setValue((lower, upper))
         self.slider.blockSignals(prev)
 
+        self.histogram.set_range(lower, upper)
         self._color_changed(released=True)
 
     def _get_selection(self):
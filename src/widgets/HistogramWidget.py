@@ -0,0 +1,125 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+
+# General
+import numpy as np
+
+# Qt
+from Qt.QtCore import Qt, QRectF
+from Qt.QtGui import QColor, QPainter
+from Qt.QtWidgets import QWidget, QSizePolicy
+
+
+class HistogramWidget(QWidget):
+    """
+    Widget drawing a histogram of attribute values, meant to be placed directly above a range slider. Bars inside the
+    current range are highlighted and the number of values inside the range is shown, so thresholds can be chosen
+    without applying them.
+    """
+
+    IN_RANGE = QColor(80, 140, 220)
+    OUT_OF_RANGE = QColor(190, 190, 190)
+
+    def __init__(self, parent=None, height=40):
+        super().__init__(parent=parent)
+
+        self._counts = None
+        """Histogram counts, None if there is nothing to show."""
+        self._edges = None
+        """The len(counts)+1 bin edges."""
+        self._range = None
+        """Currently selected (minimum, maximum)."""
+        self._count_function = None
+        """Callable (minimum, maximum) -> number of values in range. Estimated from the histogram if None."""
+        self._in_range = None
+
+        self.setMinimumHeight(height)
+        self.setMaximumHeight(height)
+        self.setSizePolicy(QSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed))
+
+    def set_histogram(self, counts, edges, count_function=None):
+        """
+        Set the histogram to draw.
+
+        Parameters
+        ----------
+        counts : numpy.ndarray
+            Number of values per bin, None to clear.
+        edges : numpy.ndarray
+            The bin edges.
+        count_function : callable
+            Function (minimum, maximum) -> number of values in range, used for the displayed count.
+        """
+        self._counts = None if counts is None else np.asarray(counts)
+        self._edges = None if edges is None else np.asarray(edges, dtype=np.float64)
+        self._count_function = count_function
+        self._in_range = None
+
+        if self._counts is not None and self._range is None:
+            self._range = (self._edges[0], self._edges[-1])
+
+        self.update()
+
+    def set_range(self, minimum, maximum):
+        """Set the currently selected range."""
+        self._range = (minimum, maximum)
+        self._in_range = None
+        self.update()
+
+    @property
+    def total(self):
+        """Number of values in the histogram."""
+        if self._counts is None:
+            return 0
+
+        return int(self._counts.sum())
+
+    @property
+    def count_in_range(self):
+        """Number of values in the current range."""
+        if self._counts is None:
+            return 0
+
+        if self._in_range is None:
+            lo, hi = self._range
+            if self._count_function is not None:
+                self._in_range = self._count_function(lo, hi)
+            else:
+                centers = (self._edges[:-1] + self._edges[1:]) / 2
+                self._in_range = int(self._counts[(centers >= lo) & (centers <= hi)].sum())
+
+        return self._in_range
+
+    def paintEvent(self, event):
+        if self._counts is None or len(self._counts) == 0:
+            return
+
+        painter = QPainter(self)
+        painter.setPen(Qt.PenStyle.NoPen)
+
+        width = self.width()
+        height = self.height()
+        text_height = self.fontMetrics().height()
+        bar_height = max(height - text_height, 1)
+
+        # Log scale, so sparse tails stay visible
+        heights = np.log1p(self._counts)
+        top = heights.max()
+        if top > 0:
+            heights = heights / top * bar_height
+
+        lo, hi = self._range
+        bar_width = width / len(self._counts)
+        for idx, h in enumerate(heights):
+            if h <= 0:
+                continue
+            inside = self._edges[idx + 1] >= lo and self._edges[idx] <= hi
+            painter.setBrush(self.IN_RANGE if inside else self.OUT_OF_RANGE)
+            painter.drawRect(QRectF(idx * bar_width, height - h, bar_width, h))
+
+        painter.setPen(self.palette().color(self.foregroundRole()))
+        painter.drawText(
+            QRectF(0, 0, width, text_height),
+            Qt.AlignmentFlag.AlignRight,
+            "{} / {}".format(self.count_in_range, self.total),
+        )
+        painter.end()
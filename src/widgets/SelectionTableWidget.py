@@ -226,7 +226,8 @@ class SelectionTableWidget(QWidget):
                                 self.attribute_constant,
                                 idx=idx,
                                 mini=mini,
-                                maxi=maxi)
+                                maxi=maxi,
+                                partlist=self.partlist)
 
         self._selectors.append(widget)
         self.selectors_vbox.addWidget(widget, alignment=Qt.AlignmentFlag.AlignTop)
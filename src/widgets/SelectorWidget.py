@@ -21,6 +21,7 @@ from Qt.QtWidgets import (
 
 # This package
 from .IgnorantComboBox import IgnorantComboBox
+from .HistogramWidget import HistogramWidget
 
 
 class SelectorWidget(QWidget):
@@ -29,9 +30,13 @@ class SelectorWidget(QWidget):
     selectionChanged = Signal()
     deleted = Signal(object)
 
-    def __init__(self, attributes, minima, maxima, constant, idx=0, mini=None, maxi=None, parent=None):
+    def __init__(self, attributes, minima, maxima, constant, idx=0, mini=None, maxi=None, partlist=None, parent=None):
         super().__init__(parent=parent)
 
+        self.partlist = partlist
+        """ParticleList the attributes belong to, used for the histogram."""
+        self._slider_down = False
+        """Whether the slider is being dragged, selection is only applied on release."""
         self.attributes = attributes
         self.minima = minima
         self.maxima = maxima
@@ -87,6 +92,9 @@ class SelectorWidget(QWidget):
         self._slider_min_max_layout.addWidget(self.min_label, alignment=Qt.AlignmentFlag.AlignLeft)
         self._slider_min_max_layout.addWidget(self.max_label, alignment=Qt.AlignmentFlag.AlignRight)
 
+        # Histogram of the current attribute
+        self.histogram = HistogramWidget()
+
         # Slider Line 2
         self.slider = QDoubleRangeSlider()
         self.slider._singleStep = 0.001
@@ -117,6 +125,7 @@ class SelectorWidget(QWidget):
             self.upper_edit.setEnabled(False)
 
         self._slider_layout.addLayout(self._slider_min_max_layout)
+        self._slider_layout.addWidget(self.histogram)
         self._slider_layout.addWidget(self.slider)
         self._slider_layout.addLayout(self._slider_edit_layout)
 
@@ -139,6 +148,7 @@ class SelectorWidget(QWidget):
         self._layout.setSizeConstraint(QLayout.SetMinimumSize)
 
         self._connect()
+        self._update_histogram()
 
         self.setLayout(self._layout)
         self.setSizePolicy(QSizePolicy(QSizePolicy.Minimum,
@@ -161,6 +171,8 @@ class SelectorWidget(QWidget):
 
         # Slider
         self.slider.valueChanged.connect(partial(self._slider_changed))
+        self.slider.sliderPressed.connect(partial(self._slider_pressed))
+        self.slider.sliderReleased.connect(partial(self._slider_released))
 
         # Edits
         self.lower_edit.editingFinished.connect(partial(self._edit_changed))
@@ -207,8 +219,20 @@ class SelectorWidget(QWidget):
         self._idx = idx
         self._enable_widgets()
         self._set_min_max()
+        self._update_histogram()
         self._emit_selection_changed()
 
+    def _update_histogram(self):
+        """Show the cached histogram of the current attribute."""
+        if self.partlist is None:
+            self.histogram.hide()
+            return
+
+        name = self.attribute_box.currentText()
+        counts, edges = self.partlist.get_attribute_histogram(name)
+        self.histogram.set_histogram(counts, edges, partial(self.partlist.count_attribute_range, name))
+        self.histogram.set_range(*self.get_selection()[1:])
+
     def _enable_widgets(self):
         if self.active:
             for w in self._to_enable:
@@ -257,6 +281,17 @@ class SelectorWidget(QWidget):
         self.lower_edit.blockSignals(prev)
         self.upper_edit.blockSignals(prev1)
 
+        self.histogram.set_range(value[0], value[1])
+
+        # While dragging only the histogram is updated, the selection is applied on release
+        if not self._slider_down:
+            self._emit_selection_changed()
+
+    def _slider_pressed(self):
+        self._slider_down = True
+
+    def _slider_released(self):
+        self._slider_down = False
         self._emit_selection_changed()
 
     def _edit_changed(self):
@@ -278,6 +313,7 @@ class SelectorWidget(QWidget):
         prev = self.slider.blockSignals(True)
         self.slider.setValue((lower, upper))
         self.slider.blockSignals(prev)
+        self.histogram.set_range(lower, upper)
         self._emit_selection_changed()
 
     def _emit_selection_changed(self):
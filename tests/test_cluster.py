@@ -0,0 +1,124 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+"""
+Checks density based clustering against brute force.
+
+Run with the Python of a ChimeraX installation that has ArtiaX installed:
+
+    chimerax -m pytest tests/test_cluster.py
+"""
+
+# General
+import numpy as np
+
+# This package
+from chimerax.artiax.particle.SpatialIndex import SpatialIndex
+from chimerax.artiax.util.cluster import cluster_particles, dbscan
+
+
+class _Data:
+    def __init__(self, ids, matrices):
+        self.ids = ids
+        self.matrices = matrices
+
+    def rows(self, ids):
+        return np.searchsorted(self.ids, ids)
+
+    def get_all_transform_matrices(self):
+        return self.matrices
+
+
+class _List:
+    """Stand-in for ParticleList with identity rotations, particle ids 1..N."""
+
+    def __init__(self, coords, tomo=None):
+        n = len(coords)
+        matrices = np.zeros((n, 3, 4))
+        matrices[:, :, :3] = np.eye(3)
+        matrices[:, :, 3] = coords
+
+        self.size = n
+        self.particle_ids = np.arange(1, n + 1)
+        self.data = _Data(self.particle_ids, matrices)
+        self.spatial_index = SpatialIndex(points=coords, ids=self.particle_ids)
+        self._tomo = tomo
+
+    def get_tomogram_column(self):
+        return self._tomo
+
+
+def _brute_force_core(coords, eps, min_samples):
+    d = np.linalg.norm(coords[:, np.newaxis, :] - coords[np.newaxis, :, :], axis=2)
+    near = d <= eps
+    return near, near.sum(axis=1) >= min_samples
+
+
+def _check_dbscan(coords, eps, min_samples):
+    near, core = _brute_force_core(coords, eps, min_samples)
+    i, j = np.nonzero(np.triu(near, k=1))
+    labels = dbscan(np.stack((i, j), axis=1), len(coords), min_samples)
+
+    # Core points within eps share a cluster, core points are never noise
+    assert np.all(labels[core] > 0)
+    ci, cj = np.nonzero(near & core[:, np.newaxis] & core[np.newaxis, :])
+    assert np.array_equal(labels[ci], labels[cj])
+
+    # Border points join the cluster of one of their core neighbours, the others are noise
+    for idx in np.nonzero(~core)[0].tolist():
+        core_neighbours = np.nonzero(near[idx] & core)[0]
+        if len(core_neighbours) == 0:
+            assert labels[idx] == 0
+        else:
+            assert labels[idx] in labels[core_neighbours]
+
+    # Clusters numbered 1, 2, ... by decreasing size
+    sizes = np.bincount(labels)[1:]
+    assert np.all(sizes > 0)
+    assert np.all(np.diff(sizes) <= 0)
+
+    return labels
+
+
+def test_dbscan():
+    rng = np.random.default_rng(3)
+
+    # Blobs of different size plus uniform noise
+    coords = np.concatenate(
+        [
+            rng.normal((10, 10, 10), 1.5, (80, 3)),
+            rng.normal((50, 50, 50), 1.5, (40, 3)),
+            rng.normal((80, 20, 60), 1.5, (20, 3)),
+            rng.uniform(0, 100, (60, 3)),
+        ]
+    )
+
+    for eps, min_samples in [(2.0, 5), (3.0, 10), (1.0, 3), (50.0, 2)]:
+        _check_dbscan(coords, eps, min_samples)
+
+    labels = _check_dbscan(coords, 2.5, 5)
+    assert np.bincount(labels[:80]).argmax() == 1
+    assert np.bincount(labels[80:120]).argmax() == 2
+    assert np.bincount(labels[120:140]).argmax() == 3
+
+
+def test_dbscan_labels():
+    # With min_samples 4: core 0 and 4, border 1, 3, 5 and 6, noise 2, 7 and 8
+    pairs = np.array([[0, 1], [0, 3], [0, 4], [4, 5], [4, 6], [7, 8]])
+
+    assert dbscan(pairs, 9, min_samples=4).tolist() == [1, 1, 0, 1, 1, 1, 1, 0, 0]
+    assert dbscan(pairs, 9, min_samples=2).tolist() == [1, 1, 0, 1, 1, 1, 1, 2, 2]
+    assert dbscan(pairs, 9, min_samples=5).tolist() == [0] * 9
+    assert dbscan(np.zeros((0, 2), dtype=np.int64), 0).tolist() == []
+
+
+def test_cluster_particles_per_tomogram():
+    # Two tight groups at the same place, in different tomograms
+    rng = np.random.default_rng(4)
+    coords = rng.normal(0, 0.5, (20, 3))
+    tomo = np.array([1] * 10 + [2] * 10)
+
+    together = cluster_particles(_List(coords), eps=5, min_samples=3)
+    apart = cluster_particles(_List(coords, tomo=tomo), eps=5, min_samples=3)
+
+    assert set(together.tolist()) == {1}
+    assert set(apart[:10].tolist()) != set(apart[10:].tolist())
+    assert set(apart.tolist()) == {1, 2}
@@ -0,0 +1,80 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+"""
+Checks the greedy selection of the duplicates to delete by score.
+
+Run with the Python of a ChimeraX installation that has ArtiaX installed:
+
+    chimerax -m pytest tests/test_delete_duplicates.py
+"""
+
+# General
+import numpy as np
+
+# This package
+from chimerax.artiax.particle.ParticleList import _suppress_duplicates
+
+
+def _greedy(pairs, scores):
+    """Reference: visit particles with duplicates by descending score, NaN last, ties in index order."""
+    neighbours = {}
+    for i, j in pairs.tolist():
+        neighbours.setdefault(i, set()).add(j)
+        neighbours.setdefault(j, set()).add(i)
+
+    def key(idx):
+        return (np.isnan(scores[idx]), -scores[idx] if not np.isnan(scores[idx]) else 0, idx)
+
+    kept = set()
+    delete = np.zeros(len(scores), dtype=bool)
+    for idx in sorted(neighbours, key=key):
+        if neighbours[idx] & kept:
+            delete[idx] = True
+        else:
+            kept.add(idx)
+
+    return delete
+
+
+def test_no_pairs():
+    assert not _suppress_duplicates(np.zeros((0, 2), dtype=np.int64), np.ones(4)).any()
+
+
+def test_highest_score_kept():
+    # Chain 0 - 1 - 2, the middle one is best
+    pairs = np.array([[0, 1], [1, 2]])
+
+    assert _suppress_duplicates(pairs, np.array([1.0, 3.0, 2.0])).tolist() == [True, False, True]
+
+
+def test_greedy_not_pairwise():
+    # Chain 0 - 1 - 2 with descending scores: 1 is deleted for 0, so 2 has no kept duplicate
+    pairs = np.array([[0, 1], [1, 2]])
+
+    assert _suppress_duplicates(pairs, np.array([3.0, 2.0, 1.0])).tolist() == [False, True, False]
+
+
+def test_nan_sorted_last():
+    pairs = np.array([[0, 1], [2, 3]])
+    scores = np.array([np.nan, -5.0, np.nan, np.nan])
+
+    # NaN loses against any number, of two NaN the first is kept
+    assert _suppress_duplicates(pairs, scores).tolist() == [True, False, False, True]
+
+
+def test_ties_keep_first():
+    pairs = np.array([[0, 1]])
+
+    assert _suppress_duplicates(pairs, np.array([1.0, 1.0])).tolist() == [False, True]
+
+
+def test_same_as_reference():
+    rng = np.random.default_rng(0)
+
+    for _ in range(50):
+        n = 60
+        pairs = rng.integers(0, n, (80, 2))
+        pairs = np.unique(np.sort(pairs[pairs[:, 0] != pairs[:, 1]], axis=1), axis=0)
+        scores = rng.integers(0, 10, n).astype(np.float64)
+        scores[rng.random(n) < 0.1] = np.nan
+
+        assert np.array_equal(_suppress_duplicates(pairs, scores), _greedy(pairs, scores))
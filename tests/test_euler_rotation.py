@@ -0,0 +1,133 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+"""
+Checks that the vectorized Euler angle conversions (EulerRotation.rot{1,2,3}_from_matrices) return exactly the same
+values as the per-matrix versions (EulerRotation.rot{1,2,3}_from_matrix) for every particle list format.
+
+The particle list modules import ChimeraX, so run this with the Python of a ChimeraX installation that has ArtiaX
+installed, either through pytest or as a script:
+
+    chimerax -m pytest tests/test_euler_rotation.py
+    chimerax --nogui --exit --script tests/test_euler_rotation.py
+"""
+
+# General
+import numpy as np
+
+# This package
+from chimerax.artiax.io.Artiatomi.ArtiatomiParticleData import ArtiatomiEulerRotation
+from chimerax.artiax.io.Coords.CoordsParticleData import GenericEulerRotation as CoordsEulerRotation
+from chimerax.artiax.io.Copick.CopickParticleData import CopickEulerRotation
+from chimerax.artiax.io.CryoETDataPortal.CDPParticleData import CDPEulerRotation
+from chimerax.artiax.io.Dynamo.DynamoParticleData import DynamoEulerRotation
+from chimerax.artiax.io.Generic.GenericParticleData import GenericEulerRotation
+from chimerax.artiax.io.PEET.PEETParticleData import GenericEulerRotation as PEETEulerRotation
+from chimerax.artiax.io.RELION.RELIONParticleData import RELIONEulerRotation
+
+ROTATIONS = [
+    ArtiatomiEulerRotation,
+    CDPEulerRotation,
+    CoordsEulerRotation,
+    CopickEulerRotation,
+    DynamoEulerRotation,
+    GenericEulerRotation,
+    PEETEulerRotation,
+    RELIONEulerRotation,
+]
+
+
+def _axis_rotations(axis, angles):
+    """(N, 3, 3) rotation matrices about axis by angles (in degrees), right-handed."""
+    x, y, z = np.asarray(axis, dtype=np.float64) / np.linalg.norm(axis)
+    k = np.array([[0, -z, y], [z, 0, -x], [-y, x, 0]])
+    a = np.radians(angles)[:, np.newaxis, np.newaxis]
+
+    return np.eye(3) + np.sin(a) * k + (1 - np.cos(a)) * (k @ k)
+
+
+def _matrices(rot, ang_1, ang_2, ang_3):
+    """(N, 3, 4) transformation matrices M3 * M2 * M1 of the convention of rot, with random translations."""
+    sign = -1 if rot.invert_dir else 1
+    m = (
+        _axis_rotations(rot.axis_3, sign * ang_3)
+        @ _axis_rotations(rot.axis_2, sign * ang_2)
+        @ _axis_rotations(rot.axis_1, sign * ang_1)
+    )
+    shift = np.random.default_rng(1).uniform(-100, 100, (len(m), 3, 1))
+
+    return np.concatenate((m, shift), axis=2)
+
+
+def _test_matrices(rot):
+    rng = np.random.default_rng(0)
+    n = 500
+
+    # Random orientations
+    matrices = [_matrices(rot, rng.uniform(-180, 180, n), rng.uniform(0, 180, n), rng.uniform(-180, 180, n))]
+
+    # Gimbal lock, second angle 0 and 180 degrees (exact and slightly off)
+    for ang_2 in (0.0, 180.0, 1e-7, 180.0 - 1e-7):
+        matrices.append(_matrices(rot, rng.uniform(-180, 180, n), np.full(n, ang_2), rng.uniform(-180, 180, n)))
+
+    # Exactly axis-aligned matrices, where the singular branches are taken without rounding errors
+    quarter = np.array([-180, -90, 0, 90, 180], dtype=np.float64)
+    a1, a2, a3 = (g.ravel() for g in np.meshgrid(quarter, quarter, quarter))
+    matrices.append(np.round(_matrices(rot, a1, a2, a3)))
+
+    return np.concatenate(matrices)
+
+
+def _check(rotation_class):
+    rot = rotation_class()
+    matrices = _test_matrices(rot)
+
+    vectorized = rot.angles_from_matrices(matrices)
+    scalar = [
+        np.array([rot.rot1_from_matrix(m) for m in matrices], dtype=np.float64),
+        np.array([rot.rot2_from_matrix(m) for m in matrices], dtype=np.float64),
+        np.array([rot.rot3_from_matrix(m) for m in matrices], dtype=np.float64),
+    ]
+
+    for idx in range(3):
+        assert vectorized[idx].shape == (len(matrices),)
+        assert np.array_equal(vectorized[idx], scalar[idx], equal_nan=True), (
+            f"{rotation_class.__module__}.{rotation_class.__name__}: angle {idx + 1} differs for "
+            f"{np.count_nonzero(vectorized[idx] != scalar[idx])} matrices"
+        )
+
+
+def test_artiatomi():
+    _check(ArtiatomiEulerRotation)
+
+
+def test_cdp():
+    _check(CDPEulerRotation)
+
+
+def test_coords():
+    _check(CoordsEulerRotation)
+
+
+def test_copick():
+    _check(CopickEulerRotation)
+
+
+def test_dynamo():
+    _check(DynamoEulerRotation)
+
+
+def test_generic():
+    _check(GenericEulerRotation)
+
+
+def test_peet():
+    _check(PEETEulerRotation)
+
+
+def test_relion():
+    _check(RELIONEulerRotation)
+
+
+if __name__ == "__main__":
+    for rotation_class in ROTATIONS:
+        _check(rotation_class)
+        print(f"{rotation_class.__module__}.{rotation_class.__name__}: ok")
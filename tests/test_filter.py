@@ -0,0 +1,145 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+"""
+Checks the grammar and evaluation of particle filter expressions.
+
+Run with the Python of a ChimeraX installation that has ArtiaX installed:
+
+    chimerax -m pytest tests/test_filter.py
+"""
+
+# General
+import numpy as np
+import pytest
+
+# ChimeraX
+from chimerax.core.errors import UserError
+
+# This package
+from chimerax.artiax.util.filter import ParticleFilter, compile_filter
+
+
+class _List:
+    """Stand-in for ParticleList, providing the attribute columns."""
+
+    id_string = "1.2.1"
+
+    def __init__(self, **columns):
+        self.columns = {key: np.asarray(values) for key, values in columns.items()}
+
+    @property
+    def size(self):
+        return len(next(iter(self.columns.values())))
+
+    def get_all_attributes(self):
+        return list(self.columns)
+
+    def get_values_of_attribute(self, attribute):
+        return self.columns[attribute]
+
+
+@pytest.fixture
+def plist():
+    return _List(
+        score=[0.5, 1.5, 2.5, 3.5, 4.5, float("nan")],
+        cls=[1, 2, 3, 1, 2, 3],
+        flag=[0, 1, 0, 1, 0, 1],
+        name=np.array(["TS_01", "TS_02", "TS 03", "TS_01", "TS_02", "TS 03"], dtype=object),
+    )
+
+
+def _select(plist, expression):
+    return np.nonzero(compile_filter(expression).evaluate(plist))[0].tolist()
+
+
+@pytest.mark.parametrize(
+    "expression, expected",
+    [
+        ("score > 2", [2, 3, 4]),
+        ("score >= 2.5", [2, 3, 4]),
+        ("score < 1e0", [0]),
+        ("2 < score", [2, 3, 4]),
+        ("cls == 2", [1, 4]),
+        ("cls = 2", [1, 4]),
+        ("cls != 2", [0, 2, 3, 5]),
+        ("1 <= score < 3.5", [1, 2]),
+        ("0 < cls < 3 <= 3", [0, 1, 3, 4]),
+        ("cls in (1, 3)", [0, 2, 3, 5]),
+        ("cls in (2)", [1, 4]),
+        ("score > 1 & cls == 1", [3]),
+        ("score > 1 and cls == 1", [3]),
+        ("score < 1 | cls == 3", [0, 2, 5]),
+        ("score < 1 OR cls == 3", [0, 2, 5]),
+        ("~(cls == 1)", [1, 2, 4, 5]),
+        ("not cls == 1", [1, 2, 4, 5]),
+        ("not not cls == 1", [0, 3]),
+        ("cls == 1 | cls == 2 & score > 4", [0, 3, 4]),
+        ("(cls == 1 | cls == 2) & score > 1", [1, 3, 4]),
+        ("flag", [1, 3, 5]),
+        ("~flag", [0, 2, 4]),
+        ('name == "TS 03"', [2, 5]),
+        ("name == 'TS_01'", [0, 3]),
+        ("name in ('TS_01', \"TS 03\")", [0, 2, 3, 5]),
+        ("score != score", [5]),
+        ("1 > 2 | score > 4", [4]),
+        ("1 < 2 & cls == 3", [2, 5]),
+        ("  score>4  ", [4]),
+    ],
+)
+def test_evaluate(plist, expression, expected):
+    assert _select(plist, expression) == expected
+
+
+def test_attributes():
+    assert compile_filter("1 <= score < 3 & cls in (1, 2) | ~flag").attributes == {"score", "cls", "flag"}
+
+
+def test_from_ranges(plist):
+    f = ParticleFilter.from_ranges(["score", "cls"], [1, 1], [4, 2])
+
+    assert np.nonzero(f.evaluate(plist))[0].tolist() == [1, 3]
+
+
+def test_empty_list():
+    empty = _List(score=np.zeros(0))
+
+    assert compile_filter("score > 1").evaluate(empty).shape == (0,)
+
+
+def test_literal_only_broadcasts(plist):
+    assert compile_filter("1 < 2").evaluate(plist).tolist() == [True] * 6
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "",
+        "   ",
+        "score >",
+        "score > 1 &",
+        "(score > 1",
+        "score > 1)",
+        "cls in 1, 2",
+        "cls in (1, score)",
+        "cls in ()",
+        "score > 1 2",
+        "score $ 1",
+        "score > 'abc",
+        "&",
+    ],
+)
+def test_syntax_errors(expression):
+    with pytest.raises(UserError):
+        compile_filter(expression)
+
+
+def test_unknown_attribute(plist):
+    with pytest.raises(UserError, match="unknown_attr"):
+        compile_filter("unknown_attr > 1 | score > 1").evaluate(plist)
+
+
+def test_string_compared_with_number(plist):
+    with pytest.raises(UserError):
+        compile_filter("name > 1").evaluate(plist)
+
+    with pytest.raises(UserError):
+        compile_filter("score < 'abc'").evaluate(plist)
@@ -0,0 +1,142 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+"""
+Checks nearest neighbour search against brute force.
+
+Run with the Python of a ChimeraX installation that has ArtiaX installed:
+
+    chimerax -m pytest tests/test_neighbors.py
+"""
+
+# General
+import numpy as np
+
+# This package
+from chimerax.artiax.particle.SpatialIndex import SpatialIndex
+from chimerax.artiax.util.neighbors import nearest_neighbors, neighbor_attributes, tomogram_groups
+
+
+class _Data:
+    def __init__(self, ids, matrices):
+        self.ids = ids
+        self.matrices = matrices
+
+    def rows(self, ids):
+        return np.searchsorted(self.ids, ids)
+
+    def get_all_transform_matrices(self):
+        return self.matrices
+
+
+class _List:
+    """Stand-in for ParticleList with identity rotations, particle ids 1..N."""
+
+    def __init__(self, coords, tomo=None):
+        n = len(coords)
+        matrices = np.zeros((n, 3, 4))
+        matrices[:, :, :3] = np.eye(3)
+        matrices[:, :, 3] = coords
+
+        self.size = n
+        self.particle_ids = np.arange(1, n + 1)
+        self.data = _Data(self.particle_ids, matrices)
+        self.spatial_index = SpatialIndex(points=coords, ids=self.particle_ids)
+        self._tomo = tomo
+
+    def get_tomogram_column(self):
+        return self._tomo
+
+
+def _brute_force_neighbors(coords, group_of, k, max_distance=None):
+    d = np.linalg.norm(coords[:, np.newaxis, :] - coords[np.newaxis, :, :], axis=2)
+    d[group_of[:, np.newaxis] != group_of[np.newaxis, :]] = np.inf
+    np.fill_diagonal(d, np.inf)
+    if max_distance is not None:
+        d[d > max_distance] = np.inf
+
+    dist = np.sort(d, axis=1)[:, :k]
+    dist[np.isinf(dist)] = np.nan
+
+    return dist, d
+
+
+def _check_neighbors(coords, group_of, k, max_distance=None):
+    groups = [np.nonzero(group_of == g)[0] for g in np.unique(group_of)]
+    distances, neighbors = nearest_neighbors(coords, groups, k, max_distance)
+    expected, d = _brute_force_neighbors(coords, group_of, k, max_distance)
+
+    assert distances.shape == neighbors.shape == (len(coords), k)
+    assert np.allclose(distances, expected, equal_nan=True)
+    assert np.array_equal(neighbors < 0, np.isnan(expected))
+
+    # Neighbours are other points of the same group at the reported distance
+    rows, cols = np.nonzero(neighbors >= 0)
+    nb = neighbors[rows, cols]
+    assert np.all(nb != rows)
+    assert np.all(group_of[nb] == group_of[rows])
+    assert np.allclose(d[rows, nb], distances[rows, cols])
+
+
+def test_nearest_neighbors():
+    rng = np.random.default_rng(0)
+    coords = rng.uniform(0, 100, (400, 3))
+
+    for k in (1, 3):
+        _check_neighbors(coords, np.zeros(400, dtype=np.int64), k)
+
+
+def test_nearest_neighbors_per_group():
+    rng = np.random.default_rng(1)
+    coords = rng.uniform(0, 100, (300, 3))
+    group_of = rng.integers(0, 4, 300)
+
+    # A group with a single point has no neighbours
+    group_of[7] = 9
+
+    _check_neighbors(coords, group_of, 2)
+
+
+def test_max_distance():
+    rng = np.random.default_rng(2)
+    coords = rng.uniform(0, 100, (300, 3))
+
+    _check_neighbors(coords, np.zeros(300, dtype=np.int64), 3, max_distance=8)
+
+
+def test_duplicate_points_exclude_self():
+    coords = np.array([[0.0, 0, 0], [0, 0, 0], [0, 0, 0], [5, 0, 0]])
+
+    distances, neighbors = nearest_neighbors(coords, [np.arange(4)], k=2)
+
+    assert np.array_equal(distances[:3], np.zeros((3, 2)))
+    for row in range(3):
+        assert row not in neighbors[row].tolist()
+        assert set(neighbors[row].tolist()) <= {0, 1, 2}
+    assert neighbors[3, 0] in (0, 1, 2) and distances[3, 0] == 5
+
+
+def test_more_neighbours_than_points():
+    distances, neighbors = nearest_neighbors(np.array([[0.0, 0, 0], [3, 4, 0]]), [np.arange(2)], k=3)
+
+    assert distances[0].tolist()[0] == 5 and np.all(np.isnan(distances[:, 1:]))
+    assert neighbors.tolist() == [[1, -1, -1], [0, -1, -1]]
+
+
+def test_tomogram_groups():
+    plist = _List(np.zeros((6, 3)), tomo=np.array([2, 1, 2, 3, 1, 2]))
+
+    groups = tomogram_groups(plist)
+
+    assert [g.tolist() for g in groups] == [[1, 4], [0, 2, 5], [3]]
+    assert [g.tolist() for g in tomogram_groups(_List(np.zeros((3, 3))))] == [[0, 1, 2]]
+
+
+def test_neighbor_attributes():
+    coords = np.array([[0.0, 0, 0], [1, 0, 0], [0, 0, 10], [0, 3, 10]])
+    plist = _List(coords, tomo=np.array([1, 1, 2, 2]))
+
+    attributes = neighbor_attributes(plist, k=1, max_distance=2)
+
+    assert attributes["nn_count"].tolist() == [1, 1, 0, 0]
+    assert attributes["nn1_dist"].tolist() == [1, 1, 0, 0]
+    assert attributes["nn1_x"].tolist() == [1, -1, 0, 0]
+    assert attributes["nn1_angle"].tolist() == [0, 0, 0, 0]
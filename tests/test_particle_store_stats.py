@@ -0,0 +1,97 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+"""
+Checks that the statistics ParticleStore keeps up to date incrementally equal those computed from scratch.
+
+Run with the Python of a ChimeraX installation that has ArtiaX installed:
+
+    chimerax -m pytest tests/test_particle_store_stats.py
+"""
+
+# General
+import numpy as np
+
+# This package
+from chimerax.artiax.io.ParticleData import ParticleStore
+from chimerax.artiax.io.RELION.RELIONParticleData import RELIONEulerRotation
+
+
+def _store(n=1000):
+    rng = np.random.default_rng(0)
+    store = ParticleStore(RELIONEulerRotation)
+    store.extend(n)
+    store.set_column("x", rng.normal(size=n))
+    store.set_column("k", rng.integers(0, 100, n))
+
+    return store
+
+
+def _assert_stats(store, key):
+    cached = store.stats(key)
+
+    store._stats.pop(key, None)
+    fresh = store.stats(key)
+
+    assert cached["min"] == fresh["min"] and cached["max"] == fresh["max"]
+    for stat in ("mean", "std", "var"):
+        assert np.isclose(cached[stat], fresh[stat], rtol=1e-9, atol=1e-12), (key, stat)
+
+
+def test_single_row_is_incremental():
+    store = _store()
+    store.stats("x")
+
+    # Not the minimum or maximum, so the cached entry is kept
+    values = store.column("x")
+    row = int(np.argsort(values)[len(values) // 2])
+    store.set_values(np.array([row]), "x", np.array([0.1]))
+
+    assert "x" in store._stats
+    _assert_stats(store, "x")
+
+
+def test_new_extremes_are_incremental():
+    store = _store()
+    store.stats("x")
+
+    store.set_values(np.array([3, 7]), "x", np.array([-1e3, 1e3]))
+
+    assert "x" in store._stats
+    assert store.stats("x")["min"] == -1e3 and store.stats("x")["max"] == 1e3
+    _assert_stats(store, "x")
+
+
+def test_replaced_extreme_rescans():
+    store = _store()
+    store.stats("x")
+
+    row = int(np.argmax(store.column("x")))
+    store.set_values(np.array([row]), "x", np.array([0.0]))
+
+    assert "x" not in store._stats
+    _assert_stats(store, "x")
+
+
+def test_random_updates():
+    rng = np.random.default_rng(1)
+    store = _store()
+
+    for _ in range(200):
+        store.stats("x")
+        store.stats("k")
+
+        rows = rng.choice(store._size, size=rng.integers(1, 20), replace=rng.random() < 0.2)
+        store.set_values(rows, "x", rng.normal(size=len(rows)))
+        store.set_values(rows, "k", rng.integers(0, 100, len(rows)))
+
+        _assert_stats(store, "x")
+        _assert_stats(store, "k")
+
+
+def test_int_column_promoted_to_float():
+    store = _store()
+    store.stats("k")
+
+    store.set_values(np.array([0]), "k", np.array([0.5]))
+
+    assert store.column("k").dtype == np.float64
+    _assert_stats(store, "k")
@@ -0,0 +1,75 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+"""
+Checks that RELION 5 particle lists are read with all supported forms of rlnTomoName.
+
+Run with the Python of a ChimeraX installation that has ArtiaX installed:
+
+    chimerax -m pytest tests/test_relion5_tomo_names.py
+"""
+
+# General
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+import starfile
+
+# ChimeraX
+from chimerax.core.errors import UserError
+
+# This package
+from chimerax.artiax.io.RELION5.RELION5ParticleData import RELION5ParticleData
+
+
+class _Logger:
+    def info(self, *args, **kwargs):
+        pass
+
+    def warning(self, *args, **kwargs):
+        pass
+
+    def status(self, *args, **kwargs):
+        pass
+
+
+def _session():
+    return types.SimpleNamespace(logger=_Logger(), ui=types.SimpleNamespace(is_gui=False))
+
+
+def _read(tmp_path, names, prefix=None, suffix=None):
+    n = len(names)
+    df = pd.DataFrame(
+        {
+            "rlnTomoName": names,
+            "rlnCenteredCoordinateXAngst": np.zeros(n),
+            "rlnCenteredCoordinateYAngst": np.zeros(n),
+            "rlnCenteredCoordinateZAngst": np.zeros(n),
+        }
+    )
+    file_name = str(tmp_path / "particles.star")
+    starfile.write({"particles": df}, file_name, overwrite=True)
+
+    return RELION5ParticleData(
+        _session(), file_name, dimensions=[100, 100, 50], voxelsize=10.0, prefix=prefix, suffix=suffix
+    )
+
+
+def test_numeric_names(tmp_path):
+    data = _read(tmp_path, [1, 2, 12, 2])
+
+    assert np.array_equal(data.get_column("rlnTomoName"), [1, 2, 12, 2])
+    assert data.name_leading_zeros is None
+
+
+def test_numeric_names_with_prefix(tmp_path):
+    with pytest.raises(UserError):
+        _read(tmp_path, [1, 2], prefix="TS_")
+
+
+def test_prefixed_names(tmp_path):
+    data = _read(tmp_path, ["TS_001.tomostar", "TS_010.tomostar"], prefix="TS_", suffix=".tomostar")
+
+    assert np.array_equal(data.get_column("rlnTomoName"), [1, 10])
+    assert data.name_prefix == "TS_"
+    assert data.name_leading_zeros == 3
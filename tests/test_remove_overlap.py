@@ -0,0 +1,63 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+"""
+Checks find_overlapping_pairs against testing all pairs of bounding boxes.
+
+Run with the Python of a ChimeraX installation that has ArtiaX installed:
+
+    chimerax -m pytest tests/test_remove_overlap.py
+"""
+
+# General
+import numpy as np
+
+# This package
+from chimerax.artiax.util.remove_overlap import find_overlapping_pairs
+
+
+class _Particle:
+    def __init__(self, coord):
+        self.coord = coord
+
+
+class _Bounds:
+    def __init__(self, xyz_min, xyz_max):
+        self.xyz_min = xyz_min
+        self.xyz_max = xyz_max
+
+
+def _brute_force(particles, bounds):
+    pairs = []
+    for i, p in enumerate(particles):
+        for j in range(i + 1, len(particles)):
+            q = particles[j]
+            lo_p, hi_p = bounds[p].xyz_min + p.coord, bounds[p].xyz_max + p.coord
+            lo_q, hi_q = bounds[q].xyz_min + q.coord, bounds[q].xyz_max + q.coord
+            if np.all(lo_p <= hi_q) and np.all(hi_p >= lo_q):
+                pairs.append((i, j))
+
+    return pairs
+
+
+def test_same_as_brute_force():
+    rng = np.random.default_rng(0)
+
+    for count in (0, 1, 2, 50, 300):
+        particles = [_Particle(c) for c in rng.uniform(0, 200, (count, 3))]
+
+        # Boxes of different size, not centered on the particle
+        bounds = {}
+        for p in particles:
+            xyz_min = -rng.uniform(1, 15, 3)
+            bounds[p] = _Bounds(xyz_min, xyz_min + rng.uniform(2, 25, 3))
+
+        pairs = find_overlapping_pairs(particles, bounds)
+
+        assert pairs.shape == (len(pairs), 2)
+        assert [tuple(pair) for pair in pairs.tolist()] == _brute_force(particles, bounds)
+
+
+def test_touching_boxes_overlap():
+    particles = [_Particle(np.array([0.0, 0.0, 0.0])), _Particle(np.array([10.0, 0.0, 0.0]))]
+    bounds = {p: _Bounds(np.array([-5.0, -5.0, -5.0]), np.array([5.0, 5.0, 5.0])) for p in particles}
+
+    assert find_overlapping_pairs(particles, bounds).tolist() == [[0, 1]]
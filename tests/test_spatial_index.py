@@ -0,0 +1,143 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+"""
+Checks the queries of SpatialIndex against brute force, while points are moved, inserted and removed.
+
+Run with the Python of a ChimeraX installation that has ArtiaX installed:
+
+    chimerax -m pytest tests/test_spatial_index.py
+"""
+
+# General
+import numpy as np
+import pytest
+
+# This package
+from chimerax.artiax.particle.SpatialIndex import SpatialIndex, SlabIndex
+
+
+class _Points:
+    """Reference point set, also used as source of the index."""
+
+    def __init__(self, rng, count):
+        self.points = {i: p for i, p in enumerate(rng.uniform(0, 100, (count, 3)), start=1)}
+        self.next_id = count + 1
+
+    def arrays(self):
+        ids = np.array(list(self.points), dtype=np.int64)
+        points = np.array([self.points[i] for i in ids.tolist()], dtype=np.float64).reshape((-1, 3))
+        return ids, points
+
+
+def _check_queries(rng, index, ref):
+    ids, points = ref.arrays()
+    assert len(index) == len(ids)
+
+    queries = rng.uniform(-10, 110, (20, 3))
+    distances = np.linalg.norm(queries[:, np.newaxis, :] - points[np.newaxis, :, :], axis=2)
+
+    # Radius
+    for result, d in zip(index.query_radius(queries, 12), distances):
+        assert sorted(result.tolist()) == sorted(ids[d <= 12].tolist())
+
+    # k nearest, the distances are unique with random points
+    k = 4
+    knn_dist, knn_ids = index.query_knn(queries, k)
+    order = np.argsort(distances, axis=1)[:, :k]
+    n = min(k, len(ids))
+    assert np.allclose(knn_dist[:, :n], np.take_along_axis(distances, order, axis=1)[:, :n])
+    assert np.array_equal(knn_ids[:, :n], ids[order][:, :n])
+    assert np.all(knn_ids[:, n:] == -1) and np.all(np.isinf(knn_dist[:, n:]))
+
+    # Box
+    lo, hi = np.array([20.0, 30.0, 10.0]), np.array([60.0, 45.0, 90.0])
+    inside = np.all((points >= lo) & (points <= hi), axis=1)
+    assert sorted(index.query_box(lo, hi).tolist()) == sorted(ids[inside].tolist())
+
+    # Pairs
+    pair_dist = np.linalg.norm(points[:, np.newaxis, :] - points[np.newaxis, :, :], axis=2)
+    i, j = np.nonzero(np.triu(pair_dist <= 6, k=1))
+    expected = {tuple(sorted(pair)) for pair in zip(ids[i].tolist(), ids[j].tolist())}
+    result = index.query_pairs(6)
+    assert len(result) == len(expected)
+    assert {tuple(sorted(pair)) for pair in result.tolist()} == expected
+
+    # Coordinates
+    assert np.array_equal(index.coords(ids), points)
+
+
+@pytest.mark.parametrize("with_source", [False, True])
+def test_queries_after_updates(with_source):
+    rng = np.random.default_rng(0)
+    ref = _Points(rng, 1000)
+
+    if with_source:
+        index = SpatialIndex(source=ref.arrays)
+    else:
+        index = SpatialIndex(*reversed(ref.arrays()))
+    _check_queries(rng, index, ref)
+
+    for step in range(40):
+        action = step % 4
+        existing = np.array(list(ref.points), dtype=np.int64)
+
+        if action == 0:
+            # Move a few or many points
+            ids = rng.choice(existing, size=min(int(rng.choice([3, 50, 400])), len(existing)), replace=False)
+            points = rng.uniform(0, 100, (len(ids), 3))
+            ref.points.update(zip(ids.tolist(), points))
+            index.update(ids, points)
+        elif action == 1:
+            # Insert new points
+            count = int(rng.choice([1, 30, 300]))
+            ids = np.arange(ref.next_id, ref.next_id + count)
+            ref.next_id += count
+            points = rng.uniform(0, 100, (count, 3))
+            ref.points.update(zip(ids.tolist(), points))
+            index.update(ids, points)
+        elif action == 2:
+            # Remove a few or many points
+            ids = rng.choice(existing, size=min(int(rng.choice([2, 40, 500])), len(existing) // 2), replace=False)
+            for _id in ids.tolist():
+                del ref.points[_id]
+            index.remove(ids)
+        elif step % 8 == 3:
+            index.invalidate()
+
+        _check_queries(rng, index, ref)
+
+
+def test_removing_many_points_keeps_knn_small():
+    rng = np.random.default_rng(1)
+    index = SpatialIndex(rng.uniform(0, 100, (20000, 3)))
+
+    index.remove(np.arange(0, 20000, 2))
+
+    # The tree was rebuilt, so no removed rows are left to skip
+    assert index._excluded_count == 0
+    dist, ids = index.query_knn(rng.uniform(0, 100, (1000, 3)), 1)
+    assert np.all(ids % 2 == 1)
+
+
+def test_fewer_points_than_k():
+    index = SpatialIndex(np.zeros((2, 3)))
+
+    dist, ids = index.query_knn(np.ones((1, 3)), 4)
+
+    assert np.array_equal(ids[0, 2:], [-1, -1])
+    assert np.all(np.isinf(dist[0, 2:]))
+
+
+def test_slab_index():
+    rng = np.random.default_rng(2)
+    points = rng.uniform(0, 100, (500, 3))
+    slab = SlabIndex(points, (0, 0, 2))
+    depth = points[:, 2]
+
+    assert sorted(slab.query(20, 40).tolist()) == np.nonzero((depth >= 20) & (depth <= 40))[0].tolist()
+
+    inside = np.zeros(len(points), dtype=bool)
+    for lo, hi in [(20, 40), (30, 50), (70, 80), (0, 100), (10, 10)]:
+        entered, left = slab.move(lo, hi)
+        inside[entered] = True
+        inside[left] = False
+        assert np.array_equal(inside, (depth >= lo) & (depth <= hi))
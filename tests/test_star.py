@@ -0,0 +1,169 @@
+# vim: set expandtab shiftwidth=4 softtabstop=4:
+"""
+Checks that StarLoopStream reads STAR files like starfile.read, independent of the chunk size.
+
+Run with the Python of a ChimeraX installation that has ArtiaX installed:
+
+    chimerax -m pytest tests/test_star.py
+"""
+
+# General
+import pandas as pd
+import pytest
+import starfile
+
+# ChimeraX
+from chimerax.core.errors import UserError
+
+# This package
+from chimerax.artiax.io.star import StarLoopStream, star_blocks
+
+STAR = """
+# version 30001
+
+data_general
+
+_rlnTomoSubTomosAre2DStacks                       1
+_rlnTomoName                                 'TS 01'
+
+# version 30001
+
+data_optics
+
+loop_
+_rlnOpticsGroup #1
+_rlnOpticsGroupName #2
+_rlnVoltage #3
+1 opticsGroup1 300.000000
+2 opticsGroup2 200.000000
+
+# version 30001
+
+data_particles
+
+loop_
+_rlnCoordinateX #1
+_rlnCoordinateY #2
+_rlnCoordinateZ #3
+_rlnClassNumber #4
+_rlnImageName #5
+_rlnMicrographName #6
+10.5 20.0 30.0 1 'image 1' 007
+11.5 21.0 31.0 2 'image 2' 008
+12.5 22.0 32.0 1 'image 3' 009
+13.5 23.0 33.0 3 'image 4' 010
+14.5 24.0 34.0 2 'image 5' 011
+
+"""
+
+
+def _select(columns):
+    return "rlnCoordinateZ" in columns
+
+
+def _write(tmp_path, text):
+    file_name = str(tmp_path / "particles.star")
+    with open(file_name, "w") as f:
+        f.write(text)
+
+    return file_name
+
+
+def _read(file_name, chunk_size):
+    stream = StarLoopStream(file_name, _select, chunk_size=chunk_size)
+    chunks = list(stream)
+
+    return stream, chunks, pd.concat(chunks, ignore_index=True)
+
+
+def _assert_same(df, ref):
+    assert list(df.columns) == list(ref.columns)
+
+    for key in ref.columns:
+        assert pd.api.types.is_numeric_dtype(df[key]) == pd.api.types.is_numeric_dtype(ref[key]), key
+        if pd.api.types.is_numeric_dtype(ref[key]):
+            assert df[key].dtype == ref[key].dtype, key
+        assert df[key].tolist() == ref[key].tolist(), key
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 5, 100])
+def test_same_as_starfile(tmp_path, chunk_size):
+    file_name = _write(tmp_path, STAR)
+    ref = starfile.read(file_name, always_dict=True)
+
+    stream, chunks, df = _read(file_name, chunk_size)
+
+    assert stream.name == "particles"
+    assert len(chunks) == -(-5 // chunk_size)
+    assert all(len(chunk) > 0 for chunk in chunks)
+    _assert_same(df, ref["particles"])
+
+    # Key-value block and other loops
+    assert list(stream.blocks) == ["general", "optics"]
+    assert stream.blocks["general"] == ref["general"]
+    _assert_same(stream.blocks["optics"], ref["optics"])
+
+
+def test_quoted_strings(tmp_path):
+    file_name = _write(tmp_path, STAR)
+
+    _, _, df = _read(file_name, 1)
+
+    assert df["rlnImageName"].tolist() == ["image 1", "image 2", "image 3", "image 4", "image 5"]
+
+
+def test_trailing_blank_lines_and_comments(tmp_path):
+    text = STAR.replace("14.5 24.0", "\n# comment\n\n14.5 24.0") + "\n\n\n"
+    file_name = _write(tmp_path, text)
+
+    _, chunks, df = _read(file_name, 1)
+
+    assert len(chunks) == 5
+    _assert_same(df, starfile.read(file_name, always_dict=True)["particles"])
+
+
+def test_digit_strings_keep_column_type(tmp_path):
+    # Strings in the first chunk, only digits in later ones
+    text = STAR.replace("'image 2'", "12").replace("'image 3'", "0013")
+    file_name = _write(tmp_path, text)
+
+    _, _, df = _read(file_name, 1)
+
+    assert df["rlnImageName"].tolist() == ["image 1", "12", "0013", "image 4", "image 5"]
+
+
+def test_int_column_widened_to_float(tmp_path):
+    text = STAR.replace(" 3 'image 4'", " 3.5 'image 4'")
+    file_name = _write(tmp_path, text)
+
+    _, _, df = _read(file_name, 2)
+
+    assert df["rlnClassNumber"].tolist() == [1, 2, 1, 3.5, 2]
+
+
+def test_non_numeric_value_in_numeric_column(tmp_path):
+    text = STAR.replace("13.5 23.0", "13.5 abc")
+    file_name = _write(tmp_path, text)
+
+    with pytest.raises(UserError, match="rlnCoordinateY.*row 4"):
+        _read(file_name, 2)
+
+
+def test_missing_data_loop(tmp_path):
+    file_name = _write(tmp_path, STAR)
+
+    stream = StarLoopStream(file_name, lambda columns: "rlnCenteredCoordinateZAngst" in columns)
+
+    assert list(stream) == []
+    assert stream.name is None
+    assert list(stream.blocks) == ["general", "optics", "particles"]
+
+
+def test_star_blocks(tmp_path):
+    file_name = _write(tmp_path, STAR)
+
+    blocks = dict(star_blocks(file_name))
+
+    assert blocks["general"] == ["rlnTomoSubTomosAre2DStacks", "rlnTomoName"]
+    assert blocks["optics"] == ["rlnOpticsGroup", "rlnOpticsGroupName", "rlnVoltage"]
+    assert blocks["particles"][-1] == "rlnMicrographName"